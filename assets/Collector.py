@@ -1,10 +1,27 @@
 import yfinance
 import pandas as pd
 import datetime
+from assets.PriceCache import PriceCache
 
 
 class InfoCollector:
 
+    _price_cache = None
+
+    @staticmethod
+    def get_price_cache() -> PriceCache:
+        if InfoCollector._price_cache is None:
+            InfoCollector._price_cache = PriceCache()
+        return InfoCollector._price_cache
+
+    @staticmethod
+    def set_price_cache(price_cache: PriceCache) -> None:
+        """
+        Swap the cache, e.g. PriceCache(":memory:", source=SyntheticSource())
+        to run fully offline
+        """
+        InfoCollector._price_cache = price_cache
+
     @staticmethod
     def get_ticker(stock_name: str) -> yfinance.Ticker:
         return yfinance.Ticker(stock_name)
@@ -29,8 +46,20 @@ class InfoCollector:
             Default is now
             E.g. for end="2023-01-01", the last data point will be on "2022-12-31"
         """
-        return ticker.history(period=period, interval=interval,
-                              start=start, end=end)
+        return InfoCollector.get_price_cache().history(ticker.ticker, period=period,
+                                                       interval=interval,
+                                                       start=start, end=end)
+
+    @staticmethod
+    def get_batch_history(stocks: list, period="1d", interval="1d", max_age: float = None) -> tuple:
+        """
+        Concurrent multi-ticker version of get_history, returns
+        ({ticker: history}, {ticker: error message}) so one failing ticker
+        does not abort the rest. max_age bounds the age (seconds) of cached bars
+        """
+        return InfoCollector.get_price_cache().history_many(stocks, period=period,
+                                                            interval=interval,
+                                                            max_age=max_age)
 
     @staticmethod
     def get_demo_daily_history(interval: str):
@@ -55,4 +84,4 @@ class InfoCollector:
 
     @staticmethod
     def download_batch_history(stocks: list, start_time, end_time):
-        return yfinance.download(stocks, start=start_time, end=end_time)
\ No newline at end of file
+        return InfoCollector.get_price_cache().download(stocks, start=start_time, end=end_time)
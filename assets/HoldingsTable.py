@@ -0,0 +1,130 @@
+import numpy as np
+from numpy import ndarray
+
+
+class HoldingsTable:
+    """
+    Columnar store of positions: parallel arrays of tickers, quantities,
+    average cost and last price, so portfolio totals and per-position
+    figures are single vectorized expressions
+    """
+
+    __slots__ = ("_tickers", "_quantities", "_average_costs", "_last_prices", "_index", "_size")
+
+    def __init__(self, capacity: int = 16):
+        capacity = max(1, capacity)
+        self._tickers = np.empty(capacity, dtype=object)
+        self._quantities = np.zeros(capacity, dtype=np.float64)
+        self._average_costs = np.zeros(capacity, dtype=np.float64)
+        self._last_prices = np.full(capacity, np.nan, dtype=np.float64)
+        self._index = {}
+        self._size = 0
+
+    @classmethod
+    def from_arrays(cls, tickers: list, quantities, average_costs, last_prices=None):
+        table = cls(capacity=len(tickers))
+        table._size = len(tickers)
+        table._tickers[:table._size] = list(tickers)
+        table._quantities[:table._size] = quantities
+        table._average_costs[:table._size] = average_costs
+        if last_prices is not None:
+            table._last_prices[:table._size] = last_prices
+        table._index = {ticker: i for i, ticker in enumerate(tickers)}
+        if len(table._index) != table._size:
+            raise Exception("Duplicate tickers in holdings")
+        return table
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._index
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._tickers)
+        for name, fill in [("_tickers", None), ("_quantities", 0.0),
+                           ("_average_costs", 0.0), ("_last_prices", np.nan)]:
+            column = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def append(self, ticker: str, quantity: float, average_cost: float,
+               last_price: float = np.nan) -> None:
+        if ticker in self._index:
+            raise Exception("Stock included in portfolio. Please remove stock to add again")
+        if self._size == len(self._tickers):
+            self._grow()
+        i = self._size
+        self._tickers[i] = ticker
+        self._quantities[i] = quantity
+        self._average_costs[i] = average_cost
+        self._last_prices[i] = last_price
+        self._index[ticker] = i
+        self._size += 1
+
+    def update(self, ticker: str, quantity: float, average_cost: float) -> None:
+        if ticker not in self._index:
+            raise Exception("Stock not in portfolio")
+        i = self._index[ticker]
+        self._quantities[i] = quantity
+        self._average_costs[i] = average_cost
+
+    def remove(self, ticker: str) -> None:
+        if ticker not in self._index:
+            raise Exception("Stock not in portfolio")
+        i = self._index.pop(ticker)
+        # shift the tail down one slot to keep insertion order
+        for column in (self._tickers, self._quantities, self._average_costs, self._last_prices):
+            column[i:self._size - 1] = column[i + 1:self._size]
+        self._size -= 1
+        for moved in self._tickers[i:self._size]:
+            self._index[moved] -= 1
+
+    @property
+    def tickers(self) -> list:
+        return list(self._tickers[:self._size])
+
+    @property
+    def quantities(self) -> ndarray:
+        return self._quantities[:self._size]
+
+    @property
+    def average_costs(self) -> ndarray:
+        return self._average_costs[:self._size]
+
+    @property
+    def last_prices(self) -> ndarray:
+        return self._last_prices[:self._size]
+
+    def set_last_prices(self, last_prices) -> None:
+        """
+        last_prices : array aligned with tickers, or {ticker: price}
+        """
+        if isinstance(last_prices, dict):
+            for ticker, price in last_prices.items():
+                self._last_prices[self._index[ticker]] = price
+        else:
+            self._last_prices[:self._size] = last_prices
+
+    def book_costs(self) -> ndarray:
+        return self.quantities * self.average_costs
+
+    def market_values(self) -> ndarray:
+        return self.quantities * self.last_prices
+
+    def gains_losses(self) -> ndarray:
+        return self.market_values() - self.book_costs()
+
+    def pct_changes(self) -> ndarray:
+        return self.gains_losses() / self.book_costs() * 100
+
+    def weights(self) -> ndarray:
+        book_costs = self.book_costs()
+        return book_costs / book_costs.sum()
+
+    def book_amount(self) -> float:
+        return float(self.quantities @ self.average_costs)
+
+    def market_value(self) -> float:
+        return float(self.quantities @ self.last_prices)
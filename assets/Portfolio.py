@@ -1,27 +1,66 @@
 from assets.Stock import Stock
+from assets.HoldingsTable import HoldingsTable
 
 
 class Portfolio:
+    """
+    Stocks by name plus a columnar HoldingsTable of their positions. Positions
+    of held stocks are changed through the portfolio (add_buy_action), or
+    copied in with refresh_holding, so both stay in sync
+    """
 
     def __init__(self) -> None:
         self.stocks = {}
-        self.book_amount = 0
+        # columnar copy of the positions, used for every portfolio level figure
+        self.holdings = HoldingsTable()
         self.market_value = 0
 
+    @property
+    def book_amount(self) -> float:
+        return self.holdings.book_amount()
+
     def add_stock(self, stock: Stock) -> None:
         if stock.stock_name in self.stocks.keys():
             raise Exception("Stock included in portfolio. Please remove stock to add again")
 
+        # validates the position before it is added
+        stock.get_book_cost()
         self.stocks[stock.stock_name] = stock
-        self.book_amount += stock.get_book_cost()
+        self.holdings.append(stock.stock_name, stock.owned_quantity, stock.average_price,
+                             stock.previous_close if stock.previous_close is not None else float("nan"))
+
+    def add_buy_action(self, stock_name: str, quantity: int, purchase_date) -> None:
+        if stock_name not in self.stocks.keys():
+            raise Exception("Stock not in portfolio")
+        self.stocks[stock_name].add_buy_action(quantity=quantity, purchase_date=purchase_date)
+        self.refresh_holding(stock_name)
+
+    def refresh_holding(self, stock_name: str) -> None:
+        """
+        Copies the position of a Stock changed outside the portfolio into the holdings table
+        """
+        if stock_name not in self.stocks.keys():
+            raise Exception("Stock not in portfolio")
+        stock = self.stocks[stock_name]
+        self.holdings.update(stock_name, stock.owned_quantity, stock.average_price)
 
     def remove_stock(self, stock_name: str) -> None:
         if stock_name not in self.stocks.keys():
             raise Exception("Stock not in portfolio")
-        self.book_amount -= self.stocks[stock_name].get_book_cost()
+        self.holdings.remove(stock_name)
         self.stocks.pop(stock_name)
 
     def update_market_value(self) -> None:
+        # one batched quote pull per price source, then revalue from the snapshot
+        stocks_by_source = {}
+        for stock in self.stocks.values():
+            stocks_by_source.setdefault(id(stock.price_source), []).append(stock)
+        for stocks in stocks_by_source.values():
+            stocks[0].price_source.refresh([stock.stock_name for stock in stocks])
+
+        last_prices = []
         for stock in self.stocks.values():
-            stock_market_value = stock.get_market_value()
-            self.market_value += stock_market_value
\ No newline at end of file
+            stock.refresh_quote()
+            last_prices.append(stock.previous_close)
+        self.holdings.set_last_prices(last_prices)
+        self.market_value = self.holdings.market_value()
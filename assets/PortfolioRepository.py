@@ -0,0 +1,113 @@
+import datetime
+import json
+from db_connection import DEFAULT_DB_PATH, get_db_connection, get_db_lock
+from assets.Portfolio import Portfolio
+from assets.Stock import Stock
+from assets.QuoteSnapshot import QuoteSnapshot
+
+
+# the app has no accounts yet, every portfolio is saved under this user
+DEFAULT_USERNAME = "default"
+
+
+class PortfolioRepository:
+    """
+    Saved portfolios in portfolios.db, one row per holding in the holdings
+    table. Loading rebuilds the Portfolio from the stored quantities and
+    purchase prices, without validating tickers or fetching prices again
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self._conn = get_db_connection(path)
+        self._lock = get_db_lock(path)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS portfolios (
+                    username TEXT,
+                    portfolio_name TEXT,
+                    portfolio_data TEXT,
+                    PRIMARY KEY (username, portfolio_name)
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS holdings (
+                    username TEXT,
+                    portfolio_name TEXT,
+                    position INTEGER,
+                    stock_name TEXT,
+                    quantity INTEGER,
+                    average_price REAL,
+                    purchase_date TEXT,
+                    PRIMARY KEY (username, portfolio_name, position),
+                    FOREIGN KEY (username, portfolio_name)
+                        REFERENCES portfolios (username, portfolio_name) ON DELETE CASCADE
+                )
+            """)
+
+    def save(self, username: str, portfolio_name: str, portfolio: Portfolio) -> None:
+        """
+        Replaces the saved portfolio with the holdings of portfolio in one transaction
+        """
+        rows = [(username, portfolio_name, position, stock.stock_name, int(stock.owned_quantity),
+                 float(stock.average_price),
+                 stock.purchase_date.strftime("%Y-%m-%d") if stock.purchase_date is not None else None)
+                for position, stock in enumerate(portfolio.stocks.values())]
+        # portfolio_data only keeps a summary, the holdings table is the source of truth
+        summary = json.dumps({"book_amount": float(portfolio.book_amount),
+                              "no_holdings": len(rows),
+                              "saved_at": datetime.datetime.now().isoformat(timespec="seconds")})
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO portfolios VALUES (?, ?, ?)",
+                               (username, portfolio_name, summary))
+            self._conn.execute("DELETE FROM holdings WHERE username = ? AND portfolio_name = ?",
+                               (username, portfolio_name))
+            self._conn.executemany("INSERT INTO holdings VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def load_holdings(self, username: str, portfolio_name: str) -> list:
+        """
+        [(stock_name, quantity, average_price, purchase_date)] in saved order
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stock_name, quantity, average_price, purchase_date FROM holdings "
+                "WHERE username = ? AND portfolio_name = ? ORDER BY position",
+                (username, portfolio_name)).fetchall()
+        return [(stock_name, quantity, average_price,
+                 datetime.date.fromisoformat(purchase_date) if purchase_date else None)
+                for stock_name, quantity, average_price, purchase_date in rows]
+
+    def load(self, username: str, portfolio_name: str, price_source: QuoteSnapshot = None) -> Portfolio:
+        """
+        Returns the saved Portfolio, or None if there is no portfolio with that name
+        """
+        holdings = self.load_holdings(username, portfolio_name)
+        if not holdings:
+            return None
+
+        portfolio = Portfolio()
+        for stock_name, quantity, average_price, purchase_date in holdings:
+            portfolio.add_stock(Stock.from_holding(stock_name, quantity, average_price,
+                                                   purchase_date, price_source=price_source))
+        return portfolio
+
+    def list_portfolios(self, username: str) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT portfolio_name FROM portfolios WHERE username = ? ORDER BY portfolio_name",
+                (username,)).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, username: str, portfolio_name: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM portfolios WHERE username = ? AND portfolio_name = ?",
+                               (username, portfolio_name))
+
+
+_default_repository = None
+
+
+def get_default_repository() -> PortfolioRepository:
+    global _default_repository
+    if _default_repository is None:
+        _default_repository = PortfolioRepository()
+    return _default_repository
@@ -0,0 +1,80 @@
+import datetime
+import hashlib
+from assets.Portfolio import Portfolio
+from assets.Stock import Stock
+from assets.QuoteSnapshot import QuoteSnapshot, get_default_snapshot
+from assets.PurchasePriceResolver import get_default_resolver
+
+
+def holding_key(stock_name: str, quantity: int, purchase_date) -> tuple:
+    """
+    The inputs a built holding depends on, dates are compared by day
+    """
+    if isinstance(purchase_date, (datetime.date, datetime.datetime)):
+        purchase_date = purchase_date.strftime("%Y-%m-%d")
+    return stock_name, int(quantity), purchase_date
+
+
+def portfolio_key(holdings: list) -> str:
+    """
+    Hash of the ordered [(stock_name, quantity, purchase_date)] inputs
+    """
+    digest = hashlib.sha256()
+    for holding in holdings:
+        digest.update(repr(holding_key(*holding)).encode())
+    return digest.hexdigest()
+
+
+class PortfolioStateCache:
+    """
+    Keeps the last built Portfolio and its stocks by holding inputs. An
+    unchanged input list returns the same Portfolio, otherwise only the
+    holdings whose ticker, shares or purchase date changed are rebuilt
+    """
+
+    def __init__(self, price_source: QuoteSnapshot = None):
+        self.price_source = price_source
+        self._key = None
+        self._portfolio = None
+        self._stocks = {}
+
+    def seed(self, portfolio: Portfolio) -> None:
+        """
+        Registers already built stocks, e.g. a portfolio opened from the database
+        """
+        for stock in portfolio.stocks.values():
+            self._stocks[holding_key(stock.stock_name, stock.owned_quantity, stock.purchase_date)] = stock
+
+    def _build_stocks(self, holdings: list) -> None:
+        price_source = self.price_source if self.price_source is not None else get_default_snapshot()
+        # one batched quote pull and one history window for the changed holdings only
+        price_source.refresh([stock_name for stock_name, _, _ in holdings])
+        get_default_resolver().prime([(stock_name, purchase_date)
+                                      for stock_name, _, purchase_date in holdings])
+        for stock_name, quantity, purchase_date in holdings:
+            stock = Stock(stock_name=stock_name, price_source=self.price_source)
+            stock.add_buy_action(quantity=int(quantity), purchase_date=purchase_date)
+            self._stocks[holding_key(stock_name, quantity, purchase_date)] = stock
+
+    def get_portfolio(self, holdings: list) -> Portfolio:
+        """
+        Portfolio for the ordered [(stock_name, quantity, purchase_date)] holdings
+        """
+        key = portfolio_key(holdings)
+        if key == self._key:
+            return self._portfolio
+
+        changed = [holding for holding in holdings if holding_key(*holding) not in self._stocks]
+        if changed:
+            self._build_stocks(changed)
+
+        portfolio = Portfolio()
+        for holding in holdings:
+            portfolio.add_stock(stock=self._stocks[holding_key(*holding)])
+
+        # drop stocks no longer part of the inputs
+        keys = {holding_key(*holding) for holding in holdings}
+        self._stocks = {stock_key: stock for stock_key, stock in self._stocks.items() if stock_key in keys}
+        self._key = key
+        self._portfolio = portfolio
+        return portfolio
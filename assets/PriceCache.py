@@ -0,0 +1,422 @@
+import datetime
+import sqlite3
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import yfinance
+
+
+DEFAULT_CACHE_PATH = "price_cache.db"
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
+
+# upper bound on concurrent source requests for multi-ticker fetches
+MAX_FETCH_WORKERS = 8
+
+# seconds a fetch touching the current session is trusted for
+INTRADAY_TTL = 5 * 60
+DAILY_TTL = 60 * 60
+
+# relative difference between a cached and a refetched close that means the
+# adjusted history was rebased (split or dividend)
+ADJUSTMENT_RTOL = 1e-4
+
+
+class YFinanceSource:
+    """
+    Live data source, the only place the cache talks to the network
+    """
+
+    @staticmethod
+    def history(ticker: str, period: str = None, interval: str = "1d",
+                start=None, end=None) -> pd.DataFrame:
+        return yfinance.Ticker(ticker).history(period=period, interval=interval,
+                                               start=start, end=end)
+
+    @staticmethod
+    def download(tickers: list, start=None, end=None, interval: str = "1d") -> dict:
+        data = yfinance.download(tickers, start=start, end=end, interval=interval,
+                                 auto_adjust=True, group_by="ticker", progress=False)
+        if not isinstance(data.columns, pd.MultiIndex):
+            return {tickers[0]: data}
+        return {ticker: data[ticker] for ticker in tickers
+                if ticker in data.columns.get_level_values(0)}
+
+
+class SyntheticSource:
+    """
+    Offline, deterministic random-walk data source for tests and benchmarks.
+    Every ticker gets its own reproducible daily path, so repeated or
+    overlapping requests return identical bars.
+    """
+
+    def __init__(self, seed: int = 0, start_price: float = 100.0,
+                 daily_vol: float = 0.02, epoch: str = "2000-01-03"):
+        self.seed = seed
+        self.start_price = start_price
+        self.daily_vol = daily_vol
+        self.epoch = pd.Timestamp(epoch)
+        self.calls = []
+        self._paths = {}
+
+    def _daily_path(self, ticker: str) -> pd.DataFrame:
+        if ticker not in self._paths:
+            # weekdays, same as bdate_range without its per-day offset arithmetic
+            dates = pd.date_range(self.epoch, pd.Timestamp.today().normalize(), freq="D")
+            dates = dates[dates.dayofweek < 5]
+            rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+            returns = rng.normal(0.0003, self.daily_vol, size=len(dates))
+            close = self.start_price * np.cumprod(1 + returns)
+            open_ = close / (1 + returns)
+            spread = np.abs(rng.normal(0, self.daily_vol / 2, size=len(dates))) * close
+            self._paths[ticker] = pd.DataFrame({
+                "Open": open_,
+                "High": np.maximum(open_, close) + spread,
+                "Low": np.minimum(open_, close) - spread,
+                "Close": close,
+                "Volume": rng.integers(1_000_000, 10_000_000, size=len(dates)).astype(np.float64)
+            }, index=dates)
+        return self._paths[ticker]
+
+    def _intraday(self, ticker: str, day: pd.Timestamp, interval: str) -> pd.DataFrame:
+        daily = self._daily_path(ticker).loc[day]
+        minutes = int(interval.rstrip("mh")) * (60 if interval.endswith("h") else 1)
+        index = pd.date_range(day + pd.Timedelta(hours=9, minutes=30),
+                              day + pd.Timedelta(hours=16), freq=f"{minutes}min",
+                              inclusive="left", tz="America/New_York")
+        close = np.linspace(daily["Open"], daily["Close"], len(index) + 1)
+        return pd.DataFrame({
+            "Open": close[:-1],
+            "High": np.maximum(close[:-1], close[1:]),
+            "Low": np.minimum(close[:-1], close[1:]),
+            "Close": close[1:],
+            "Volume": np.full(len(index), daily["Volume"] / len(index))
+        }, index=index)
+
+    def history(self, ticker: str, period: str = None, interval: str = "1d",
+                start=None, end=None) -> pd.DataFrame:
+        self.calls.append((ticker, period, interval, start, end))
+        daily = self._daily_path(ticker)
+        if start is None and end is None:
+            days = {"1d": 1, "5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252,
+                    "2y": 504, "5y": 1260, "10y": 2520}.get(period, len(daily))
+            selected = daily.iloc[-days:]
+        else:
+            start = pd.Timestamp(start) if start is not None else daily.index[0]
+            end = pd.Timestamp(end) if end is not None else daily.index[-1] + pd.Timedelta(days=1)
+            selected = daily[(daily.index >= start) & (daily.index < end)]
+
+        if interval in INTRADAY_INTERVALS:
+            frames = [self._intraday(ticker, day, interval) for day in selected.index]
+            return pd.concat(frames) if frames else pd.DataFrame(columns=BAR_COLUMNS)
+        return selected.copy()
+
+    def download(self, tickers: list, start=None, end=None, interval: str = "1d") -> dict:
+        return {ticker: self.history(ticker, interval=interval, start=start, end=end)
+                for ticker in tickers}
+
+
+class PriceCache:
+    """
+    Persistent SQLite cache of OHLCV bars keyed by (ticker, interval, timestamp).
+
+    Range requests only fetch the date gaps not already covered. Coverage that
+    ends before the fetch day is immutable history and never expires, coverage
+    reaching the current session expires after the interval's TTL. Period
+    requests (e.g. period="1d") are snapshots trusted for the same TTL.
+
+    Bars are split and dividend adjusted, so a corporate action rebases all
+    earlier bars. Every gap fetch reaches back to the last cached bar before
+    it, and a refetched bar that disagrees with the cache drops the ticker's
+    cached bars and coverage, the requested range is then fetched again.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, source=None,
+                 intraday_ttl: int = INTRADAY_TTL, daily_ttl: int = DAILY_TTL):
+        self.source = source if source is not None else YFinanceSource()
+        self.intraday_ttl = intraday_ttl
+        self.daily_ttl = daily_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS bars (
+                    ticker TEXT, interval TEXT, ts TEXT, tz TEXT,
+                    open REAL, high REAL, low REAL, close REAL, volume REAL,
+                    PRIMARY KEY (ticker, interval, ts)
+                );
+                CREATE TABLE IF NOT EXISTS coverage (
+                    ticker TEXT, interval TEXT, start TEXT, end TEXT, fetched_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS coverage_key ON coverage (ticker, interval);
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    ticker TEXT, interval TEXT, period TEXT,
+                    first_ts TEXT, last_ts TEXT, fetched_at REAL,
+                    PRIMARY KEY (ticker, interval, period)
+                );
+            """)
+
+    def _ttl(self, interval: str) -> int:
+        return self.intraday_ttl if interval in INTRADAY_INTERVALS else self.daily_ttl
+
+    @staticmethod
+    def _now() -> datetime.datetime:
+        return datetime.datetime.now()
+
+    @staticmethod
+    def _normalise(data: pd.DataFrame, interval: str) -> pd.DataFrame:
+        data = data.reindex(columns=BAR_COLUMNS).dropna(how="all")
+        index = pd.DatetimeIndex(data.index)
+        # daily and longer bars are calendar dates, drop the exchange timezone
+        if interval not in INTRADAY_INTERVALS and index.tz is not None:
+            index = index.tz_localize(None)
+        data.index = index
+        return data[~data.index.duplicated(keep="last")]
+
+    @staticmethod
+    def _day_bounds(start, end) -> tuple:
+        start = pd.Timestamp(start).tz_localize(None).normalize() if start is not None \
+            else pd.Timestamp("1970-01-01")
+        if end is None:
+            end = pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+        else:
+            end = pd.Timestamp(end).tz_localize(None)
+            end = end.normalize() if end == end.normalize() \
+                else end.normalize() + pd.Timedelta(days=1)
+        return start, end
+
+    def _store(self, ticker: str, interval: str, data: pd.DataFrame) -> None:
+        if len(data) == 0:
+            return
+        tz = "" if data.index.tz is None else str(data.index.tz)
+        local = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        rows = [(ticker, interval, ts.isoformat(sep=" "), tz, *values)
+                for ts, values in zip(local, data[BAR_COLUMNS].itertuples(index=False, name=None))]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                   rows)
+
+    def _load(self, ticker: str, interval: str, first_ts: str, last_ts: str,
+              inclusive_end: bool = False) -> pd.DataFrame:
+        end_op = "<=" if inclusive_end else "<"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT ts, tz, open, high, low, close, volume FROM bars "
+                f"WHERE ticker = ? AND interval = ? AND ts >= ? AND ts {end_op} ? ORDER BY ts",
+                (ticker, interval, first_ts, last_ts)).fetchall()
+        data = pd.DataFrame([row[2:] for row in rows], columns=BAR_COLUMNS, dtype=np.float64)
+        index = pd.DatetimeIndex(pd.to_datetime([row[0] for row in rows]))
+        if rows and rows[0][1]:
+            index = index.tz_localize(rows[0][1], ambiguous="NaT", nonexistent="NaT")
+        data.index = index
+        return data
+
+    def _missing_ranges(self, ticker: str, interval: str,
+                        start: pd.Timestamp, end: pd.Timestamp) -> list:
+        now = self._now()
+        settled_before = pd.Timestamp(now.date()) - pd.Timedelta(days=1)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start, end, fetched_at FROM coverage WHERE ticker = ? AND interval = ?",
+                (ticker, interval)).fetchall()
+
+        covered = []
+        for cov_start, cov_end, fetched_at in rows:
+            cov_start, cov_end = pd.Timestamp(cov_start), pd.Timestamp(cov_end)
+            fetched_day = pd.Timestamp(datetime.datetime.fromtimestamp(fetched_at).date())
+            settled = cov_end <= min(settled_before, fetched_day - pd.Timedelta(days=1))
+            if settled or now.timestamp() - fetched_at < self._ttl(interval):
+                covered.append((cov_start, cov_end))
+
+        gaps = []
+        cursor = start
+        for cov_start, cov_end in sorted(covered):
+            if cov_end <= cursor:
+                continue
+            if cov_start >= end:
+                break
+            if cov_start > cursor:
+                gaps.append((cursor, cov_start))
+            cursor = max(cursor, cov_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def _record_coverage(self, ticker: str, interval: str,
+                         start: pd.Timestamp, end: pd.Timestamp) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM coverage WHERE ticker = ? AND interval = ? AND start >= ? AND end <= ?",
+                (ticker, interval, str(start.date()), str(end.date())))
+            self._conn.execute("INSERT INTO coverage VALUES (?, ?, ?, ?, ?)",
+                               (ticker, interval, str(start.date()), str(end.date()),
+                                self._now().timestamp()))
+
+    @staticmethod
+    def _is_covered_by(data: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> bool:
+        # an empty answer is also what a network error or throttling looks like, it
+        # only counts as coverage for a gap without any weekday in it
+        if len(data) > 0:
+            return True
+        days = pd.date_range(start, end, freq="D", inclusive="left")
+        return not (days.dayofweek < 5).any()
+
+    def _overlap_start(self, ticker: str, interval: str, gap_start: pd.Timestamp) -> pd.Timestamp:
+        # day of the last cached bar before the gap, refetched to check the adjustment basis
+        with self._lock:
+            last_ts = self._conn.execute(
+                "SELECT MAX(ts) FROM bars WHERE ticker = ? AND interval = ? AND ts < ?",
+                (ticker, interval, str(gap_start.date()))).fetchone()[0]
+        if last_ts is None:
+            return gap_start
+        return max(pd.Timestamp(last_ts).normalize(), gap_start - pd.Timedelta(days=7))
+
+    def _matches_cache(self, ticker: str, interval: str, data: pd.DataFrame) -> bool:
+        if len(data) == 0:
+            return True
+        local = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        cached = self._load(ticker, interval, local[0].isoformat(sep=" "),
+                            local[-1].isoformat(sep=" "), inclusive_end=True)
+        if len(cached) == 0:
+            return True
+        cached_index = cached.index.tz_localize(None) if cached.index.tz is not None else cached.index
+        cached_close = pd.Series(cached["Close"].to_numpy(), index=cached_index)
+        fetched_close = pd.Series(data["Close"].to_numpy(), index=local)
+        common = cached_close.index.intersection(fetched_close.index)
+        return bool(np.allclose(fetched_close[common], cached_close[common],
+                                rtol=ADJUSTMENT_RTOL, equal_nan=True))
+
+    def _invalidate(self, ticker: str, interval: str) -> None:
+        with self._lock, self._conn:
+            for table in ("bars", "coverage", "snapshots"):
+                self._conn.execute(f"DELETE FROM {table} WHERE ticker = ? AND interval = ?",
+                                   (ticker, interval))
+
+    def _store_fetched(self, ticker: str, interval: str, data: pd.DataFrame) -> bool:
+        """
+        Stores fetched bars, dropping the cached ones first when they were
+        adjusted on another basis. Returns True if the cache was dropped
+        """
+        rebased = not self._matches_cache(ticker, interval, data)
+        if rebased:
+            self._invalidate(ticker, interval)
+        self._store(ticker, interval, data)
+        return rebased
+
+    def _range_history(self, ticker: str, interval: str, start, end) -> pd.DataFrame:
+        start, end = self._day_bounds(start, end)
+        # a second pass refetches what a rebase dropped
+        for _ in range(2):
+            rebased = False
+            for gap_start, gap_end in self._missing_ranges(ticker, interval, start, end):
+                fetch_start = self._overlap_start(ticker, interval, gap_start)
+                data = self._normalise(self.source.history(ticker, interval=interval,
+                                                           start=fetch_start.strftime("%Y-%m-%d"),
+                                                           end=gap_end.strftime("%Y-%m-%d")),
+                                       interval)
+                rebased = self._store_fetched(ticker, interval, data) or rebased
+                if self._is_covered_by(data, fetch_start, gap_end):
+                    self._record_coverage(ticker, interval, fetch_start, gap_end)
+            if not rebased:
+                break
+        return self._load(ticker, interval, str(start.date()), str(end.date()))
+
+    def _period_history(self, ticker: str, period: str, interval: str,
+                        max_age: float = None) -> pd.DataFrame:
+        ttl = self._ttl(interval) if max_age is None else max_age
+        with self._lock:
+            snapshot = self._conn.execute(
+                "SELECT first_ts, last_ts, fetched_at FROM snapshots "
+                "WHERE ticker = ? AND interval = ? AND period = ?",
+                (ticker, interval, period)).fetchone()
+        if snapshot is not None and snapshot[0] is not None \
+                and self._now().timestamp() - snapshot[2] < ttl:
+            return self._load(ticker, interval, snapshot[0], snapshot[1], inclusive_end=True)
+
+        data = self._normalise(self.source.history(ticker, period=period, interval=interval),
+                               interval)
+        # an empty answer may be a transient failure, it is not kept as a snapshot
+        if len(data) == 0:
+            return data
+        self._store_fetched(ticker, interval, data)
+        local = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        first_ts = local[0].isoformat(sep=" ")
+        last_ts = local[-1].isoformat(sep=" ")
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?)",
+                               (ticker, interval, period, first_ts, last_ts,
+                                self._now().timestamp()))
+        return data
+
+    def history(self, ticker: str, period: str = "1mo", interval: str = "1d",
+                start=None, end=None, max_age: float = None) -> pd.DataFrame:
+        """
+        Same contract as yfinance.Ticker.history, start/end take precedence over period.
+        max_age (seconds) overrides the interval's TTL for period snapshots
+        """
+        if start is None and end is None:
+            return self._period_history(ticker, period, interval, max_age)
+        return self._range_history(ticker, interval, start, end)
+
+    def history_many(self, tickers: list, period: str = "1mo", interval: str = "1d",
+                     start=None, end=None, max_workers: int = MAX_FETCH_WORKERS,
+                     max_age: float = None) -> tuple:
+        """
+        Fetches every ticker concurrently on a bounded thread pool.
+        Returns ({ticker: bars}, {ticker: error message}), a failing ticker
+        never aborts the others
+        """
+        def fetch(ticker: str) -> pd.DataFrame:
+            return self.history(ticker, period=period, interval=interval, start=start, end=end,
+                                max_age=max_age)
+
+        frames, failures = {}, {}
+        unique_tickers = list(dict.fromkeys(tickers))
+        if not unique_tickers:
+            return frames, failures
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_tickers))) as executor:
+            futures = {ticker: executor.submit(fetch, ticker) for ticker in unique_tickers}
+        for ticker, future in futures.items():
+            try:
+                frames[ticker] = future.result()
+            except Exception as e:
+                failures[ticker] = str(e)
+        return frames, failures
+
+    def download(self, tickers: list, start=None, end=None,
+                 interval: str = "1d") -> pd.DataFrame:
+        """
+        Multi-ticker range request, tickers sharing the same gaps are fetched in
+        one batched source call. Returns (field, ticker) columns like yfinance.download
+        """
+        start, end = self._day_bounds(start, end)
+        # a second pass refetches what a rebase dropped
+        for _ in range(2):
+            pending = {}
+            for ticker in tickers:
+                for gap_start, gap_end in self._missing_ranges(ticker, interval, start, end):
+                    fetch_start = self._overlap_start(ticker, interval, gap_start)
+                    pending.setdefault((fetch_start, gap_end), []).append(ticker)
+
+            rebased = False
+            for (gap_start, gap_end), gap_tickers in pending.items():
+                fetched = self.source.download(gap_tickers,
+                                               start=gap_start.strftime("%Y-%m-%d"),
+                                               end=gap_end.strftime("%Y-%m-%d"),
+                                               interval=interval)
+                for ticker in gap_tickers:
+                    # a ticker left out of the answer failed, it is fetched again next time
+                    if ticker not in fetched:
+                        continue
+                    data = self._normalise(fetched[ticker], interval)
+                    rebased = self._store_fetched(ticker, interval, data) or rebased
+                    if self._is_covered_by(data, gap_start, gap_end):
+                        self._record_coverage(ticker, interval, gap_start, gap_end)
+            if not rebased:
+                break
+
+        frames = {ticker: self._load(ticker, interval, str(start.date()), str(end.date()))
+                  for ticker in tickers}
+        return pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
@@ -0,0 +1,77 @@
+import datetime
+import pandas as pd
+from assets.Collector import InfoCollector
+
+
+# calendar days searched back from the purchase date for the last close
+MAX_LOOKBACK_DAYS = 5
+
+
+class PurchasePriceResolver:
+    """
+    Resolves purchase prices (assumed to be the close on or before the
+    purchase date) with one batched history window for all requested
+    purchases. Found prices are memoized for the lifetime of the resolver,
+    missing ones are fetched again on the next request
+    """
+
+    def __init__(self, max_lookback_days: int = MAX_LOOKBACK_DAYS):
+        self.max_lookback_days = max_lookback_days
+        self._prices = {}
+
+    @staticmethod
+    def _key(stock_name: str, purchase_date) -> tuple:
+        return stock_name, pd.Timestamp(purchase_date).tz_localize(None).normalize()
+
+    def _as_of(self, closes: pd.Series, purchase_date: pd.Timestamp):
+        # last trading day on or before the purchase date, within the lookback
+        position = closes.index.searchsorted(purchase_date, side="right") - 1
+        if position < 0:
+            return None
+        if closes.index[position] <= purchase_date - pd.Timedelta(days=self.max_lookback_days):
+            return None
+        return float(closes.iloc[position])
+
+    def prime(self, purchases: list) -> None:
+        """
+        purchases : list
+            (stock_name, purchase_date) pairs, fetched as one window covering all of them
+        """
+        pending = list(dict.fromkeys(self._key(stock_name, purchase_date)
+                                     for stock_name, purchase_date in purchases))
+        pending = [key for key in pending if key not in self._prices]
+        if not pending:
+            return
+
+        stock_names = list(dict.fromkeys(stock_name for stock_name, _ in pending))
+        dates = [purchase_date for _, purchase_date in pending]
+        start_time = min(dates) - pd.Timedelta(days=self.max_lookback_days)
+        end_time = max(dates) + datetime.timedelta(days=1)
+        closes = InfoCollector.download_batch_history(stock_names, start_time, end_time)['Close']
+
+        for stock_name, purchase_date in pending:
+            # a missing ticker or close may be a failed download, it stays unresolved
+            if stock_name not in closes.columns:
+                continue
+            purchase_price = self._as_of(closes[stock_name].dropna(), purchase_date)
+            if purchase_price is not None:
+                self._prices[(stock_name, purchase_date)] = purchase_price
+
+    def resolve(self, stock_name: str, purchase_date) -> float:
+        key = self._key(stock_name, purchase_date)
+        if key not in self._prices:
+            self.prime([key])
+        purchase_price = self._prices.get(key)
+        if purchase_price is None:
+            raise Exception("Purchase price not found, please check the date or stock sticker")
+        return purchase_price
+
+
+_default_resolver = None
+
+
+def get_default_resolver() -> PurchasePriceResolver:
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = PurchasePriceResolver()
+    return _default_resolver
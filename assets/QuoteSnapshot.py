@@ -0,0 +1,78 @@
+import time
+from assets.Collector import InfoCollector
+
+
+# seconds a quote is reused before it is fetched again
+DEFAULT_MAX_AGE = 60.0
+# seconds before a failed fetch is tried again
+DEFAULT_RETRY_AFTER = 5.0
+
+
+class Quote:
+
+    def __init__(self, date, open_price: float, close_price: float, volume: float):
+        self.date = date
+        self.open = open_price
+        self.close = close_price
+        self.volume = volume
+
+
+class QuoteSnapshot:
+    """
+    Latest daily quote per stock, shared by every Stock and Portfolio using it.
+    Quotes younger than max_age are served from memory, stale ones are
+    refetched together in one batched pull. A failed fetch keeps the last good
+    quote, if any, and is retried after retry_after seconds
+    """
+
+    def __init__(self, max_age: float = DEFAULT_MAX_AGE, retry_after: float = DEFAULT_RETRY_AFTER):
+        self.max_age = max_age
+        self.retry_after = retry_after
+        self._quotes = {}
+        self._fetched_at = {}
+        self._failed_at = {}
+
+    def _is_fresh(self, stock_name: str) -> bool:
+        now = time.monotonic()
+        failed_at = self._failed_at.get(stock_name)
+        if failed_at is not None:
+            return now - failed_at < self.retry_after
+        fetched_at = self._fetched_at.get(stock_name)
+        return fetched_at is not None and now - fetched_at < self.max_age
+
+    def refresh(self, stock_names: list) -> None:
+        stale = [name for name in dict.fromkeys(stock_names) if not self._is_fresh(name)]
+        if not stale:
+            return
+
+        # the price cache may not serve its period snapshot for longer than max_age
+        stocks_info, _ = InfoCollector.get_batch_history(stale, period="1d", interval="1d",
+                                                         max_age=self.max_age)
+        fetched_at = time.monotonic()
+        for stock_name in stale:
+            stock_info = stocks_info.get(stock_name)
+            if stock_info is None or len(stock_info) == 0:
+                # invalid or unavailable, may be transient so only for retry_after
+                self._failed_at[stock_name] = fetched_at
+                continue
+            self._quotes[stock_name] = Quote(
+                date=InfoCollector.get_prev_date(stock_info),
+                open_price=InfoCollector.get_daily_info(stock_info, "Open"),
+                close_price=InfoCollector.get_daily_info(stock_info, "Close"),
+                volume=InfoCollector.get_daily_info(stock_info, "Volume"))
+            self._fetched_at[stock_name] = fetched_at
+            self._failed_at.pop(stock_name, None)
+
+    def get_quote(self, stock_name: str) -> Quote:
+        self.refresh([stock_name])
+        return self._quotes.get(stock_name)
+
+
+_default_snapshot = None
+
+
+def get_default_snapshot() -> QuoteSnapshot:
+    global _default_snapshot
+    if _default_snapshot is None:
+        _default_snapshot = QuoteSnapshot()
+    return _default_snapshot
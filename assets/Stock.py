@@ -1,83 +1,91 @@
 import datetime
 from assets.Collector import InfoCollector
+from assets.QuoteSnapshot import QuoteSnapshot, get_default_snapshot
+from assets.PurchasePriceResolver import get_default_resolver
 
 
 class Stock:
 
-    def __init__(self, stock_name: str):
+    __slots__ = ("stock_name", "_ticker", "price_source", "owned_quantity", "average_price",
+                 "purchase_date", "previous_close", "previous_open", "previous_volume", "previous_date")
+
+    def __init__(self, stock_name: str, price_source: QuoteSnapshot = None,
+                 validate: bool = True):
         self.stock_name = stock_name
-        self.ticker = InfoCollector.get_ticker(stock_name)
+        self._ticker = None
+        self.price_source = price_source if price_source is not None else get_default_snapshot()
         self.owned_quantity = 0
         self.average_price = 0
+        self.purchase_date = None
         self.previous_close = None
         self.previous_open = None
         self.previous_volume = None
         self.previous_date = None
 
-        self._update_stock()
+        if validate:
+            self.refresh_quote()
+
+    @classmethod
+    def from_holding(cls, stock_name: str, quantity: int, average_price: float,
+                     purchase_date: datetime.date = None, price_source: QuoteSnapshot = None):
+        """
+        Rebuilds an owned stock from stored values, skipping the validation
+        and purchase price lookups. Prices are fetched on the next valuation
+        """
+        stock = cls(stock_name, price_source=price_source, validate=False)
+        stock.owned_quantity = quantity
+        stock.average_price = average_price
+        stock.purchase_date = purchase_date
+        return stock
+
+    @property
+    def ticker(self):
+        # the yfinance Ticker is only created when something asks for it
+        if self._ticker is None:
+            self._ticker = InfoCollector.get_ticker(self.stock_name)
+        return self._ticker
 
     def __eq__(self, other):
         if self.stock_name == other.stock_name:
             return True
         return False
 
-    def _update_stock(self) -> None:
+    def refresh_quote(self) -> None:
         """
         Updates the stock information, used as a check function to check if
-        stock exist
+        stock exist. Served from the price source while its quote is fresh
         """
-        stock_info = InfoCollector.get_history(self.ticker, period="1d")
-        if len(stock_info) == 0:
+        quote = self.price_source.get_quote(self.stock_name)
+        if quote is None:
             raise Exception("Invalid stock, enter a valid stock")
         else:
-            self.previous_date = InfoCollector.get_prev_date(stock_info)
-            self.previous_open = InfoCollector.get_daily_info(stock_info, "Open")
-            self.previous_close = InfoCollector.get_daily_info(stock_info, "Close")
-            self.previous_volume = InfoCollector.get_daily_info(stock_info, "Volume")
+            self.previous_date = quote.date
+            self.previous_open = quote.open
+            self.previous_close = quote.close
+            self.previous_volume = quote.volume
 
     def _get_purchase_price(self, purchase_date: datetime.datetime) -> float:
         """
         Gets the purchase price (assumed be closed price) of the stock based
-        on given date if price at given date not found, track back for 5 days,
-        thought: smart implementation might be required for caching
+        on given date if price at given date not found, track back for 5 days.
+        Resolved from one cached history window, see PurchasePriceResolver
         """
-        time_delta = datetime.timedelta(days=1)
-        start_date = purchase_date
-        end_date = purchase_date + time_delta
-
-        for _ in range(5):
-            info = InfoCollector.get_history(self.ticker,
-                                             start=start_date,
-                                             end=end_date)
-            if len(info) > 0:
-                purchased_price = InfoCollector.get_daily_info(info, "Close")
-                return purchased_price
-            start_date = start_date - time_delta
-            end_date = end_date - time_delta
-
-        raise Exception("Purchase price not found, please check the date or stock sticker")
+        return get_default_resolver().resolve(self.stock_name, purchase_date)
 
     def add_buy_action(self, quantity: int,
                        purchase_date: datetime.datetime) -> None:
         """
-        Add a purchase to the stock. Currently, do not support to add another
-        purchase to the stock
+        Add a purchase to the stock. Repeat purchases are averaged into the
+        average price, weighted by quantity
         """
+        # resolved first, a failed lookup leaves the position unchanged
+        cur_purchase_price = self._get_purchase_price(purchase_date=purchase_date)
 
-        # update own quantity
-
+        # update average price and owned_quantity
+        total_cost = self.owned_quantity * self.average_price + quantity * cur_purchase_price
         self.owned_quantity += quantity
-
-        if self.average_price == 0:
-
-            self.average_price = self._get_purchase_price(purchase_date=purchase_date)
-        else:
-            cur_purchase_price = self._get_purchase_price(purchase_date=purchase_date)
-            purchase_cost = quantity * cur_purchase_price
-
-            # update average price and owned_quantity
-            total_cost = purchase_cost + cur_purchase_price
-            self.average_price = total_cost / self.owned_quantity
+        self.average_price = total_cost / self.owned_quantity
+        self.purchase_date = purchase_date
 
     def get_book_cost(self) -> float:
         if self.owned_quantity == 0:
@@ -89,7 +97,7 @@ class Stock:
         return self.average_price * self.owned_quantity
 
     def get_market_value(self) -> float:
-        self._update_stock()
+        self.refresh_quote()
         if self.owned_quantity == 0:
             raise Exception("Stock not owned, please purchase first")
 
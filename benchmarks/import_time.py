@@ -0,0 +1,59 @@
+"""
+Reports the cold import cost of every module the app loads at startup.
+
+Each module is imported in a fresh interpreter so times are not shared
+through sys.modules. Run from the repository root:
+
+    python benchmarks/import_time.py [--repeat 3] [module ...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "numpy", "pandas", "yfinance", "plotly.graph_objects", "streamlit",
+    "sklearn", "tensorflow",
+    "stTools", "side_bar", "default_page", "portfolio_page", "model_page",
+    "models.MonteCarloSimulator", "models.forecasting",
+]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMER = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def time_import(module: str, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", TIMER.format(module=module)],
+                                cwd=REPO_ROOT, capture_output=True, text=True)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            return [error[-1] if error else "import failed"]
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'module':<30} {'best (s)':>10} {'mean (s)':>10}")
+    for module in args.modules:
+        timings = time_import(module, args.repeat)
+        if isinstance(timings[0], str):
+            print(f"{module:<30} {'-':>10} {'-':>10}  {timings[0]}")
+            continue
+        print(f"{module:<30} {min(timings):>10.3f} {sum(timings) / len(timings):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
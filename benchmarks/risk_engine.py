@@ -0,0 +1,138 @@
+"""
+Times the risk engine and data layer hot paths on an offline price feed.
+
+Prices come from the deterministic SyntheticSource through an in-memory
+PriceCache, so runs need no network and are comparable across machines and
+commits. Each case reports the best wall time over --repeat runs, a
+throughput figure and the tracemalloc peak of one extra run. Run from the
+repository root:
+
+    python benchmarks/risk_engine.py
+    python benchmarks/risk_engine.py --assets 5 50 --simulations 1000 100000 --days 30 250
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assets.Collector import InfoCollector
+from assets.PriceCache import PriceCache, SyntheticSource
+from assets.Portfolio import Portfolio
+from assets.Stock import Stock
+from assets.QuoteSnapshot import QuoteSnapshot
+from models import FittedReturnModel
+from models.MonteCarloSimulator import Monte_Carlo_Simulator
+
+HISTORY_DAYS = 365
+ALPHA = 0.05
+
+
+def measure(function, repeat: int) -> tuple:
+    """
+    (best seconds over repeat runs, peak traced MiB of one more run)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak / 2 ** 20
+
+
+def report(case: str, params: str, seconds: float, peak_mib: float,
+           units: float, unit_name: str) -> None:
+    throughput = f"{units / seconds:,.0f} {unit_name}/s" if seconds > 0 else "-"
+    print(f"{case:<24} {params:<28} {seconds * 1000:>10.2f} {throughput:>24} {peak_mib:>10.1f}")
+
+
+def build_portfolio(tickers: list, price_source: QuoteSnapshot) -> Portfolio:
+    portfolio = Portfolio()
+    purchase_date = datetime.date.today() - datetime.timedelta(days=30)
+    for i, ticker in enumerate(tickers):
+        portfolio.add_stock(Stock.from_holding(ticker, 10 + i % 90, 50.0 + i % 50,
+                                               purchase_date, price_source=price_source))
+    return portfolio
+
+
+def bench_assets(no_assets: int, simulation_counts: list, horizons: list, repeat: int) -> None:
+    tickers = [f"SYN{i:04d}" for i in range(no_assets)]
+    end_time = datetime.date.today()
+    start_time = end_time - datetime.timedelta(days=HISTORY_DAYS)
+    # warm the cache, every case below measures compute on cached bars
+    InfoCollector.download_batch_history(tickers, start_time, end_time)
+    price_source = QuoteSnapshot()
+    price_source.refresh(tickers)
+    portfolio = build_portfolio(tickers, price_source)
+
+    seconds, peak = measure(portfolio.update_market_value, repeat)
+    report("portfolio valuation", f"assets={no_assets}", seconds, peak, no_assets, "positions")
+
+    monte_carlo_model = Monte_Carlo_Simulator(cVaR_alpha=ALPHA, VaR_alpha=ALPHA)
+
+    def get_portfolio() -> None:
+        # a cold fit, not the fitted model LRU
+        FittedReturnModel._fitted_models.clear()
+        monte_carlo_model.get_portfolio(portfolio, start_time, end_time)
+
+    seconds, peak = measure(get_portfolio, repeat)
+    report("get_portfolio", f"assets={no_assets}", seconds, peak, no_assets, "assets")
+
+    for no_simulations in simulation_counts:
+        for no_days in horizons:
+            params = f"assets={no_assets} sims={no_simulations} days={no_days}"
+            seconds, peak = measure(lambda: monte_carlo_model.apply_monte_carlo(
+                no_simulations=no_simulations, no_days=no_days, seed=0), repeat)
+            report("apply_monte_carlo", params, seconds, peak, no_simulations * no_days, "path-days")
+
+            def risk_metrics() -> None:
+                # metrics are memoized per run, measure the computation
+                monte_carlo_model._risk_metrics = {}
+                monte_carlo_model.get_VaR(ALPHA)
+                monte_carlo_model._risk_metrics = {}
+                monte_carlo_model.get_conditional_VaR(ALPHA)
+
+            seconds, peak = measure(risk_metrics, repeat)
+            report("get_VaR + get_cVaR", params, seconds, peak, no_simulations, "paths")
+
+
+def bench_stocks_dataframe(no_assets: int, repeat: int) -> None:
+    try:
+        # Streamlit calls only warn outside `streamlit run`
+        import stTools as tools
+    except ImportError as e:
+        print(f"{'create_stocks_dataframe':<24} skipped: {e}")
+        return
+
+    tickers = [f"SYN{i:04d}" for i in range(no_assets)]
+    seconds, peak = measure(lambda: tools.create_stocks_dataframe(tickers, tickers), repeat)
+    report("create_stocks_dataframe", f"assets={no_assets}", seconds, peak, no_assets, "rows")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assets", type=int, nargs="+", default=[5, 30])
+    parser.add_argument("--simulations", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic price feed")
+    args = parser.parse_args()
+
+    InfoCollector.set_price_cache(PriceCache(path=":memory:", source=SyntheticSource(seed=args.seed)))
+
+    print(f"{'case':<24} {'params':<28} {'best (ms)':>10} {'throughput':>24} {'peak (MiB)':>10}")
+    for no_assets in args.assets:
+        bench_assets(no_assets, args.simulations, args.days, args.repeat)
+        bench_stocks_dataframe(no_assets, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# puts the repository root on sys.path so tests import assets/ and models/ like the app does
@@ -1,7 +1,37 @@
 # db_connection.py
 
+import os
 import sqlite3
+import threading
 
-def get_db_connection():
-    conn = sqlite3.connect('users.db',check_same_thread=False)  # Replace with your actual database name
-    return conn
+DEFAULT_DB_PATH = 'portfolios.db'
+
+# path -> (pid, connection, lock), one connection per process is reused by every caller
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def _get_entry(path: str) -> tuple:
+    with _connections_lock:
+        entry = _connections.get(path)
+        # a connection inherited through fork must not be shared with the parent
+        if entry is None or entry[0] != os.getpid():
+            conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            entry = (os.getpid(), conn, threading.Lock())
+            _connections[path] = entry
+        return entry
+
+
+def get_db_connection(path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """
+    The process-wide WAL connection to the database at path. Streamlit runs
+    sessions on threads, guard multi-statement work with get_db_lock
+    """
+    return _get_entry(path)[1]
+
+
+def get_db_lock(path: str = DEFAULT_DB_PATH) -> threading.Lock:
+    return _get_entry(path)[2]
@@ -31,81 +31,47 @@ def load_page():
         "S&P 500": "^GSPC"
     }
 
+    indian_sectors = {
+        "Technology (Indian)": (["TCS.NS", "INFY.NS", "WIPRO.NS", "HCLTECH.NS", "TECHM.NS"],
+                                ["TCS", "Infosys", "Wipro", "HCL Technologies", "Tech Mahindra"]),
+        "Banking (Indian)": (["ICICIBANK.NS", "HDFCBANK.NS", "SBIN.NS", "AXISBANK.NS", "KOTAKBANK.NS"],
+                             ["ICICI Bank", "HDFC Bank", "State Bank of India", "Axis Bank", "Kotak Mahindra Bank"]),
+        "Meme Stocks (Indian)": (["RELIANCE.NS", "TATAMOTORS.NS", "ADANIGREEN.NS", "SUZLON.NS", "VEDL.NS"],
+                                 ["Reliance Industries", "Tata Motors", "Adani Green", "Suzlon", "Vedanta"])
+    }
+
+    us_sectors = {
+        "Technology (U.S.)": (["AAPL", "MSFT", "AMZN", "GOOG", "META", "TSLA", "NVDA", "NFLX"],
+                              ["Apple", "Microsoft", "Amazon", "Google", "Meta", "Tesla", "Nvidia", "Netflix"]),
+        "Banking (U.S.)": (['JPM', 'BAC', 'WFC', 'GS', 'MS', 'C', 'USB', 'PNC'],
+                           ['JPMorgan', 'BoA', 'Wells Fargo', 'Goldman Sachs', 'Morgan Stanley', 'Citigroup', 'U.S. Bancorp', 'PNC']),
+        "Meme Stocks (U.S.)": (["GME", "AMC", "BB", "NOK", "RIVN", "SPCE", "F", "T"],
+                               ["GameStop", "AMC Entertainment", "BlackBerry", "Nokia", "Rivian", "Virgin Galactic", "Ford", "AT&T"])
+    }
+
     # Define the columns for the stock previews
-    col_stock1, col_stock_2, col_stock_3 = st.columns(3)
+    index_columns = st.columns(3)
 
     if market_choice == "Indian Stock Market":
         st.subheader("Market Preview - Indian Stock Market")
-        with col_stock1:
-            tools.create_candle_stick_plot(stock_ticker_name=indian_stocks["Nifty 50"], stock_name="Nifty 50")
-    
-        with col_stock_2:
-            tools.create_candle_stick_plot(stock_ticker_name=indian_stocks["Sensex"], stock_name="Sensex")
-    
-        with col_stock_3:
-            tools.create_candle_stick_plot(stock_ticker_name=indian_stocks["Bank Nifty"], stock_name="Bank Nifty")
-
-        # Define the columns for the sector views (Indian market sectors)
-        col_sector1, col_sector2, col_sector3 = st.columns(3)
-
-        # Technology sector for Indian market
-        with col_sector1:
-            st.subheader(f"Technology (Indian)")
-            stock_list = ["TCS.NS", "INFY.NS", "WIPRO.NS", "HCLTECH.NS", "TECHM.NS"]
-            stock_name = ["TCS", "Infosys", "Wipro", "HCL Technologies", "Tech Mahindra"]
-            df_stocks = tools.create_stocks_dataframe(stock_list, stock_name)
-            tools.create_dateframe_view(df_stocks)
-
-        # Banking sector for Indian market
-        with col_sector2:
-            st.subheader(f"Banking (Indian)")
-            stock_list = ["ICICIBANK.NS", "HDFCBANK.NS", "SBIN.NS", "AXISBANK.NS", "KOTAKBANK.NS"]
-            stock_name = ["ICICI Bank", "HDFC Bank", "State Bank of India", "Axis Bank", "Kotak Mahindra Bank"]
-            df_stocks = tools.create_stocks_dataframe(stock_list, stock_name)
-            tools.create_dateframe_view(df_stocks)
-
-        # Meme Stocks sector for Indian market
-        with col_sector3:
-            st.subheader(f"Meme Stocks (Indian)")
-            stock_list = ["RELIANCE.NS", "TATAMOTORS.NS", "ADANIGREEN.NS", "SUZLON.NS", "VEDL.NS"]
-            stock_name = ["Reliance Industries", "Tata Motors", "Adani Green", "Suzlon", "Vedanta"]
-            df_stocks = tools.create_stocks_dataframe(stock_list, stock_name)
-            tools.create_dateframe_view(df_stocks)
-
-    elif market_choice == "U.S. Stock Market":
+        market_indices, market_sectors = indian_stocks, indian_sectors
+    else:
         st.subheader("Market Preview - U.S. Stock Market")
-        with col_stock1:
-            tools.create_candle_stick_plot(stock_ticker_name=us_stocks["Dow Jones Industrial"], stock_name="Dow Jones Industrial")
-    
-        with col_stock_2:
-            tools.create_candle_stick_plot(stock_ticker_name=us_stocks["Nasdaq Composite"], stock_name="Nasdaq Composite")
-    
-        with col_stock_3:
-            tools.create_candle_stick_plot(stock_ticker_name=us_stocks["S&P 500"], stock_name="S&P 500")
-
-        # Define the columns for the sector views (U.S. market sectors)
-        col_sector1, col_sector2, col_sector3 = st.columns(3)
-
-        # Technology sector for U.S. market
-        with col_sector1:
-            st.subheader(f"Technology (U.S.)")
-            stock_list = ["AAPL", "MSFT", "AMZN", "GOOG", "META", "TSLA", "NVDA", "NFLX"]
-            stock_name = ["Apple", "Microsoft", "Amazon", "Google", "Meta", "Tesla", "Nvidia", "Netflix"]
+        market_indices, market_sectors = us_stocks, us_sectors
+
+    # fetch every ticker on the page at once before drawing anything
+    page_tickers = list(market_indices.values())
+    for stock_list, _ in market_sectors.values():
+        page_tickers += stock_list
+    tools.prefetch_market_data(page_tickers)
+
+    for column, (index_name, index_ticker) in zip(index_columns, market_indices.items()):
+        with column:
+            tools.create_candle_stick_plot(stock_ticker_name=index_ticker, stock_name=index_name)
+
+    # Define the columns for the sector views
+    for column, (sector_name, (stock_list, stock_name)) in zip(st.columns(3), market_sectors.items()):
+        with column:
+            st.subheader(sector_name)
             df_stocks = tools.create_stocks_dataframe(stock_list, stock_name)
             tools.create_dateframe_view(df_stocks)
-
-        # Banking sector for U.S. market
-        with col_sector2:
-            st.subheader(f"Banking (U.S.)")
-            stock_list = ['JPM', 'BAC', 'WFC', 'GS', 'MS', 'C', 'USB', 'PNC']
-            stock_name = ['JPMorgan', 'BoA', 'Wells Fargo', 'Goldman Sachs', 'Morgan Stanley', 'Citigroup', 'U.S. Bancorp', 'PNC']
-            df_stocks = tools.create_stocks_dataframe(stock_list, stock_name)
-            tools.create_dateframe_view(df_stocks)
-
-        # Meme Stocks sector for U.S. market
-        with col_sector3:
-            st.subheader(f"Meme Stocks (U.S.)")
-            stock_list = ["GME", "AMC", "BB", "NOK", "RIVN", "SPCE", "F", "T"]
-            stock_name = ["GameStop", "AMC Entertainment", "BlackBerry", "Nokia", "Rivian", "Virgin Galactic", "Ford", "AT&T"]
-            df_stocks = tools.create_stocks_dataframe(stock_list, stock_name)
-            tools.create_dateframe_view(df_stocks)
\ No newline at end of file
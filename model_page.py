@@ -1,8 +1,21 @@
+import json
+import time
+import numpy as np
 import streamlit as st
 import stTools as tools
-from models.MonteCarloSimulator import Monte_Carlo_Simulator
+from models.MonteCarloSimulator import Monte_Carlo_Simulator, MAX_SOBOL_DIMENSIONS, sobol_supported
+from models.JobQueue import get_default_queue, DONE, FAILED
 import model_page_components
 
+# above this many simulations the run is a streaming monte_carlo job on the JobQueue
+STREAMING_SIMULATIONS_THRESHOLD = 10_000
+# days the streaming mode keeps a value sketch for, the term structure covers every day otherwise
+TERM_STRUCTURE_HORIZONS = (1, 5, 10, 20, 30, 60, 90, 120, 180, 250)
+# horizons listed in the term structure table
+TERM_STRUCTURE_TABLE_DAYS = (1, 10, 30)
+# seconds between two polls of a running simulation job
+JOB_POLL_SECONDS = 1.0
+
 
 def load_page() -> None:
     my_portfolio = st.session_state.my_portfolio
@@ -12,52 +25,162 @@ def load_page() -> None:
     monte_carlo_model.get_portfolio(portfolio=my_portfolio,
                                     start_time=st.session_state.start_date,
                                     end_time=st.session_state.end_date)
-    monte_carlo_model.apply_monte_carlo(no_simulations=int(st.session_state.no_simulations),
-                                        no_days=int(st.session_state.no_days))
+    no_days = int(st.session_state.no_days)
+    VaR_alpha = float(st.session_state.VaR_alpha)
+    cVaR_alpha = float(st.session_state.cVaR_alpha)
 
     model_page_components.add_markdown()
 
-    col1, col2 = st.columns(2)
-
+    # delta-normal figures fill the cards at once, the Monte Carlo ones replace them when ready
+    parametric_metrics = monte_carlo_model.get_parametric_risk_metrics(no_days, [VaR_alpha, cVaR_alpha])
+    parametric_VaR = round(parametric_metrics[VaR_alpha][0], 1)
+    parametric_cVaR = round(parametric_metrics[cVaR_alpha][1], 1)
 
+    col1, col2 = st.columns(2)
     with col1:
         st.subheader("Simulation Return 1")
-        VaR_alpha_formatted = tools.format_currency(monte_carlo_model.
-                                                    get_VaR(st.session_state.VaR_alpha))
-        tools.create_metric_card(label=f"Day {st.session_state.no_days} with VaR Factored in",
-                                 value=VaR_alpha_formatted,
-                                 delta=None)
-
+        VaR_card = st.empty()
     with col2:
         st.subheader("Simulation Return 2")
-
-        cVaR_alpha_formatted = tools.format_currency(monte_carlo_model.
-                                                     get_conditional_VaR(st.session_state.cVaR_alpha))
-        tools.create_metric_card(label=f"Day {st.session_state.no_days} with CVaR Factored in",
-                                 value=cVaR_alpha_formatted,
-                                 delta=None)
+        cVaR_card = st.empty()
 
     # add portfolio VaR and CVaR Info
     var_col1, var_col2 = st.columns(2)
     with var_col1:
         st.subheader("Portfolio VaR")
-
-        actual_var = monte_carlo_model.get_VaR(st.session_state.VaR_alpha) - my_portfolio.book_amount
-        VaR_alpha_formatted = tools.format_currency(actual_var)
-        tools.create_metric_card(label=f"Day {st.session_state.no_days} with VaR(alpha-{st.session_state.VaR_alpha})",
-                                 value=VaR_alpha_formatted,
-                                 delta=None)
-
+        actual_VaR_card = st.empty()
     with var_col2:
         st.subheader("Portfolio cVaR")
-        actual_cvar = monte_carlo_model.get_conditional_VaR(st.session_state.cVaR_alpha) - my_portfolio.book_amount
-        cVaR_alpha_formatted = tools.format_currency(actual_cvar)
-        tools.create_metric_card(label=f"Day {st.session_state.no_days} with cVaR(alpha-{st.session_state.cVaR_alpha})",
-                                 value=cVaR_alpha_formatted,
-                                 delta=None)
+        actual_cVaR_card = st.empty()
+    caption = st.empty()
+
+    def fill_cards(VaR: float, cVaR: float, delta_of=None) -> None:
+        # delta_of, the delta-normal (VaR, cVaR) the shown figures are compared with
+        deltas = (None, None) if delta_of is None else \
+            (f"{VaR - delta_of[0]:+,.2f} vs delta-normal", f"{cVaR - delta_of[1]:+,.2f} vs delta-normal")
+        model_page_components.add_metric_card(VaR_card, f"Day {no_days} with VaR Factored in",
+                                              tools.format_currency(VaR), deltas[0])
+        model_page_components.add_metric_card(cVaR_card, f"Day {no_days} with CVaR Factored in",
+                                              tools.format_currency(cVaR), deltas[1])
+        model_page_components.add_metric_card(actual_VaR_card,
+                                              f"Day {no_days} with VaR(alpha-{st.session_state.VaR_alpha})",
+                                              tools.format_currency(VaR - my_portfolio.book_amount), deltas[0])
+        model_page_components.add_metric_card(actual_cVaR_card,
+                                              f"Day {no_days} with cVaR(alpha-{st.session_state.cVaR_alpha})",
+                                              tools.format_currency(cVaR - my_portfolio.book_amount), deltas[1])
 
-    st.subheader(f"Portfolio Returns after {st.session_state.no_simulations} Simulations")
-    model_page_components.add_portfolio_returns_graphs(monte_carlo_model.portfolio_returns)
+    fill_cards(parametric_VaR, parametric_cVaR)
+    caption.caption("Delta-normal estimate, the Monte Carlo simulation is running...")
+
+    no_simulations = int(st.session_state.no_simulations)
+    sampler = st.session_state.get("sampler", "pseudo")
+    if sampler == "sobol" and not sobol_supported(no_days, len(my_portfolio.stocks)):
+        st.warning(f"Sobol sampling supports up to {MAX_SOBOL_DIMENSIONS:,} days x assets, "
+                   f"using pseudo-random draws instead")
+        sampler = "pseudo"
+    engine_kwargs = {"engine": st.session_state.get("engine", "gaussian"),
+                     "block_length": int(st.session_state.get("block_length", 1) or 1)}
+    alphas = [VaR_alpha, cVaR_alpha]
+    ci_tolerance = float(st.session_state.get("ci_tolerance", 0) or 0)
+    if ci_tolerance > 0:
+        # run until VaR and CVaR are known to within ci_tolerance dollars
+        monte_carlo_model.apply_monte_carlo_adaptive(no_days=no_days,
+                                                     alphas=alphas,
+                                                     tolerance=ci_tolerance,
+                                                     time_budget=float(st.session_state.get("time_budget", 10)),
+                                                     horizons=TERM_STRUCTURE_HORIZONS,
+                                                     sampler=sampler, **engine_kwargs)
+        summary = monte_carlo_model.get_summary(alphas)
+    elif no_simulations > STREAMING_SIMULATIONS_THRESHOLD:
+        # long runs go to the job queue, the script thread only polls
+        holdings = my_portfolio.holdings
+        summary = get_simulation_job_summary(
+            {"book_costs": dict(zip(holdings.tickers, holdings.book_costs().tolist())),
+             "start": st.session_state.start_date,
+             "end": st.session_state.end_date,
+             "no_simulations": no_simulations,
+             "no_days": no_days,
+             "alphas": alphas,
+             "horizons": list(TERM_STRUCTURE_HORIZONS),
+             "sampler": sampler,
+             **engine_kwargs},
+            caption)
+        if summary is None:
+            return
+    else:
+        monte_carlo_model.apply_monte_carlo(no_simulations=no_simulations,
+                                            no_days=no_days,
+                                            sampler=sampler, **engine_kwargs)
+        summary = monte_carlo_model.get_summary(alphas)
+
+    # one reduction over the terminal values serves every metric on the page
+    VaR = round(summary["risk_metrics"][0][0], 1)
+    cVaR = round(summary["risk_metrics"][1][1], 1)
+    fill_cards(VaR, cVaR, delta_of=(parametric_VaR, parametric_cVaR))
+
+    engine_label = "Bootstrap" if summary["engine"] == "bootstrap" else f"{summary['sampler'].capitalize()} sampling"
+    caption.caption(f"{engine_label}, standard error "
+                    f"VaR ±{tools.format_currency(summary['standard_errors'][0][0])}, "
+                    f"CVaR ±{tools.format_currency(summary['standard_errors'][1][1])}")
+    if summary["adaptive_summary"] is not None:
+        adaptive_summary = summary["adaptive_summary"]
+        stop_reasons = {"converged": "tolerance reached",
+                        "time_budget": "time budget spent",
+                        "max_simulations": "simulation cap reached"}
+        st.caption(f"Adaptive run used {adaptive_summary['no_simulations']:,} paths in "
+                   f"{adaptive_summary['seconds']:.1f}s, {stop_reasons[adaptive_summary['stop_reason']]} "
+                   f"(CI width {tools.format_currency(adaptive_summary['ci_width'])})")
+
+    # VaR and CVaR at every horizon of the same run
+    st.subheader("Risk Term Structure")
+    # a job's summary holds lists, an in-process one arrays, asarray copies neither twice
+    term_structure_days = np.asarray(summary["term_structure_days"])
+    term_structure_VaR = np.asarray(summary["term_structure"][0][0])
+    term_structure_cVaR = np.asarray(summary["term_structure"][1][1])
+    model_page_components.add_term_structure_graph(days=term_structure_days,
+                                                   bands=np.asarray(summary["fan_bands"]),
+                                                   VaR=term_structure_VaR,
+                                                   cVaR=term_structure_cVaR)
+    model_page_components.add_term_structure_table(days=term_structure_days,
+                                                   VaR=term_structure_VaR,
+                                                   cVaR=term_structure_cVaR,
+                                                   book_amount=my_portfolio.book_amount,
+                                                   table_days=TERM_STRUCTURE_TABLE_DAYS)
+
+    st.subheader(f"Portfolio Returns after {summary['no_simulations']} Simulations")
+    if summary["sampler"] == "importance":
+        # the paths are drawn shifted towards losses, unweighted they misstate the distribution
+        st.caption("Importance sampled paths are only meaningful with their likelihood ratios, "
+                   "the path chart and download are not shown for this sampler.")
+        return
+    portfolio_returns = np.asarray(summary["portfolio_returns"])
+    model_page_components.add_portfolio_returns_graphs(portfolio_returns)
 
     # add download button
-    model_page_components.add_download_button(monte_carlo_model.portfolio_returns)
\ No newline at end of file
+    model_page_components.add_download_button(portfolio_returns)
+
+
+def get_simulation_job_summary(job_params: dict, status_slot) -> dict:
+    """
+    Submits a monte_carlo job once per set of parameters and returns its
+    summary when done. Until then the progress is shown in status_slot and
+    the page reruns every JOB_POLL_SECONDS, None is returned on failure
+    """
+    job_key = json.dumps(job_params, sort_keys=True, default=str)
+    simulation_jobs = st.session_state.setdefault("simulation_jobs", {})
+    if job_key not in simulation_jobs:
+        simulation_jobs[job_key] = get_default_queue().submit("monte_carlo", **job_params)
+
+    status = get_default_queue().get_status(simulation_jobs[job_key])
+    if status["status"] == DONE:
+        return status["result"]
+    if status["status"] == FAILED:
+        # forgotten so the next rerun submits it again
+        del simulation_jobs[job_key]
+        status_slot.error(f"Monte Carlo simulation failed: {status['message']}")
+        return None
+
+    status_slot.progress(status["progress"],
+                         text=f"Delta-normal estimate, Monte Carlo {status['message']}")
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
@@ -1,13 +1,50 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
+import plotly.graph_objects as go
 import stTools as tools
+from streamlit_extras.metric_cards import style_metric_cards
+from models.MonteCarloSimulator import DEFAULT_BAND_QUANTILES
 
 
-def add_portfolio_returns_graphs(portfolio_df: pd.DataFrame) -> None:
-    tools.create_line_chart(portfolio_df)
+def add_portfolio_returns_graphs(portfolio_df: pd.DataFrame, max_paths: int = 200) -> None:
+    # only a sample of the simulated paths is drawn, plotting every path stalls the browser
+    tools.create_line_chart(pd.DataFrame(portfolio_df).iloc[:, :max_paths])
     # st.line_chart(portfolio_df, use_container_width=True, height=500, width=250)
 
 
+def add_term_structure_graph(days: np.ndarray, bands: np.ndarray, VaR: np.ndarray,
+                             cVaR: np.ndarray, quantiles: tuple = DEFAULT_BAND_QUANTILES) -> None:
+    fig = go.Figure()
+    # shade between symmetric percentile pairs, outermost first
+    for lower in range(len(quantiles) // 2):
+        upper = len(quantiles) - 1 - lower
+        fig.add_trace(go.Scatter(x=days, y=bands[lower], mode="lines", line=dict(width=0),
+                                 showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=days, y=bands[upper], mode="lines", line=dict(width=0),
+                                 fill="tonexty", fillcolor="rgba(99, 110, 250, 0.2)",
+                                 name=f"{quantiles[lower]:.0%}-{quantiles[upper]:.0%}"))
+    if len(quantiles) % 2 == 1:
+        fig.add_trace(go.Scatter(x=days, y=bands[len(quantiles) // 2], mode="lines", name="Median"))
+    fig.add_trace(go.Scatter(x=days, y=VaR, mode="lines+markers", name="VaR"))
+    fig.add_trace(go.Scatter(x=days, y=cVaR, mode="lines+markers", name="CVaR"))
+    fig.update_layout(margin=dict(l=20, r=20, t=20, b=20),
+                      xaxis_title="Day(s) since purchase",
+                      yaxis_title="Portfolio Value ($)",
+                      hovermode="x unified")
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def add_term_structure_table(days: np.ndarray, VaR: np.ndarray, cVaR: np.ndarray,
+                             book_amount: float, table_days: tuple) -> None:
+    # listed horizons that were simulated, plus the last day
+    rows = [i for i, day in enumerate(days) if day in table_days or i == len(days) - 1]
+    df = pd.DataFrame({"VaR": VaR[rows] - book_amount,
+                       "CVaR": cVaR[rows] - book_amount},
+                      index=pd.Index([f"Day {days[i]}" for i in rows], name="Horizon"))
+    st.dataframe(df.map(tools.format_currency), width=620)
+
+
 def add_download_button(df: pd.DataFrame) -> None:
     # convert my_portfolio_returns ndarray to dataframe
     df = pd.DataFrame(df)
@@ -31,3 +68,9 @@ def add_markdown() -> None:
   protecting your money and aiming for a high score in the financial world.
   """
     )
+
+
+def add_metric_card(placeholder, label: str, value: str, delta: str = None) -> None:
+    # placeholder is an st.empty() slot, drawing again replaces the previous card
+    placeholder.metric(label=label, value=value, delta=delta)
+    style_metric_cards(background_color=tools.get_metric_bg_color())
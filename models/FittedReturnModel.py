@@ -0,0 +1,108 @@
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from assets.Collector import InfoCollector
+from models.RollingMoments import RollingMoments
+
+
+# fitted models kept in memory, least recently used are dropped first
+MAX_CACHED_MODELS = 16
+
+
+class FittedReturnModel:
+    """
+    Daily percentage return model of a set of tickers: mean vector,
+    covariance matrix and its Cholesky factor, all in ticker order
+    """
+
+    def __init__(self, tickers: list, pct_return: pd.DataFrame,
+                 moments: RollingMoments = None):
+        self.tickers = list(tickers)
+        self.pct_return = pct_return[self.tickers]
+        if moments is None:
+            moments = RollingMoments.from_returns(self.pct_return.to_numpy(dtype=np.float64))
+        self.moments = moments
+        self.mean_return = pd.Series(moments.mean, index=self.tickers)
+        self.cov_matrix = pd.DataFrame(moments.covariance(), index=self.tickers, columns=self.tickers)
+        self.chol_factor = np.linalg.cholesky(self.cov_matrix.to_numpy(dtype=np.float64))
+
+
+_fitted_models = OrderedDict()
+
+
+def _incremental_moments(base: FittedReturnModel, tickers: list,
+                         pct_return: pd.DataFrame) -> RollingMoments:
+    """
+    Updates the moments of a cached model to a slid window and/or changed
+    holdings. Returns None when the new window is not a slide of the old one,
+    e.g. rows changed because a new ticker has a shorter history
+    """
+    old_return = base.pct_return
+    kept_rows = old_return.index.intersection(pct_return.index)
+    no_kept = len(kept_rows)
+    common_tickers = [ticker for ticker in base.tickers if ticker in tickers]
+    if no_kept < 2 or not common_tickers:
+        return None
+    # rows may only leave at the front and join at the back
+    if not old_return.index[len(old_return) - no_kept:].equals(kept_rows) \
+            or not pct_return.index[:no_kept].equals(kept_rows):
+        return None
+    if not np.array_equal(old_return.loc[kept_rows, common_tickers].to_numpy(),
+                          pct_return.loc[kept_rows, common_tickers].to_numpy()):
+        return None
+
+    moments = base.moments.copy()
+    for row in old_return.iloc[:len(old_return) - no_kept].to_numpy(dtype=np.float64):
+        moments.remove_observation(row)
+
+    current_tickers = list(base.tickers)
+    for ticker in [ticker for ticker in base.tickers if ticker not in tickers]:
+        moments.remove_asset(current_tickers.index(ticker))
+        current_tickers.remove(ticker)
+
+    for ticker in [ticker for ticker in tickers if ticker not in current_tickers]:
+        moments.add_asset(pct_return.loc[kept_rows, ticker].to_numpy(dtype=np.float64),
+                          window=pct_return.loc[kept_rows, current_tickers].to_numpy(dtype=np.float64))
+        current_tickers.append(ticker)
+
+    for row in pct_return.iloc[no_kept:][current_tickers].to_numpy(dtype=np.float64):
+        moments.add_observation(row)
+
+    moments.reorder([current_tickers.index(ticker) for ticker in tickers])
+    return moments
+
+
+def _model_key(tickers: list, start_time, end_time) -> tuple:
+    return (tuple(tickers),
+            pd.Timestamp(start_time).normalize(),
+            pd.Timestamp(end_time).normalize())
+
+
+def fit_return_model(tickers: list, start_time, end_time) -> FittedReturnModel:
+    """
+    Returns the fitted model for (tickers, start_time, end_time), only
+    downloading and refactoring when that key has not been seen before
+    """
+    key = _model_key(tickers, start_time, end_time)
+    if key in _fitted_models:
+        _fitted_models.move_to_end(key)
+        return _fitted_models[key]
+
+    stocks_data = InfoCollector.download_batch_history(list(tickers), start_time, end_time)
+
+    # Get the closing price of each stock apply dropna()
+    stocks_data = stocks_data['Close'].dropna()
+    pct_return = stocks_data.pct_change().dropna()
+
+    # slide or extend the most recently used compatible model instead of refitting
+    moments = None
+    for base in reversed(_fitted_models.values()):
+        moments = _incremental_moments(base, list(tickers), pct_return)
+        if moments is not None:
+            break
+
+    fitted_model = FittedReturnModel(tickers, pct_return, moments=moments)
+    _fitted_models[key] = fitted_model
+    if len(_fitted_models) > MAX_CACHED_MODELS:
+        _fitted_models.popitem(last=False)
+    return fitted_model
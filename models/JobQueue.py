@@ -0,0 +1,198 @@
+import importlib
+import json
+import multiprocessing
+import sqlite3
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+DEFAULT_JOB_DB = "jobs.db"
+DEFAULT_MAX_WORKERS = 2
+# running jobs touch updated_at this often (seconds), even inside a long epoch
+HEARTBEAT_SECONDS = 30
+# unfinished jobs no live queue owns and not updated for this long (seconds) are failed
+STALE_AFTER = 5 * 60
+
+# job kind -> "module:function", resolved inside the worker process so the
+# Streamlit process never imports TensorFlow for a queued job
+JOB_HANDLERS = {
+    "train_lstm": "models.jobs:train_lstm",
+    "train_forecast": "models.jobs:train_forecast",
+    "monte_carlo": "models.jobs:monte_carlo",
+}
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT, params TEXT, status TEXT,
+            progress REAL, message TEXT, result TEXT,
+            created_at REAL, updated_at REAL
+        )
+    """)
+    return conn
+
+
+def _update(conn: sqlite3.Connection, job_id: int, **fields) -> None:
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with conn:
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+
+def _heartbeat(path: str, job_id: int, stop: threading.Event) -> None:
+    conn = _connect(path)
+    try:
+        while not stop.wait(HEARTBEAT_SECONDS):
+            _update(conn, job_id)
+    finally:
+        conn.close()
+
+
+def _run_job(path: str, job_id: int, handler_name: str, params: dict) -> None:
+    """
+    Executed in a worker process. Handlers are called as handler(params, report)
+    where report(progress, message) records progress in [0, 1] for pollers
+    """
+    conn = _connect(path)
+    _update(conn, job_id, status=RUNNING, progress=0.0, message="started")
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(path, job_id, stop), daemon=True).start()
+
+    def report(progress: float, message: str = None) -> None:
+        _update(conn, job_id, progress=float(progress), message=message)
+
+    try:
+        module_name, function_name = handler_name.split(":")
+        handler = getattr(importlib.import_module(module_name), function_name)
+        result = handler(params, report)
+        _update(conn, job_id, status=DONE, progress=1.0, message="finished",
+                result=json.dumps(result, default=str))
+    except Exception as e:
+        _update(conn, job_id, status=FAILED, message=str(e),
+                result=json.dumps({"traceback": traceback.format_exc()}))
+    finally:
+        stop.set()
+        conn.close()
+
+
+class JobQueue:
+    """
+    Local job executor: jobs run on a process pool, their state lives in a
+    SQLite table so any session (or process) can poll it by id.
+
+    Jobs left unfinished by a dead worker or a previous server process are
+    marked failed: the first by the pool future, the others once their
+    updated_at is older than stale_after
+    """
+
+    def __init__(self, path: str = DEFAULT_JOB_DB, max_workers: int = DEFAULT_MAX_WORKERS,
+                 stale_after: float = STALE_AFTER):
+        self.path = path
+        self.max_workers = max_workers
+        self.stale_after = stale_after
+        self._conn = _connect(path)
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._executor = self._new_executor()
+        self.fail_stale_jobs()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, a forked TensorFlow runtime is not safe to reuse
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def _fail(self, job_ids: list, message: str) -> None:
+        if not job_ids:
+            return
+        with self._lock, self._conn:
+            for job_id in job_ids:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, message = ?, updated_at = ? "
+                    "WHERE id = ? AND status IN (?, ?)",
+                    (FAILED, message, time.time(), job_id, QUEUED, RUNNING))
+
+    def _on_done(self, job_id: int, future) -> None:
+        # _run_job records its own errors, an exception here means the worker died
+        if not future.cancelled() and future.exception() is not None:
+            self._fail([job_id], f"worker process died: {future.exception()}")
+
+    def fail_stale_jobs(self) -> list:
+        """
+        Marks queued or running jobs that no worker of this queue holds and
+        that stopped updating as failed, returns their ids
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (QUEUED, RUNNING, time.time() - self.stale_after)).fetchall()
+            owned = {job_id for job_id, future in self._futures.items() if not future.done()}
+        job_ids = [row[0] for row in rows if row[0] not in owned]
+        self._fail(job_ids, "abandoned, its worker or the server stopped")
+        return job_ids
+
+    def submit(self, kind: str, **params) -> int:
+        if kind not in JOB_HANDLERS:
+            raise Exception(f"Unknown job kind: {kind}")
+        now = time.time()
+        with self._lock, self._conn:
+            job_id = self._conn.execute(
+                "INSERT INTO jobs (kind, params, status, progress, message, created_at, updated_at) "
+                "VALUES (?, ?, ?, 0, 'queued', ?, ?)",
+                (kind, json.dumps(params, default=str), QUEUED, now, now)).lastrowid
+        try:
+            future = self._executor.submit(_run_job, self.path, job_id, JOB_HANDLERS[kind], params)
+        except BrokenProcessPool:
+            # a worker died earlier, the pool refuses new work
+            self._executor = self._new_executor()
+            future = self._executor.submit(_run_job, self.path, job_id, JOB_HANDLERS[kind], params)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda done: self._on_done(job_id, done))
+        return job_id
+
+    def get_status(self, job_id: int) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, params, status, progress, message, result, created_at, updated_at "
+                "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise Exception(f"Job {job_id} not found")
+        if row[3] in (QUEUED, RUNNING) and row[8] < time.time() - self.stale_after \
+                and job_id in self.fail_stale_jobs():
+            return self.get_status(job_id)
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "params": json.loads(row[2]),
+            "status": row[3],
+            "progress": row[4],
+            "message": row[5],
+            "result": json.loads(row[6]) if row[6] else None,
+            "created_at": row[7],
+            "updated_at": row[8],
+        }
+
+    def is_finished(self, job_id: int) -> bool:
+        return self.get_status(job_id)["status"] in (DONE, FAILED)
+
+
+_default_queue = None
+
+
+def get_default_queue() -> JobQueue:
+    global _default_queue
+    if _default_queue is None:
+        _default_queue = JobQueue()
+    return _default_queue
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+import joblib
+from tensorflow.keras.models import load_model
+from models.JobQueue import JobQueue, get_default_queue, QUEUED, RUNNING, FAILED
+
+
+MODEL_DIR = "models"
+# trained artifacts older than this are retrained
+MAX_MODEL_AGE_DAYS = 7
+# name of the model models/batch_train.py --mode shared fits on a whole watchlist
+SHARED_MODEL_NAME = "shared"
+
+
+class ModelRegistry:
+    """
+    Load-or-train registry of per-ticker LSTM models and their scalers.
+
+    Artifacts use the same names as models/train_model.py
+    (lstm_model_{ticker}.h5, scaler_{ticker}.joblib), so models trained there
+    are picked up too. A ticker without its own model falls back to the shared
+    model of models/batch_train.py (lstm_model_shared.h5 with
+    scaler_shared_{ticker}.joblib). Missing or stale models are trained as a
+    job on the JobQueue and loaded from disk once the job is done
+    """
+
+    def __init__(self, job_kind: str = "train_forecast", model_dir: str = MODEL_DIR,
+                 max_age_days: float = MAX_MODEL_AGE_DAYS, job_queue: JobQueue = None,
+                 shared_name: str = SHARED_MODEL_NAME):
+        self.job_kind = job_kind
+        self.model_dir = model_dir
+        self.max_age_days = max_age_days
+        self.shared_name = shared_name
+        self._job_queue = job_queue
+        # {path: (mtime, loaded artifact)}, a shared model is loaded once for every ticker
+        self._loaded = {}
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    @property
+    def job_queue(self) -> JobQueue:
+        if self._job_queue is None:
+            self._job_queue = get_default_queue()
+        return self._job_queue
+
+    def model_path(self, ticker: str) -> str:
+        return os.path.join(self.model_dir, f"lstm_model_{ticker}.h5")
+
+    def scaler_path(self, ticker: str) -> str:
+        return os.path.join(self.model_dir, f"scaler_{ticker}.joblib")
+
+    def shared_model_path(self) -> str:
+        return os.path.join(self.model_dir, f"lstm_model_{self.shared_name}.h5")
+
+    def shared_scaler_path(self, ticker: str) -> str:
+        return os.path.join(self.model_dir, f"scaler_{self.shared_name}_{ticker}.joblib")
+
+    def _is_fresh(self, paths: tuple) -> bool:
+        if not all(os.path.exists(path) for path in paths):
+            return False
+        age = time.time() - min(os.path.getmtime(path) for path in paths)
+        return age < self.max_age_days * 24 * 60 * 60
+
+    def _artifact_paths(self, ticker: str) -> tuple:
+        # the ticker's own model first, unless a job is rewriting it, then the shared one
+        candidates = [(self.shared_model_path(), self.shared_scaler_path(ticker))]
+        if not self.is_training(ticker):
+            candidates.insert(0, (self.model_path(ticker), self.scaler_path(ticker)))
+        for paths in candidates:
+            if self._is_fresh(paths):
+                return paths
+        return None
+
+    def _load(self, path: str, loader):
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            if path in self._loaded and self._loaded[path][0] == mtime:
+                return self._loaded[path][1]
+
+        artifact = loader(path)
+        with self._lock:
+            self._loaded[path] = (mtime, artifact)
+        return artifact
+
+    def get(self, ticker: str) -> tuple:
+        """
+        Returns (model, scaler) if a fresh model exists in memory or on disk, else None
+        """
+        paths = self._artifact_paths(ticker)
+        if paths is None:
+            return None
+        model_path, scaler_path = paths
+        return self._load(model_path, load_model), self._load(scaler_path, joblib.load)
+
+    def _job_status(self, ticker: str) -> dict:
+        with self._lock:
+            job_id = self._jobs.get(ticker)
+        return None if job_id is None else self.job_queue.get_status(job_id)
+
+    def load_or_train(self, ticker: str) -> tuple:
+        """
+        Returns (model, scaler) when available, otherwise submits a training
+        job (once per ticker while it runs) and returns None
+        """
+        artifacts = self.get(ticker)
+        if artifacts is not None:
+            return artifacts
+
+        if not self.is_training(ticker):
+            job_id = self.job_queue.submit(self.job_kind, ticker=ticker)
+            with self._lock:
+                self._jobs[ticker] = job_id
+        return None
+
+    def is_training(self, ticker: str) -> bool:
+        status = self._job_status(ticker)
+        return status is not None and status["status"] in (QUEUED, RUNNING)
+
+    def get_progress(self, ticker: str) -> tuple:
+        """
+        (progress in [0, 1], message) of the ticker's latest training job
+        """
+        status = self._job_status(ticker)
+        if status is None:
+            return 0.0, None
+        return status["progress"], status["message"]
+
+    def get_error(self, ticker: str) -> str:
+        status = self._job_status(ticker)
+        if status is None or status["status"] != FAILED:
+            return None
+        return status["message"]
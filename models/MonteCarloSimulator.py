@@ -1,11 +1,344 @@
 import datetime as dt
+import multiprocessing
+import os
+import threading
+import time
+import warnings
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import numpy as np
 from numpy import ndarray
 from assets import Portfolio
-from assets.Collector import InfoCollector
+from models.TerminalEstimators import ExactTerminalEstimator, TDigestEstimator
+from models.FittedReturnModel import fit_return_model
+from models.RiskMetrics import var_cvar, var_cvar_by_day, quantile_bands, delta_normal_var_cvar
 import pandas as pd
 
 
+# upper bound on the number of normal draws held in memory at once
+DEFAULT_CHUNK_ELEMENTS = 4_000_000
+# percentiles of the portfolio value fan chart
+DEFAULT_BAND_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+SAMPLERS = ("pseudo", "antithetic", "sobol", "importance")
+# "gaussian" draws multivariate normal returns, "bootstrap" resamples the fitted history
+ENGINES = ("gaussian", "bootstrap")
+# independent sub-streams per run, standard errors are read from their spread
+DEFAULT_REPLICATES = 10
+# seconds an adaptive run may take before it stops short of its tolerance
+DEFAULT_TIME_BUDGET = 10.0
+# Sobol points are generated in no_days * no_assets dimensions
+MAX_SOBOL_DIMENSIONS = 21201
+# processes of the shared pool, extra shards queue on it
+MAX_POOL_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def sobol_supported(no_days: int, no_assets: int) -> bool:
+    # scipy's Sobol engine has direction numbers for MAX_SOBOL_DIMENSIONS dimensions
+    return no_days * no_assets <= MAX_SOBOL_DIMENSIONS
+
+
+def _draw_normals(rng: np.random.Generator, sampler: str, sobol_engine,
+                  no_paths: int, no_days: int, no_assets: int) -> ndarray:
+    if sampler in ("pseudo", "importance"):
+        return rng.standard_normal(size=(no_paths, no_days, no_assets))
+    if sampler == "antithetic":
+        half = rng.standard_normal(size=((no_paths + 1) // 2, no_days, no_assets))
+        # each path sits next to its mirror so contiguous replicates keep pairs together
+        return np.stack([half, -half], axis=1).reshape(-1, no_days, no_assets)[:no_paths]
+    if sampler == "sobol":
+        from scipy.special import ndtri
+        with warnings.catch_warnings():
+            # balance warning for sample sizes that are not powers of 2
+            warnings.simplefilter("ignore", UserWarning)
+            points = sobol_engine.random(no_paths)
+        points = np.clip(points, np.finfo(np.float64).tiny, 1 - np.finfo(np.float64).eps)
+        return ndtri(points).reshape(no_paths, no_days, no_assets)
+    raise Exception(f"Unknown sampler: {sampler}, use one of {', '.join(SAMPLERS)}")
+
+
+def iter_path_blocks(mean_return: ndarray,
+                     chol_factor: ndarray,
+                     weights: ndarray,
+                     init_cash: float,
+                     no_simulations: int,
+                     no_days: int,
+                     chunk_size: int = None,
+                     rng: np.random.Generator = None,
+                     sampler: str = "pseudo",
+                     tail_shift: float = 0.0):
+    """
+    Yields (paths, likelihood_ratios) blocks, paths of shape (no_days, chunk)
+    hold cumulative portfolio values, likelihood_ratios is None unless
+    sampler is "importance".
+
+    Simulations are drawn in chunks of (chunk, no_days, no_assets) normals so
+    memory stays bounded regardless of no_simulations. Every draw is projected
+    onto the portfolio through L^T w, so the (chunk, no_days, no_assets) daily
+    asset returns never need to be materialised.
+
+    sampler : str
+        "pseudo" plain draws, "antithetic" mirrored pairs Z, -Z,
+        "sobol" scrambled Sobol points through the inverse normal CDF,
+        "importance" draws shifted by tail_shift standard deviations per day
+        towards portfolio losses, reweighted by their likelihood ratio
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    no_assets = len(weights)
+    if chunk_size is None:
+        chunk_size = max(1, DEFAULT_CHUNK_ELEMENTS // max(1, no_days * no_assets))
+    if sampler == "antithetic":
+        chunk_size += chunk_size % 2
+
+    sobol_engine = None
+    if sampler == "sobol":
+        if not sobol_supported(no_days, no_assets):
+            raise Exception(f"Sobol sampling supports up to {MAX_SOBOL_DIMENSIONS} days x assets")
+        from scipy.stats import qmc
+        sobol_engine = qmc.Sobol(d=no_days * no_assets, scramble=True, seed=rng)
+
+    # portfolio daily return = w.mu + (L^T w).Z
+    drift = float(weights @ mean_return)
+    loading = chol_factor.T @ weights
+    loading_norm = float(np.linalg.norm(loading))
+
+    for start in range(0, no_simulations, chunk_size):
+        stop = min(start + chunk_size, no_simulations)
+        Z = _draw_normals(rng, sampler, sobol_engine, stop - start, no_days, no_assets)
+        projected = Z @ loading
+        likelihood_ratios = None
+        if sampler == "importance":
+            # shifting Z by -tail_shift * loading / |loading| moves each day's return down
+            projected -= tail_shift * loading_norm
+            likelihood_ratios = np.exp(tail_shift * projected.sum(axis=1) / loading_norm
+                                       + 0.5 * tail_shift ** 2 * no_days)
+        daily_returns = projected + drift + 1
+        yield (np.cumprod(daily_returns, axis=1) * init_cash).T, likelihood_ratios
+
+
+def simulate_paths(mean_return: ndarray,
+                   chol_factor: ndarray,
+                   weights: ndarray,
+                   init_cash: float,
+                   no_simulations: int,
+                   no_days: int,
+                   chunk_size: int = None,
+                   rng: np.random.Generator = None,
+                   sampler: str = "pseudo") -> ndarray:
+    """
+    Generates cumulative portfolio value paths with shape (no_days, no_simulations).
+    Importance sampled paths need their weights, see iter_path_blocks
+    """
+    if sampler == "importance":
+        raise Exception("Importance sampled paths are weighted, use iter_path_blocks")
+    portfolio_returns = np.empty(shape=(no_days, no_simulations), dtype=np.float64)
+    start = 0
+    for block, _ in iter_path_blocks(mean_return, chol_factor, weights, init_cash,
+                                     no_simulations, no_days, chunk_size, rng, sampler):
+        portfolio_returns[:, start:start + block.shape[1]] = block
+        start += block.shape[1]
+    return portfolio_returns
+
+
+def iter_bootstrap_blocks(history_returns: ndarray,
+                          init_cash: float,
+                          no_simulations: int,
+                          no_days: int,
+                          chunk_size: int = None,
+                          rng: np.random.Generator = None,
+                          block_length: int = 1):
+    """
+    Historical bootstrap counterpart of iter_path_blocks, yields (paths, None).
+
+    history_returns holds the daily portfolio returns of the fitted history,
+    i.e. the pct_change rows projected on the weights once. Resampling whole
+    rows keeps the cross-asset dependence, so only this vector is gathered
+    from. block_length 1 is the i.i.d. bootstrap, longer blocks (circular,
+    random starts) also keep autocorrelation within each block
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    history_returns = np.asarray(history_returns, dtype=np.float64)
+    no_history = len(history_returns)
+    if no_history == 0:
+        raise Exception("No return history to bootstrap from")
+    block_length = max(1, min(int(block_length), no_history))
+    no_blocks = -(-no_days // block_length)
+    if chunk_size is None:
+        chunk_size = max(1, DEFAULT_CHUNK_ELEMENTS // max(1, no_days))
+    offsets = np.arange(block_length)
+
+    for start in range(0, no_simulations, chunk_size):
+        stop = min(start + chunk_size, no_simulations)
+        if block_length == 1:
+            rows = rng.integers(0, no_history, size=(stop - start, no_days))
+        else:
+            block_starts = rng.integers(0, no_history, size=(stop - start, no_blocks, 1))
+            rows = ((block_starts + offsets) % no_history).reshape(stop - start, -1)[:, :no_days]
+        daily_returns = history_returns[rows] + 1
+        yield (np.cumprod(daily_returns, axis=1) * init_cash).T, None
+
+
+def _replicate_sizes(no_simulations: int, replicates: int) -> list:
+    replicates = max(1, min(int(replicates), no_simulations))
+    return [len(part) for part in np.array_split(np.arange(no_simulations), replicates)]
+
+
+def _iter_replicate_blocks(model_inputs: tuple, no_simulations: int, no_days: int,
+                           chunk_size: int, seed: np.random.SeedSequence,
+                           replicates: int, sampler: str, tail_shift: float,
+                           engine: str = "gaussian", block_length: int = 1):
+    """
+    iter_path_blocks (or iter_bootstrap_blocks) over independent sub-streams,
+    one per replicate, each with its own Generator (and Sobol scrambling)
+    spawned from seed
+    """
+    sizes = _replicate_sizes(no_simulations, replicates)
+    seeds = [seed] if len(sizes) == 1 else seed.spawn(len(sizes))
+    for size, replicate_seed in zip(sizes, seeds):
+        rng = np.random.default_rng(replicate_seed)
+        if engine == "bootstrap":
+            yield from iter_bootstrap_blocks(*model_inputs, no_simulations=size, no_days=no_days,
+                                             chunk_size=chunk_size, rng=rng, block_length=block_length)
+        else:
+            yield from iter_path_blocks(*model_inputs, no_simulations=size, no_days=no_days,
+                                        chunk_size=chunk_size, rng=rng,
+                                        sampler=sampler, tail_shift=tail_shift)
+
+
+def _new_terminal_estimator(estimator: str, capacity: int = 0):
+    if estimator == "exact":
+        return ExactTerminalEstimator(capacity=capacity)
+    if estimator == "tdigest":
+        return TDigestEstimator()
+    raise Exception(f"Unknown terminal value estimator: {estimator}")
+
+
+def _simulate_shard(model_inputs: tuple, no_simulations: int, no_days: int,
+                    chunk_size: int, seed: np.random.SeedSequence,
+                    replicates: int = 1, sampler: str = "pseudo", tail_shift: float = 0.0,
+                    engine: str = "gaussian", block_length: int = 1) -> tuple:
+    portfolio_returns = np.empty(shape=(no_days, no_simulations), dtype=np.float64)
+    likelihood_ratios = np.ones(shape=no_simulations) if sampler == "importance" else None
+    start = 0
+    for block, block_ratios in _iter_replicate_blocks(model_inputs, no_simulations, no_days,
+                                                      chunk_size, seed, replicates, sampler, tail_shift,
+                                                      engine, block_length):
+        portfolio_returns[:, start:start + block.shape[1]] = block
+        if block_ratios is not None:
+            likelihood_ratios[start:start + block.shape[1]] = block_ratios
+        start += block.shape[1]
+    return portfolio_returns, likelihood_ratios
+
+
+def _stream_shard(model_inputs: tuple, no_simulations: int, no_days: int,
+                  chunk_size: int, seed: np.random.SeedSequence,
+                  estimator: str, keep_paths: int, horizons: tuple = (),
+                  replicates: int = 1, sampler: str = "pseudo", tail_shift: float = 0.0,
+                  engine: str = "gaussian", block_length: int = 1,
+                  progress_callback=None) -> tuple:
+    terminal_estimator = _new_terminal_estimator(estimator, capacity=no_simulations)
+    # intermediate horizons always use the O(1) memory sketch
+    horizon_estimators = [TDigestEstimator() for _ in horizons]
+    keep_paths = min(keep_paths, no_simulations)
+    sampled_paths = np.empty(shape=(no_days, keep_paths), dtype=np.float64)
+    kept = 0
+
+    for block, likelihood_ratios in _iter_replicate_blocks(model_inputs, no_simulations, no_days,
+                                                           chunk_size, seed, replicates, sampler,
+                                                           tail_shift, engine, block_length):
+        if kept < keep_paths:
+            take = min(keep_paths - kept, block.shape[1])
+            sampled_paths[:, kept:kept + take] = block[:, :take]
+            kept += take
+        terminal_estimator.update(block[-1, :], likelihood_ratios)
+        for day, horizon_estimator in zip(horizons, horizon_estimators):
+            horizon_estimator.update(block[day - 1, :], likelihood_ratios)
+        if progress_callback is not None:
+            progress_callback(terminal_estimator.count / no_simulations)
+    return sampled_paths, terminal_estimator, horizon_estimators
+
+
+def _shard_sizes(no_simulations: int, n_workers: int) -> list:
+    n_workers = max(1, min(int(n_workers), no_simulations))
+    return [len(shard) for shard in np.array_split(np.arange(no_simulations), n_workers)]
+
+
+def _replicate_groups(no_simulations: int, n_workers: int, replicates: int) -> tuple:
+    """
+    (replicates per shard, sizes of the consecutive simulation groups drawn
+    from independent streams), in the order shards are concatenated
+    """
+    shard_sizes = _shard_sizes(no_simulations, n_workers)
+    per_shard = max(1, -(-int(replicates) // len(shard_sizes)))
+    return per_shard, [size for shard_size in shard_sizes
+                       for size in _replicate_sizes(shard_size, per_shard)]
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Pool shared by every sharded run, created once per process. Workers are
+    spawned, forking the multi-threaded Streamlit server can deadlock
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=MAX_POOL_WORKERS,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
+
+
+def _reset_process_pool() -> None:
+    # a pool whose worker died refuses new work, the next run starts a new one
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def _run_shards(worker, n_workers: int, seed, no_simulations: int,
+                progress_callback=None, **kwargs) -> list:
+    """
+    Splits no_simulations into n_workers shards, each drawing from its own
+    Generator spawned from one SeedSequence. Shard sizes and streams only depend
+    on (seed, n_workers), so results are reproducible whether or not a process
+    pool is used.
+
+    progress_callback(fraction) is forwarded to a single in-process worker,
+    with the shared pool (get_process_pool) it is called as shards complete
+    """
+    shard_sizes = _shard_sizes(no_simulations, n_workers)
+    n_workers = len(shard_sizes)
+    seeds = np.random.SeedSequence(seed).spawn(n_workers)
+
+    if n_workers == 1:
+        if progress_callback is not None:
+            kwargs["progress_callback"] = progress_callback
+        return [worker(no_simulations=shard_sizes[0], seed=seeds[0], **kwargs)]
+
+    executor = get_process_pool()
+    futures = [executor.submit(worker, no_simulations=size, seed=shard_seed, **kwargs)
+               for size, shard_seed in zip(shard_sizes, seeds)]
+    try:
+        if progress_callback is not None:
+            completed = 0
+            for future in as_completed(futures):
+                completed += shard_sizes[futures.index(future)]
+                progress_callback(completed / no_simulations)
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        _reset_process_pool()
+        raise
+
+
 class Monte_Carlo_Simulator:
 
     def __init__(self,
@@ -19,72 +352,430 @@ class Monte_Carlo_Simulator:
         self.VaR_alpha = VaR_alpha
         self.pct_mean_return = None
         self.pct_cov_matrix = None
+        self.return_model = None
         self.portfolio_returns = None
+        self.terminal_values = None
+        self.terminal_estimator = None
+        self.horizon_estimators = None
+        self.sampler = "pseudo"
+        self.engine = "gaussian"
+        # importance sampling likelihood ratios of every path (matrix mode) and terminal value
+        self.path_weights = None
+        self.terminal_weights = None
+        self.replicate_sizes = None
+        self.adaptive_summary = None
+        self._risk_metrics = {}
+        self._term_structure = {}
 
     def get_portfolio(self, portfolio: Portfolio,
                       start_time: dt.datetime,
                       end_time: dt.datetime) -> None:
         stocks = list(portfolio.stocks.keys())
-        stocks_data = InfoCollector.download_batch_history(stocks, start_time, end_time)
-
-        # Get the closing price of each stock apply dropna()
-        stocks_data = stocks_data['Close'].dropna()
-
-        pct_return = stocks_data.pct_change().dropna()
-        if isinstance(pct_return, pd.DataFrame):
-            self.pct_mean_return = pct_return.mean()
-            self.pct_cov_matrix = pct_return.cov()
-        else:
-            print("Error: pct_return is not a DataFrame.")
+        # reused across reruns until the tickers or the history window change
+        self.return_model = fit_return_model(stocks, start_time, end_time)
+        self.pct_mean_return = self.return_model.mean_return
+        self.pct_cov_matrix = self.return_model.cov_matrix
 
         self.init_cash = portfolio.book_amount
         self._get_weights(portfolio)
 
+    def get_book_costs(self, book_costs: dict,
+                       start_time: dt.datetime,
+                       end_time: dt.datetime) -> None:
+        """
+        Same as get_portfolio from {ticker: book cost}, for callers without Stock objects
+        """
+        self.return_model = fit_return_model(list(book_costs.keys()), start_time, end_time)
+        self.pct_mean_return = self.return_model.mean_return
+        self.pct_cov_matrix = self.return_model.cov_matrix
+
+        self.init_cash = sum(book_costs.values())
+        self.stocks = {stock: book_cost / self.init_cash for stock, book_cost in book_costs.items()}
+
     def _get_weights(self, portfolio: Portfolio):
-        total_book_cost = 0
-        for stock in portfolio.stocks.keys():
-            self.stocks[stock] = portfolio.stocks[stock].get_book_cost()
-            total_book_cost += self.stocks[stock]
+        # book cost weights in one vectorized pass over the holdings columns
+        self.stocks = dict(zip(portfolio.holdings.tickers, portfolio.holdings.weights()))
 
-        for stock in portfolio.stocks.keys():
-            self.stocks[stock] = self.stocks[stock] / total_book_cost
+    def _get_model_inputs(self) -> tuple:
+        # align mean, covariance and weights on the same ticker order
+        tickers = list(self.stocks.keys())
+        weights = np.array(list(self.stocks.values()), dtype=np.float64)
+        if self.return_model is not None and self.return_model.tickers == tickers:
+            return (self.return_model.mean_return.to_numpy(dtype=np.float64),
+                    self.return_model.chol_factor, weights)
 
-    def apply_monte_carlo(self, no_simulations: int, no_days: int) -> None:
-        # Get weight array
-        weights = list(self.stocks.values())
-        weights = np.array(weights, dtype=np.float64)
+        mean_return = np.asarray(pd.Series(self.pct_mean_return)[tickers], dtype=np.float64)
+        cov_matrix = np.asarray(pd.DataFrame(self.pct_cov_matrix).loc[tickers, tickers],
+                                dtype=np.float64)
+        # Cholesky Decomposition, factored once per simulation run
+        chol_factor = np.linalg.cholesky(cov_matrix)
+        return mean_return, chol_factor, weights
 
-        # get mean matrix
-        mean_matrix = np.full(shape=(no_days, len(weights)), fill_value=self.pct_mean_return)
-        mean_matrix = np.transpose(mean_matrix)
+    def _get_tail_shift(self, no_days: int) -> float:
+        # centre the simulated terminal return on the smallest requested alpha quantile
+        alpha = min(float(self.VaR_alpha), float(self.cVaR_alpha))
+        return -NormalDist().inv_cdf(alpha) / np.sqrt(no_days)
 
-        portfolio_returns = np.zeros(shape=(no_days, no_simulations), dtype=np.float64)
+    def _get_parametric_inputs(self) -> tuple:
+        # same ticker alignment as _get_model_inputs, with the covariance instead of its factor
+        tickers = list(self.stocks.keys())
+        weights = np.array(list(self.stocks.values()), dtype=np.float64)
+        if self.return_model is not None and self.return_model.tickers == tickers:
+            return (self.return_model.mean_return.to_numpy(dtype=np.float64),
+                    self.return_model.cov_matrix.to_numpy(dtype=np.float64), weights)
+        mean_return = np.asarray(pd.Series(self.pct_mean_return)[tickers], dtype=np.float64)
+        cov_matrix = np.asarray(pd.DataFrame(self.pct_cov_matrix).loc[tickers, tickers],
+                                dtype=np.float64)
+        return mean_return, cov_matrix, weights
 
-        for sim in range(0, no_simulations):
-            # Cholesky Decomposition
-            Z = np.random.normal(size=(no_days, len(weights)))
-            L = np.linalg.cholesky(self.pct_cov_matrix)
+    def get_parametric_risk_metrics(self, no_days: int, alphas: list,
+                                    weights: ndarray = None, init_cash=None) -> dict:
+        """
+        Delta-normal {alpha: (VaR, CVaR)} of the portfolio value after no_days,
+        no simulation needed, see RiskMetrics.delta_normal_var_cvar.
 
-            daily_returns = mean_matrix + np.inner(L, Z)
-            portfolio_returns[:, sim] = np.cumprod(np.inner(weights, daily_returns.T) + 1) \
-                                        * self.init_cash
-        self.portfolio_returns = portfolio_returns
+        weights, a (no_portfolios, no_assets) matrix in the order of
+        self.stocks, scans many portfolios over the same fitted returns.
+        init_cash defaults to the book amount of the current portfolio
+        """
+        if self.pct_mean_return is None:
+            raise Exception("Parametric VaR needs the fitted returns, call get_portfolio first")
+        mean_return, cov_matrix, portfolio_weights = self._get_parametric_inputs()
+        return delta_normal_var_cvar(mean_return, cov_matrix,
+                                     portfolio_weights if weights is None else weights,
+                                     self.init_cash if init_cash is None else init_cash,
+                                     no_days, alphas)
 
-    def get_VaR(self, alpha: float) -> int:
-        if self.VaR_alpha is None:
-            self.VaR_alpha = float(alpha)
-        if self.portfolio_returns is None:
+    def _get_engine_inputs(self, engine: str) -> tuple:
+        if engine == "gaussian":
+            return self._get_model_inputs() + (self.init_cash,)
+        if engine == "bootstrap":
+            # same alignment as _get_model_inputs, without a fallback to the fitted moments
+            tickers = list(self.stocks.keys())
+            if self.return_model is None or self.return_model.tickers != tickers:
+                raise Exception("Bootstrap needs the return history of this portfolio, call get_portfolio first")
+            # project every historical row on the weights once, paths only gather from this vector
+            weights = np.array(list(self.stocks.values()), dtype=np.float64)
+            history_returns = self.return_model.pct_return[tickers].to_numpy(dtype=np.float64) @ weights
+            return history_returns, self.init_cash
+        raise Exception(f"Unknown engine: {engine}, use one of {', '.join(ENGINES)}")
+
+    def _get_sampling_kwargs(self, no_simulations: int, no_days: int, n_workers: int,
+                             sampler: str, replicates: int,
+                             engine: str = "gaussian", block_length: int = 1) -> dict:
+        if sampler not in SAMPLERS:
+            raise Exception(f"Unknown sampler: {sampler}, use one of {', '.join(SAMPLERS)}")
+        if engine == "bootstrap" and sampler != "pseudo":
+            raise Exception("Sampling schemes only apply to the gaussian engine")
+        # checked before any shard starts, see sobol_supported
+        if sampler == "sobol" and not sobol_supported(no_days, len(self.stocks)):
+            raise Exception(f"Sobol sampling supports up to {MAX_SOBOL_DIMENSIONS} days x assets")
+        per_shard, self.replicate_sizes = _replicate_groups(no_simulations, n_workers, replicates)
+        self.sampler = sampler
+        self.engine = engine
+        return {"replicates": per_shard, "sampler": sampler,
+                "tail_shift": self._get_tail_shift(no_days) if sampler == "importance" else 0.0,
+                "engine": engine, "block_length": block_length}
+
+    def apply_monte_carlo(self, no_simulations: int, no_days: int,
+                          chunk_size: int = None,
+                          n_workers: int = 1,
+                          seed: int = None,
+                          sampler: str = "pseudo",
+                          replicates: int = DEFAULT_REPLICATES,
+                          engine: str = "gaussian",
+                          block_length: int = 1) -> None:
+        """
+        n_workers : int
+            Number of processes the simulations are sharded across
+        seed : int
+            Root seed, results are bit-reproducible for a given (seed, n_workers)
+        sampler : str
+            One of SAMPLERS, see iter_path_blocks
+        replicates : int
+            Independent streams the simulations are split into, get_standard_errors
+            reads the spread of their estimates
+        engine : str
+            One of ENGINES, "bootstrap" resamples rows of return_model.pct_return,
+            see iter_bootstrap_blocks
+        block_length : int
+            Bootstrap block length in days, 1 for the i.i.d. bootstrap
+        """
+        model_inputs = self._get_engine_inputs(engine)
+        sampling_kwargs = self._get_sampling_kwargs(no_simulations, no_days, n_workers,
+                                                    sampler, replicates, engine, block_length)
+        shards = _run_shards(_simulate_shard, n_workers, seed, no_simulations,
+                             model_inputs=model_inputs, no_days=no_days, chunk_size=chunk_size,
+                             **sampling_kwargs)
+
+        self.no_simulations = no_simulations
+        self.no_days = no_days
+        self.portfolio_returns = shards[0][0] if len(shards) == 1 \
+            else np.concatenate([paths for paths, _ in shards], axis=1)
+        self.path_weights = None if sampler != "importance" \
+            else np.concatenate([ratios for _, ratios in shards])
+        self.terminal_values = self.portfolio_returns[-1, :]
+        self.terminal_weights = self.path_weights
+        self.terminal_estimator = ExactTerminalEstimator()
+        self.terminal_estimator.update(self.terminal_values, self.terminal_weights)
+        self.horizon_estimators = None
+        self.adaptive_summary = None
+        self._risk_metrics = {}
+        self._term_structure = {}
+
+    def apply_monte_carlo_streaming(self, no_simulations: int, no_days: int,
+                                    block_size: int = 10_000,
+                                    estimator: str = "exact",
+                                    keep_paths: int = 100,
+                                    n_workers: int = 1,
+                                    seed: int = None,
+                                    horizons: list = None,
+                                    sampler: str = "pseudo",
+                                    replicates: int = DEFAULT_REPLICATES,
+                                    engine: str = "gaussian",
+                                    block_length: int = 1,
+                                    progress_callback=None) -> None:
+        """
+        Runs the simulation block by block, folding terminal values into a
+        running estimator instead of keeping the (no_days, no_simulations) matrix.
+
+        estimator : str
+            "exact" keeps every terminal value, O(no_simulations) memory
+            "tdigest" keeps an approximate quantile sketch, O(1) memory
+        keep_paths : int
+            Number of full paths kept in portfolio_returns for charting, the first
+            ones drawn. They are an independent sample for pseudo draws and the
+            bootstrap only: antithetic keeps mirrored pairs, Sobol the start of
+            its sequence and importance sampling paths shifted towards losses
+        horizons : list
+            Days before no_days to keep a t-digest of portfolio values for,
+            used by get_term_structure and get_fan_bands
+        sampler, replicates, engine, block_length : see apply_monte_carlo
+        progress_callback : callable
+            Called with the fraction of simulations done
+        """
+        horizons = tuple(sorted({int(day) for day in horizons or () if 1 <= int(day) < no_days}))
+        model_inputs = self._get_engine_inputs(engine)
+        sampling_kwargs = self._get_sampling_kwargs(no_simulations, no_days, n_workers,
+                                                    sampler, replicates, engine, block_length)
+        shards = _run_shards(_stream_shard, n_workers, seed, no_simulations,
+                             progress_callback=progress_callback,
+                             model_inputs=model_inputs, no_days=no_days, chunk_size=block_size,
+                             estimator=estimator, keep_paths=keep_paths, horizons=horizons,
+                             **sampling_kwargs)
+
+        self._set_streaming_results(no_simulations, no_days, estimator, keep_paths, horizons, shards)
+
+    def _set_streaming_results(self, no_simulations: int, no_days: int, estimator: str,
+                               keep_paths: int, horizons: tuple, shards: list) -> None:
+        # merge (sampled paths, terminal estimator, horizon estimators) of every shard in order
+        terminal_estimator = _new_terminal_estimator(estimator, capacity=no_simulations)
+        horizon_estimators = {day: TDigestEstimator() for day in horizons}
+        for _, shard_estimator, shard_horizon_estimators in shards:
+            terminal_estimator.merge(shard_estimator)
+            for day, horizon_estimator in zip(horizons, shard_horizon_estimators):
+                horizon_estimators[day].merge(horizon_estimator)
+        horizon_estimators[no_days] = terminal_estimator
+        sampled_paths = np.concatenate([paths for paths, _, _ in shards], axis=1)
+
+        self.no_simulations = no_simulations
+        self.no_days = no_days
+        self.portfolio_returns = sampled_paths[:, :keep_paths]
+        self.path_weights = None
+        self.terminal_values = terminal_estimator.get_values() if estimator == "exact" else None
+        self.terminal_weights = terminal_estimator.get_weights() if estimator == "exact" else None
+        self.terminal_estimator = terminal_estimator
+        self.horizon_estimators = horizon_estimators
+        self.adaptive_summary = None
+        self._risk_metrics = {}
+        self._term_structure = {}
+
+    def apply_monte_carlo_adaptive(self, no_days: int, alphas: list,
+                                   tolerance: float,
+                                   time_budget: float = DEFAULT_TIME_BUDGET,
+                                   batch_size: int = 10_000,
+                                   max_simulations: int = 1_000_000,
+                                   confidence: float = 0.95,
+                                   min_batches: int = 4,
+                                   keep_paths: int = 100,
+                                   seed: int = None,
+                                   horizons: list = None,
+                                   sampler: str = "pseudo",
+                                   engine: str = "gaussian",
+                                   block_length: int = 1,
+                                   progress_callback=None) -> None:
+        """
+        Simulates batches of batch_size paths until the confidence interval of
+        VaR and CVaR at every alpha is narrower than tolerance, the time budget
+        (seconds) is spent or max_simulations is reached.
+
+        Every batch is an independent stream, the interval is the normal one
+        over the spread of the batch estimates (batch means). The paths used
+        and why the run stopped are kept in adaptive_summary
+        """
+        started = time.perf_counter()
+        alphas = [float(alpha) for alpha in alphas]
+        horizons = tuple(sorted({int(day) for day in horizons or () if 1 <= int(day) < no_days}))
+        model_inputs = self._get_engine_inputs(engine)
+        # one replicate per batch, the batches are the replicates
+        sampling_kwargs = self._get_sampling_kwargs(batch_size, no_days, 1, sampler, 1,
+                                                    engine, block_length)
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        seed_sequence = np.random.SeedSequence(seed)
+
+        shards = []
+        batch_metrics = []
+        no_simulations = 0
+        ci_width = float("inf")
+        stop_reason = "max_simulations"
+        while no_simulations < max_simulations:
+            size = min(batch_size, max_simulations - no_simulations)
+            shard = _stream_shard(model_inputs, no_simulations=size, no_days=no_days,
+                                  chunk_size=batch_size, seed=seed_sequence.spawn(1)[0],
+                                  estimator="exact", keep_paths=max(0, keep_paths - no_simulations),
+                                  horizons=horizons, **sampling_kwargs)
+            shards.append(shard)
+            no_simulations += size
+            metrics = var_cvar(shard[1].get_values(), alphas, shard[1].get_weights())
+            batch_metrics.append([value for alpha in alphas for value in metrics[alpha]])
+
+            # the spread of very few batches is too noisy to stop on
+            if len(batch_metrics) >= max(2, min_batches):
+                standard_errors = np.std(batch_metrics, axis=0, ddof=1) / np.sqrt(len(batch_metrics))
+                ci_width = float(2 * z * standard_errors.max())
+                if ci_width <= tolerance:
+                    stop_reason = "converged"
+                    break
+            elapsed = time.perf_counter() - started
+            if progress_callback is not None:
+                progress_callback(min(1.0, max(no_simulations / max_simulations, elapsed / time_budget)))
+            if elapsed >= time_budget:
+                stop_reason = "time_budget"
+                break
+
+        self.replicate_sizes = [len(shard[1].get_values()) for shard in shards]
+        self._set_streaming_results(no_simulations, no_days, "exact", keep_paths, horizons, shards)
+        self.adaptive_summary = {"no_simulations": no_simulations,
+                                 "no_batches": len(shards),
+                                 "ci_width": ci_width,
+                                 "stop_reason": stop_reason,
+                                 "seconds": time.perf_counter() - started}
+
+    def get_risk_metrics(self, alphas: list) -> dict:
+        """
+        {alpha: (VaR, CVaR)} of the terminal portfolio value, computed in one
+        pass for all alphas not seen yet and memoized until the next run
+        """
+        if self.terminal_estimator is None:
             raise Exception("No Monte Carlo simulation has been applied")
 
-        VaR = round(np.quantile(self.portfolio_returns[-1, :], float(self.VaR_alpha)), 1)
+        missing = [float(alpha) for alpha in alphas if float(alpha) not in self._risk_metrics]
+        if missing:
+            if self.terminal_values is not None:
+                self._risk_metrics.update(var_cvar(self.terminal_values, missing, self.terminal_weights))
+            else:
+                for alpha in missing:
+                    self._risk_metrics[alpha] = (self.terminal_estimator.quantile(alpha),
+                                                 self.terminal_estimator.tail_mean(alpha))
+        return {float(alpha): self._risk_metrics[float(alpha)] for alpha in alphas}
+
+    def get_standard_errors(self, alphas: list) -> dict:
+        """
+        {alpha: (VaR standard error, CVaR standard error)}, the spread of the
+        estimates of the independent replicates divided by sqrt(replicates).
+        NaN with a single replicate
+        """
+        if self.terminal_values is None:
+            raise Exception("Standard errors need every terminal value, use the exact estimator")
+
+        bounds = np.cumsum(self.replicate_sizes)[:-1]
+        value_groups = np.split(self.terminal_values, bounds)
+        weight_groups = np.split(self.terminal_weights, bounds) if self.terminal_weights is not None \
+            else [None] * len(value_groups)
+        estimates = [var_cvar(values, alphas, weights) for values, weights in zip(value_groups, weight_groups)]
+
+        standard_errors = {}
+        for alpha in alphas:
+            if len(estimates) < 2:
+                standard_errors[float(alpha)] = (float("nan"), float("nan"))
+                continue
+            replicate_metrics = np.array([estimate[float(alpha)] for estimate in estimates])
+            standard_errors[float(alpha)] = tuple(
+                float(error) for error in replicate_metrics.std(axis=0, ddof=1) / np.sqrt(len(estimates)))
+        return standard_errors
+
+    def get_summary(self, alphas: list) -> dict:
+        """
+        Everything the model page reads from a run, metrics follow the order
+        of alphas. Arrays are returned as they are, the monte_carlo job
+        converts them to lists for JSON
+        """
+        alphas = [float(alpha) for alpha in alphas]
+        risk_metrics = self.get_risk_metrics(alphas)
+        standard_errors = self.get_standard_errors(alphas) if self.terminal_values is not None \
+            else {alpha: (float("nan"), float("nan")) for alpha in alphas}
+        term_structure = self.get_term_structure(alphas)
+        return {
+            "alphas": alphas,
+            "no_simulations": self.no_simulations,
+            "no_days": self.no_days,
+            "sampler": self.sampler,
+            "engine": self.engine,
+            "risk_metrics": [list(risk_metrics[alpha]) for alpha in alphas],
+            "standard_errors": [list(standard_errors[alpha]) for alpha in alphas],
+            "term_structure_days": self.get_term_structure_days(),
+            "term_structure": [list(term_structure[alpha]) for alpha in alphas],
+            "fan_bands": self.get_fan_bands(),
+            "portfolio_returns": self.portfolio_returns,
+            "adaptive_summary": self.adaptive_summary,
+        }
+
+    def get_VaR(self, alpha: float) -> int:
+        self.VaR_alpha = float(alpha)
+        VaR = round(self.get_risk_metrics([self.VaR_alpha])[self.VaR_alpha][0], 1)
         return VaR
 
     def get_conditional_VaR(self, alpha: float) -> ndarray:
         self.cVaR_alpha = float(alpha)
+        cVaR = round(self.get_risk_metrics([self.cVaR_alpha])[self.cVaR_alpha][1], 1)
+        return cVaR
+
+    def get_term_structure_days(self) -> ndarray:
+        """
+        Days covered by get_term_structure and get_fan_bands
+        """
+        if self.horizon_estimators is not None:
+            return np.array(list(self.horizon_estimators.keys()))
         if self.portfolio_returns is None:
             raise Exception("No Monte Carlo simulation has been applied")
+        return np.arange(1, self.no_days + 1)
+
+    def get_term_structure(self, alphas: list) -> dict:
+        """
+        {alpha: (VaR per day, CVaR per day)} for every day of get_term_structure_days,
+        read from the simulation already run and memoized until the next run
+        """
+        missing = [float(alpha) for alpha in alphas if float(alpha) not in self._term_structure]
+        if missing:
+            if self.horizon_estimators is None:
+                if self.portfolio_returns is None:
+                    raise Exception("No Monte Carlo simulation has been applied")
+                self._term_structure.update(var_cvar_by_day(self.portfolio_returns, missing,
+                                                            self.path_weights))
+            else:
+                for alpha in missing:
+                    self._term_structure[alpha] = (
+                        np.array([estimator.quantile(alpha) for estimator in self.horizon_estimators.values()]),
+                        np.array([estimator.tail_mean(alpha) for estimator in self.horizon_estimators.values()]))
+        return {float(alpha): self._term_structure[float(alpha)] for alpha in alphas}
 
-        var = self.get_VaR(self.cVaR_alpha)
-        cVaR = round(np.mean(self.portfolio_returns[-1, :]
-                                  [self.portfolio_returns[-1, :] < float(var)]),1)
-        return cVaR
\ No newline at end of file
+    def get_fan_bands(self, quantiles: tuple = DEFAULT_BAND_QUANTILES) -> ndarray:
+        """
+        Portfolio value percentiles per day, shape (len(quantiles), len(get_term_structure_days))
+        """
+        if self.horizon_estimators is None:
+            if self.portfolio_returns is None:
+                raise Exception("No Monte Carlo simulation has been applied")
+            return quantile_bands(self.portfolio_returns, quantiles, self.path_weights)
+        return np.array([[estimator.quantile(q) for estimator in self.horizon_estimators.values()]
+                         for q in quantiles])
@@ -0,0 +1,160 @@
+from statistics import NormalDist
+import numpy as np
+from numpy import ndarray
+
+
+def _weighted_var_cvar(sorted_values: ndarray, sorted_weights: ndarray, alphas: list) -> dict:
+    """
+    var_cvar along the last axis of values sorted on that axis, with one
+    importance sampling likelihood ratio per value. Every value sits at the
+    weight below it and VaR is interpolated at alpha * (no_values - 1), so
+    unit weights give np.quantile's linear interpolation. The positions are
+    counted per value, not scaled by the total weight, which is noisy when
+    most weight sits in the rarely sampled body of the distribution. CVaR is
+    the weighted mean below VaR
+    """
+    no_values = sorted_values.shape[-1]
+    positions = np.cumsum(sorted_weights, axis=-1) - sorted_weights
+
+    def at(array: ndarray, index: ndarray) -> ndarray:
+        return np.take_along_axis(array, index[..., None], axis=-1)[..., 0]
+
+    metrics = {}
+    for alpha in alphas:
+        target = float(alpha) * (no_values - 1)
+        k = np.clip((positions <= target).sum(axis=-1) - 1, 0, max(no_values - 2, 0))
+        upper = np.minimum(k + 1, no_values - 1)
+        gap = at(positions, upper) - at(positions, k)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.where(gap > 0, np.clip((target - at(positions, k)) / gap, 0.0, 1.0), 0.0)
+        VaR = at(sorted_values, k) + fraction * (at(sorted_values, upper) - at(sorted_values, k))
+        tail_weights = sorted_weights * (sorted_values < VaR[..., None])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cVaR = (tail_weights * sorted_values).sum(axis=-1) / tail_weights.sum(axis=-1)
+        metrics[float(alpha)] = (VaR, cVaR)
+    return metrics
+
+
+def var_cvar(terminal_values: ndarray, alphas: list, weights: ndarray = None) -> dict:
+    """
+    VaR (alpha quantile, linear interpolation as np.quantile) and CVaR (mean
+    of the values below VaR) for every alpha from a single np.partition pass.
+    With weights the weighted empirical distribution is used instead, which
+    gives the same numbers for unit weights.
+
+    Returns {alpha: (VaR, CVaR)}
+    """
+    values = np.asarray(terminal_values, dtype=np.float64).ravel()
+    no_values = len(values)
+    if no_values == 0:
+        raise Exception("No terminal values to compute VaR from")
+
+    if weights is not None:
+        order = np.argsort(values)
+        metrics = _weighted_var_cvar(values[order], np.asarray(weights, dtype=np.float64)[order], alphas)
+        return {alpha: (float(VaR), float(cVaR)) for alpha, (VaR, cVaR) in metrics.items()}
+
+    alphas = [float(alpha) for alpha in alphas]
+    positions = [(no_values - 1) * alpha for alpha in alphas]
+    lower = [int(np.floor(position)) for position in positions]
+    kth = sorted({min(k + offset, no_values - 1) for k in lower for offset in (0, 1)})
+    partitioned = np.partition(values, kth)
+
+    metrics = {}
+    for alpha, position, k in zip(alphas, positions, lower):
+        upper = min(k + 1, no_values - 1)
+        VaR = partitioned[k] + (position - k) * (partitioned[upper] - partitioned[k])
+        # everything past the upper order statistic is >= VaR, only the head can be in the tail
+        head = partitioned[:upper + 1]
+        tail = head[head < VaR]
+        cVaR = float(tail.mean()) if len(tail) > 0 else float("nan")
+        metrics[alpha] = (float(VaR), cVaR)
+    return metrics
+
+
+def var_cvar_by_day(paths: ndarray, alphas: list, weights: ndarray = None) -> dict:
+    """
+    var_cvar for every day of a (no_days, no_simulations) path matrix, one
+    np.partition pass along the simulation axis for all days and alphas.
+    weights, one per path, need a full sort along that axis instead.
+
+    Returns {alpha: (VaR per day, CVaR per day)}
+    """
+    paths = np.asarray(paths, dtype=np.float64)
+    no_values = paths.shape[1]
+    if no_values == 0:
+        raise Exception("No simulated paths to compute VaR from")
+
+    if weights is not None:
+        order = np.argsort(paths, axis=1)
+        return _weighted_var_cvar(np.take_along_axis(paths, order, axis=1),
+                                  np.asarray(weights, dtype=np.float64)[order], alphas)
+
+    alphas = [float(alpha) for alpha in alphas]
+    positions = [(no_values - 1) * alpha for alpha in alphas]
+    lower = [int(np.floor(position)) for position in positions]
+    kth = sorted({min(k + offset, no_values - 1) for k in lower for offset in (0, 1)})
+    partitioned = np.partition(paths, kth, axis=1)
+
+    metrics = {}
+    for alpha, position, k in zip(alphas, positions, lower):
+        upper = min(k + 1, no_values - 1)
+        VaR = partitioned[:, k] + (position - k) * (partitioned[:, upper] - partitioned[:, k])
+        head = partitioned[:, :upper + 1]
+        in_tail = head < VaR[:, None]
+        no_tail = in_tail.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cVaR = np.where(no_tail > 0, (head * in_tail).sum(axis=1) / no_tail, np.nan)
+        metrics[alpha] = (VaR, cVaR)
+    return metrics
+
+
+def quantile_bands(paths: ndarray, quantiles: list, weights: ndarray = None) -> ndarray:
+    """
+    Percentile fan of a (no_days, no_simulations) path matrix, shape (len(quantiles), no_days)
+    """
+    if weights is not None:
+        metrics = var_cvar_by_day(paths, quantiles, weights)
+        return np.array([metrics[float(q)][0] for q in quantiles])
+    return np.quantile(np.asarray(paths, dtype=np.float64), quantiles, axis=1)
+
+
+def delta_normal_var_cvar(mean_return: ndarray, cov_matrix: ndarray, weights: ndarray,
+                          init_cash, no_days: int, alphas: list) -> dict:
+    """
+    Closed form (delta-normal) counterpart of var_cvar on the terminal value:
+    daily portfolio returns are taken as normal with mean w.mu and variance
+    w'Sw and compounded over no_days as the simulation does, through the
+    log-normal whose daily log return matches their first two moments.
+
+    weights is one weight vector or a (no_portfolios, no_assets) matrix, in
+    which case init_cash may also be one value per portfolio and every
+    portfolio is evaluated in one pass.
+
+    Returns {alpha: (VaR, CVaR)}, floats or arrays over the portfolios
+    """
+    from scipy.special import ndtr
+
+    weights = np.asarray(weights, dtype=np.float64)
+    single = weights.ndim == 1
+    weights = np.atleast_2d(weights)
+    mean_return = np.asarray(mean_return, dtype=np.float64)
+    cov_matrix = np.asarray(cov_matrix, dtype=np.float64)
+    init_cash = np.asarray(init_cash, dtype=np.float64)
+
+    # log(1 + r) to second order around the daily mean
+    daily_mean = weights @ mean_return
+    daily_volatility = np.sqrt(np.einsum("ij,ij->i", weights @ cov_matrix, weights)) / (1 + daily_mean)
+    log_drift = no_days * (np.log1p(daily_mean) - daily_volatility ** 2 / 2)
+    log_volatility = np.sqrt(no_days) * daily_volatility
+
+    standard_normal = NormalDist()
+    metrics = {}
+    for alpha in alphas:
+        z = standard_normal.inv_cdf(float(alpha))
+        VaR = init_cash * np.exp(log_drift + z * log_volatility)
+        # mean of a log-normal below its alpha quantile
+        tail = ndtr(z - log_volatility) / float(alpha)
+        cVaR = init_cash * np.exp(log_drift + log_volatility ** 2 / 2) * tail
+        metrics[float(alpha)] = (float(VaR[0]), float(cVaR[0])) if single else (VaR, cVaR)
+    return metrics
@@ -0,0 +1,88 @@
+import numpy as np
+from numpy import ndarray
+
+
+class RollingMoments:
+    """
+    Welford-style running mean and co-moment matrix of a window of return
+    rows. Observations can be added or removed in O(N^2) and an asset
+    column added in O(T*N), instead of refitting the covariance in O(T*N^2)
+    """
+
+    def __init__(self, no_assets: int):
+        self.count = 0
+        self.mean = np.zeros(shape=no_assets, dtype=np.float64)
+        self.comoment = np.zeros(shape=(no_assets, no_assets), dtype=np.float64)
+
+    @classmethod
+    def from_returns(cls, returns: ndarray) -> "RollingMoments":
+        returns = np.asarray(returns, dtype=np.float64)
+        moments = cls(returns.shape[1])
+        moments.count = returns.shape[0]
+        if moments.count > 0:
+            moments.mean = returns.mean(axis=0)
+            deviations = returns - moments.mean
+            moments.comoment = deviations.T @ deviations
+        return moments
+
+    def copy(self) -> "RollingMoments":
+        moments = RollingMoments(len(self.mean))
+        moments.count = self.count
+        moments.mean = self.mean.copy()
+        moments.comoment = self.comoment.copy()
+        return moments
+
+    def add_observation(self, returns: ndarray) -> None:
+        returns = np.asarray(returns, dtype=np.float64)
+        self.count += 1
+        delta = returns - self.mean
+        self.mean += delta / self.count
+        self.comoment += np.outer(delta, returns - self.mean)
+
+    def remove_observation(self, returns: ndarray) -> None:
+        if self.count == 0:
+            raise Exception("No observation to remove")
+        returns = np.asarray(returns, dtype=np.float64)
+        if self.count == 1:
+            self.__init__(len(self.mean))
+            return
+        delta = returns - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.comoment -= np.outer(delta, returns - self.mean)
+
+    def add_asset(self, asset_returns: ndarray, window: ndarray) -> None:
+        """
+        asset_returns : ndarray
+            Returns of the new asset over the current window, shape (count,)
+        window : ndarray
+            Returns of the existing assets over the same rows, shape (count, N)
+        """
+        asset_returns = np.asarray(asset_returns, dtype=np.float64)
+        if len(asset_returns) != self.count:
+            raise Exception("New asset returns must cover every observation in the window")
+        asset_mean = asset_returns.mean() if self.count > 0 else 0.0
+        asset_deviation = asset_returns - asset_mean
+        cross = (np.asarray(window, dtype=np.float64) - self.mean).T @ asset_deviation
+
+        no_assets = len(self.mean)
+        comoment = np.empty(shape=(no_assets + 1, no_assets + 1), dtype=np.float64)
+        comoment[:no_assets, :no_assets] = self.comoment
+        comoment[no_assets, :no_assets] = cross
+        comoment[:no_assets, no_assets] = cross
+        comoment[no_assets, no_assets] = asset_deviation @ asset_deviation
+        self.comoment = comoment
+        self.mean = np.append(self.mean, asset_mean)
+
+    def remove_asset(self, position: int) -> None:
+        self.mean = np.delete(self.mean, position)
+        self.comoment = np.delete(np.delete(self.comoment, position, axis=0), position, axis=1)
+
+    def reorder(self, order: list) -> None:
+        self.mean = self.mean[order]
+        self.comoment = self.comoment[np.ix_(order, order)]
+
+    def covariance(self) -> ndarray:
+        if self.count < 2:
+            raise Exception("At least two observations are needed for a covariance")
+        return self.comoment / (self.count - 1)
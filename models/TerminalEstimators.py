@@ -0,0 +1,134 @@
+import numpy as np
+from numpy import ndarray
+from models.RiskMetrics import var_cvar
+
+
+class ExactTerminalEstimator:
+    """
+    Keeps every terminal value, O(no_simulations) memory, exact quantiles
+    """
+
+    def __init__(self, capacity: int = 0):
+        self.values = np.empty(shape=capacity, dtype=np.float64)
+        # importance sampling weights, None while every value weighs 1
+        self.weights = None
+        self.count = 0
+
+    def update(self, values: ndarray, weights: ndarray = None) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        needed = self.count + len(values)
+        if weights is not None and self.weights is None:
+            self.weights = np.ones(shape=len(self.values), dtype=np.float64)
+        if needed > len(self.values):
+            capacity = max(needed, 2 * len(self.values))
+            grown = np.empty(shape=capacity, dtype=np.float64)
+            grown[:self.count] = self.values[:self.count]
+            self.values = grown
+            if self.weights is not None:
+                grown = np.ones(shape=capacity, dtype=np.float64)
+                grown[:self.count] = self.weights[:self.count]
+                self.weights = grown
+        self.values[self.count:needed] = values
+        if self.weights is not None:
+            self.weights[self.count:needed] = 1.0 if weights is None else weights
+        self.count = needed
+
+    def merge(self, other: "ExactTerminalEstimator") -> None:
+        self.update(other.get_values(), other.get_weights())
+
+    def get_values(self) -> ndarray:
+        return self.values[:self.count]
+
+    def get_weights(self) -> ndarray:
+        return None if self.weights is None else self.weights[:self.count]
+
+    def quantile(self, alpha: float) -> float:
+        if self.count == 0:
+            raise Exception("No terminal values have been recorded")
+        return var_cvar(self.get_values(), [alpha], self.get_weights())[float(alpha)][0]
+
+    def tail_mean(self, alpha: float) -> float:
+        if self.count == 0:
+            raise Exception("No terminal values have been recorded")
+        return var_cvar(self.get_values(), [alpha], self.get_weights())[float(alpha)][1]
+
+
+class TDigestEstimator:
+    """
+    Merging t-digest sketch of the terminal values, O(compression) memory.
+
+    Centroids are sized by the arcsine scale function so the tails, where
+    VaR and CVaR are read, keep the finest resolution.
+    """
+
+    def __init__(self, compression: int = 500):
+        self.compression = compression
+        self.means = np.empty(shape=0, dtype=np.float64)
+        self.weights = np.empty(shape=0, dtype=np.float64)
+        self.count = 0
+        self.total_weight = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _scale(self, q: ndarray) -> ndarray:
+        return self.compression / (2 * np.pi) * np.arcsin(2 * q - 1) + self.compression / 4
+
+    def update(self, values: ndarray, weights: ndarray = None) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.count += len(values)
+        self.total_weight += float(weights.sum())
+        self._compress(values, weights)
+
+    def merge(self, other: "TDigestEstimator") -> None:
+        if other.count == 0:
+            return
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total_weight += other.total_weight
+        self._compress(other.means, other.weights)
+
+    def _compress(self, means: ndarray, weights: ndarray) -> None:
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+
+        # every point joins the centroid of the unit k-interval its left edge falls in
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        bucket = np.floor(self._scale(q_left)).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def _knots(self) -> tuple:
+        if self.count == 0:
+            raise Exception("No terminal values have been recorded")
+        centres = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centres, [self.total_weight]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return positions, values
+
+    def quantile(self, alpha: float) -> float:
+        positions, values = self._knots()
+        # weights are likelihood ratios, the alpha point is taken per observation as in var_cvar
+        return float(np.interp(float(alpha) * self.count, positions, values))
+
+    def tail_mean(self, alpha: float) -> float:
+        # integrate the piecewise linear quantile function up to alpha, divided by the
+        # weight integrated over, a self-normalized mean as in var_cvar
+        positions, values = self._knots()
+        target = min(float(alpha) * self.count, self.total_weight)
+        if target <= 0:
+            return float("nan")
+        inside = positions < target
+        xs = np.concatenate([positions[inside], [target]])
+        ys = np.concatenate([values[inside], [np.interp(target, positions, values)]])
+        return float(np.sum(np.diff(xs) * (ys[1:] + ys[:-1]) / 2) / (xs[-1] - xs[0]))
@@ -0,0 +1,186 @@
+"""
+Headless batch training of LSTM models for a list of tickers.
+
+All histories are fetched in one bulk download, tickers whose data has not
+changed since their last artifact are skipped, and a JSON manifest records
+timing and loss per ticker. Run from the repository root:
+
+    python -m models.batch_train AAPL MSFT NVDA --workers 4
+    python -m models.batch_train --tickers-file watchlist.txt --mode shared
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from assets.Collector import InfoCollector
+
+
+DEFAULT_START = "2015-01-01"
+DEFAULT_MANIFEST = "manifest.json"
+
+
+def fingerprint(closes: pd.Series, epochs: int) -> str:
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(closes.to_numpy(dtype=np.float64)).tobytes())
+    digest.update(np.ascontiguousarray(closes.index.asi8).tobytes())
+    digest.update(str(epochs).encode())
+    return digest.hexdigest()
+
+
+def load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"tickers": {}}
+    with open(path) as manifest_file:
+        return json.load(manifest_file)
+
+
+def _artifacts_exist(entry: dict) -> bool:
+    # a failed entry has no artifacts and is never up to date
+    return entry.get("status") in ("trained", "skipped") \
+        and all(os.path.exists(path) for path in entry.get("artifacts", []))
+
+
+def _train_ticker(stock_ticker: str, closes: pd.Series, model_dir: str, epochs: int) -> dict:
+    # TensorFlow is imported inside the worker process only
+    from models.train_model import fit_lstm_model
+
+    start = time.perf_counter()
+    _, performance = fit_lstm_model(closes.to_frame("Close"), stock_ticker,
+                                    model_dir=model_dir, epochs=epochs, verbose=0)
+    return {
+        "seconds": time.perf_counter() - start,
+        "final_loss": float(performance["final_loss"]),
+        "total_epochs": performance["total_epochs"],
+        "artifacts": [os.path.join(model_dir, f"lstm_model_{stock_ticker}.h5"),
+                      os.path.join(model_dir, f"scaler_{stock_ticker}.joblib")]
+    }
+
+
+def _train_shared(closes: dict, model_dir: str, epochs: int) -> dict:
+    from models.train_model import fit_shared_lstm_model
+
+    start = time.perf_counter()
+    _, performance = fit_shared_lstm_model({stock_ticker: series.to_frame("Close")
+                                            for stock_ticker, series in closes.items()},
+                                           model_dir=model_dir, epochs=epochs, verbose=0)
+    return {
+        "seconds": time.perf_counter() - start,
+        "final_loss": float(performance["final_loss"]),
+        "total_epochs": performance["total_epochs"],
+        "artifacts": [os.path.join(model_dir, "lstm_model_shared.h5")]
+                     + [os.path.join(model_dir, f"scaler_shared_{stock_ticker}.joblib")
+                        for stock_ticker in closes]
+    }
+
+
+def run_batch(tickers: list, start, end, mode: str = "per-ticker", workers: int = 1,
+              model_dir: str = "models", manifest_path: str = None, epochs: int = 50,
+              force: bool = False) -> dict:
+    manifest_path = manifest_path or os.path.join(model_dir, DEFAULT_MANIFEST)
+    os.makedirs(model_dir, exist_ok=True)
+    manifest = load_manifest(manifest_path)
+    previous = manifest.get("tickers", {})
+
+    # one bulk download for every ticker
+    fetch_start = time.perf_counter()
+    closes = InfoCollector.download_batch_history(list(tickers), start, end)['Close']
+    fetch_seconds = time.perf_counter() - fetch_start
+
+    entries = {}
+    pending = {}
+    for stock_ticker in tickers:
+        series = closes[stock_ticker].dropna() if stock_ticker in closes.columns else pd.Series(dtype=float)
+        if len(series) <= 60:
+            entries[stock_ticker] = {"status": "no_data", "observations": len(series)}
+            continue
+        data_fingerprint = fingerprint(series, epochs)
+        entry = previous.get(stock_ticker, {})
+        if not force and entry.get("fingerprint") == data_fingerprint \
+                and entry.get("mode") == mode and _artifacts_exist(entry):
+            entries[stock_ticker] = dict(entry, status="skipped")
+            continue
+        entries[stock_ticker] = {"fingerprint": data_fingerprint, "mode": mode,
+                                 "observations": len(series)}
+        pending[stock_ticker] = series
+
+    if mode == "shared" and pending:
+        # a shared model is refit on every ticker once any of them changed
+        shared = {stock_ticker: closes[stock_ticker].dropna() for stock_ticker in tickers
+                  if entries[stock_ticker].get("status") != "no_data"}
+        for stock_ticker, series in shared.items():
+            entries[stock_ticker] = {"fingerprint": fingerprint(series, epochs), "mode": mode,
+                                     "observations": len(series)}
+        try:
+            result = _train_shared(shared, model_dir, epochs)
+            for stock_ticker in shared:
+                entries[stock_ticker].update(result, status="trained")
+        except Exception as e:
+            for stock_ticker in shared:
+                entries[stock_ticker].update(status="failed", error=str(e))
+
+    elif pending:
+        # each worker imports TensorFlow itself, started like the JobQueue workers
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=context) as executor:
+            futures = {stock_ticker: executor.submit(_train_ticker, stock_ticker, series,
+                                                     model_dir, epochs)
+                       for stock_ticker, series in pending.items()}
+            for stock_ticker, future in futures.items():
+                try:
+                    entries[stock_ticker].update(future.result(), status="trained")
+                except Exception as e:
+                    entries[stock_ticker].update(status="failed", error=str(e))
+
+    manifest = {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "start": str(start),
+        "end": str(end),
+        "mode": mode,
+        "fetch_seconds": fetch_seconds,
+        "tickers": dict(previous, **entries)
+    }
+    with open(manifest_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch train LSTM models for many tickers")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--tickers-file", help="file with one ticker per line")
+    parser.add_argument("--start", default=DEFAULT_START)
+    parser.add_argument("--end", default=datetime.date.today().isoformat())
+    parser.add_argument("--mode", choices=["per-ticker", "shared"], default="per-ticker")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--manifest", default=None)
+    parser.add_argument("--force", action="store_true", help="retrain unchanged tickers too")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file) as tickers_file:
+            tickers += [line.strip() for line in tickers_file if line.strip()]
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        parser.error("no tickers given")
+
+    manifest = run_batch(tickers, args.start, args.end, mode=args.mode, workers=args.workers,
+                         model_dir=args.model_dir, manifest_path=args.manifest,
+                         epochs=args.epochs, force=args.force)
+    for stock_ticker in tickers:
+        entry = manifest["tickers"][stock_ticker]
+        loss = f"{entry['final_loss']:.5f}" if "final_loss" in entry else "-"
+        seconds = f"{entry['seconds']:.1f}s" if "seconds" in entry else "-"
+        print(f"{stock_ticker:<12} {entry['status']:<10} loss={loss:<10} time={seconds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# Prediction stack, imported lazily by side_bar so TensorFlow is only loaded
+# when a prediction is actually requested
+import weakref
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import LSTM, Dense
+from sklearn.preprocessing import MinMaxScaler
+from assets.Collector import InfoCollector
+from models.ModelRegistry import ModelRegistry
+from models.windowing import make_windows, DEFAULT_BATCH_SIZE
+
+
+
+# Number of future days predicted
+FORECAST_DAYS = 15
+TIME_STEP = 100
+# mini-batches take far fewer steps per epoch than batch_size=1 did
+TRAIN_EPOCHS = 20
+
+
+def fetch_closes(ticker: str) -> pd.DataFrame:
+    # a year of daily closes, served from the price cache
+    data = InfoCollector.get_history(InfoCollector.get_ticker(ticker), period="1y", interval="1d")
+    return data[['Close']]
+
+
+def fetch_many_closes(tickers: list) -> dict:
+    # one concurrent cached fetch for the whole watchlist, {ticker: Close frame} for tickers with data
+    histories, _ = InfoCollector.get_batch_history(tickers, period="1y", interval="1d")
+    return {ticker: history[['Close']].dropna() for ticker, history in histories.items()
+            if history['Close'].notna().any()}
+
+
+def train_model(ticker: str, callbacks: list = ()) -> tuple:
+    data = fetch_closes(ticker)
+
+    # Normalize the data (scaling between 0 and 1)
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled_data = scaler.fit_transform(data['Close'].values.reshape(-1, 1))
+    
+    # Prepare data for LSTM, x is a (samples, TIME_STEP, 1) view of scaled_data
+    x, y = make_windows(scaled_data, TIME_STEP)
+
+    # Build and train LSTM model
+    model = Sequential()
+    model.add(LSTM(units=50, return_sequences=True, input_shape=(x.shape[1], 1)))
+    model.add(LSTM(units=50, return_sequences=False))
+    model.add(Dense(units=1))
+    model.compile(optimizer='adam', loss='mean_squared_error')
+
+    model.fit(x, y, epochs=TRAIN_EPOCHS, batch_size=DEFAULT_BATCH_SIZE, verbose=2,
+              callbacks=list(callbacks))
+    return model, scaler
+
+
+_compiled_rollouts = weakref.WeakKeyDictionary()
+
+
+def _get_rollout(model):
+    """
+    Compiled autoregressive rollout of a model, every step is one graph-mode
+    forward pass over the whole batch instead of a model.predict call.
+    Traced once per model for any batch size and horizon. The rollout only
+    holds a weak reference to its model, so the cache entry and the traced
+    graph are dropped with the model
+    """
+    if model not in _compiled_rollouts:
+        time_step = model.input_shape[1]
+        model_ref = weakref.ref(model)
+
+        @tf.function(input_signature=[tf.TensorSpec([None, time_step, 1], tf.float32),
+                                      tf.TensorSpec([], tf.int32)])
+        def rollout(x_input, days):
+            predictions = tf.TensorArray(tf.float32, size=days)
+            for day in tf.range(days):
+                pred_price = model_ref()(x_input, training=False)
+                predictions = predictions.write(day, pred_price[:, 0])
+                x_input = tf.concat([x_input[:, 1:, :], pred_price[:, :, tf.newaxis]], axis=1)
+            return tf.transpose(predictions.stack())
+
+        _compiled_rollouts[model] = rollout
+    return _compiled_rollouts[model]
+
+
+def forecast_scaled(model, windows: np.ndarray, days: int = FORECAST_DAYS) -> np.ndarray:
+    """
+    windows : ndarray
+        Scaled input windows with shape (batch, time_step, 1)
+    Returns scaled predictions with shape (batch, days)
+    """
+    x_input = tf.convert_to_tensor(np.asarray(windows, dtype=np.float32))
+    return _get_rollout(model)(x_input, tf.constant(days, dtype=tf.int32)).numpy()
+
+
+def _to_prediction_frame(predictions: np.ndarray, last_date, days: int) -> pd.DataFrame:
+    # Create dataframe for predictions
+    future_dates = pd.date_range(start=last_date, periods=days + 1, freq='D')[1:]
+    future_dates = future_dates.strftime('%Y-%m-%d')
+    return pd.DataFrame(predictions, columns=['Predicted Price'], index=future_dates)
+
+
+def predict_next_days(model, scaler, data: pd.DataFrame, days: int = FORECAST_DAYS) -> tuple:
+    # window length comes from the model, train_model.py artifacts use 60 days
+    time_step = model.input_shape[1]
+    scaled_data = scaler.transform(data['Close'].values.reshape(-1, 1))
+    x_input = scaled_data[-time_step:].reshape(1, time_step, 1)
+
+    # Inverse transform predictions to original scale
+    predictions = scaler.inverse_transform(forecast_scaled(model, x_input, days).reshape(-1, 1))
+    return predictions, _to_prediction_frame(predictions, data.index[-1], days)
+
+
+def forecast_many(model, data: dict, scalers: dict, days: int = FORECAST_DAYS) -> dict:
+    """
+    Forecasts a whole watchlist sharing one model in a single batched rollout.
+
+    data : dict
+        {ticker: DataFrame with a Close column}
+    scalers : dict
+        {ticker: fitted scaler}, each ticker is scaled with its own
+    Returns {ticker: prediction DataFrame}
+    """
+    tickers = list(data.keys())
+    time_step = model.input_shape[1]
+    windows = np.stack([scalers[ticker].transform(data[ticker]['Close'].values.reshape(-1, 1))[-time_step:]
+                        for ticker in tickers])
+    scaled_predictions = forecast_scaled(model, windows, days)
+
+    forecasts = {}
+    for ticker, scaled in zip(tickers, scaled_predictions):
+        predictions = scalers[ticker].inverse_transform(scaled.reshape(-1, 1))
+        forecasts[ticker] = _to_prediction_frame(predictions, data[ticker].index[-1], days)
+    return forecasts
+
+
+# training runs as a "train_forecast" job, see models/jobs.py
+_registry = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    return _registry
+
+
+def forecast_watchlist(tickers: list, days: int = FORECAST_DAYS) -> tuple:
+    """
+    Forecasts every ticker the registry has a model for, tickers sharing a
+    model (the models/batch_train.py shared model) in one forecast_many
+    rollout. Tickers without a model get a training job.
+
+    Returns ({ticker: prediction DataFrame}, [tickers still training]),
+    tickers in neither had no price data
+    """
+    artifacts = {ticker: _registry.load_or_train(ticker) for ticker in dict.fromkeys(tickers)}
+    training = [ticker for ticker, artifact in artifacts.items() if artifact is None]
+    ready = {ticker: artifact for ticker, artifact in artifacts.items() if artifact is not None}
+    if not ready:
+        return {}, training
+
+    closes = fetch_many_closes(list(ready))
+    # {id(model): (model, {ticker: closes}, {ticker: scaler})}
+    groups = {}
+    for ticker, (model, scaler) in ready.items():
+        if ticker not in closes:
+            continue
+        _, data, scalers = groups.setdefault(id(model), (model, {}, {}))
+        data[ticker] = closes[ticker]
+        scalers[ticker] = scaler
+
+    forecasts = {}
+    for model, data, scalers in groups.values():
+        forecasts.update(forecast_many(model, data, scalers, days))
+    return forecasts, training
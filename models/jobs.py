@@ -0,0 +1,95 @@
+# Handlers run by JobQueue worker processes, called as handler(params, report)
+# where report(progress, message) publishes progress in [0, 1]
+import numpy as np
+from assets.Collector import InfoCollector
+
+
+def _to_json(value):
+    # results are stored as JSON, arrays become (nested) lists at this boundary only
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    return value
+
+
+def _epoch_progress(report, epochs: int):
+    import tensorflow as tf
+
+    class EpochProgress(tf.keras.callbacks.Callback):
+
+        def on_epoch_end(self, epoch, logs=None):
+            loss = (logs or {}).get("loss")
+            loss_text = f", loss {loss:.5f}" if loss is not None else ""
+            report((epoch + 1) / epochs, f"epoch {epoch + 1}/{epochs}{loss_text}")
+
+    return EpochProgress()
+
+
+def train_lstm(params: dict, report) -> dict:
+    """
+    params: ticker, start, end, optional epochs. Trains the models/train_model.py model
+    """
+    from models.train_model import fit_lstm_model
+
+    ticker = params["ticker"]
+    epochs = int(params.get("epochs", 50))
+    report(0.0, f"downloading {ticker}")
+    closes = InfoCollector.download_batch_history([ticker], params["start"], params["end"])['Close']
+    if ticker not in closes.columns or closes[ticker].dropna().empty:
+        raise Exception(f"No data found for stock ticker: {ticker}")
+
+    _, performance = fit_lstm_model(closes[ticker].dropna().to_frame("Close"), ticker,
+                                    epochs=epochs, verbose=0,
+                                    callbacks=[_epoch_progress(report, epochs)])
+    return {"final_loss": float(performance["final_loss"]),
+            "total_epochs": performance["total_epochs"]}
+
+
+def train_forecast(params: dict, report) -> dict:
+    """
+    params: ticker. Trains the prediction tab model and saves it where the
+    ModelRegistry looks for it
+    """
+    import joblib
+    from models import forecasting
+
+    ticker = params["ticker"]
+    registry = forecasting.get_registry()
+    model, scaler = forecasting.train_model(
+        ticker, callbacks=[_epoch_progress(report, forecasting.TRAIN_EPOCHS)])
+    model.save(registry.model_path(ticker))
+    joblib.dump(scaler, registry.scaler_path(ticker))
+    return {"model_path": registry.model_path(ticker), "scaler_path": registry.scaler_path(ticker)}
+
+
+def monte_carlo(params: dict, report) -> dict:
+    """
+    params: book_costs ({ticker: book cost}), start, end, no_simulations,
+    no_days, alphas, optional estimator, seed, horizons, sampler, replicates,
+    engine and block_length. Returns Monte_Carlo_Simulator.get_summary(alphas)
+    as JSON-able lists
+    """
+    from models.MonteCarloSimulator import Monte_Carlo_Simulator, DEFAULT_REPLICATES
+
+    alphas = [float(alpha) for alpha in params["alphas"]]
+    # alphas as the page sends them, [VaR alpha, cVaR alpha]
+    monte_carlo_model = Monte_Carlo_Simulator(cVaR_alpha=alphas[-1], VaR_alpha=alphas[0])
+    monte_carlo_model.get_book_costs(params["book_costs"], params["start"], params["end"])
+    monte_carlo_model.apply_monte_carlo_streaming(no_simulations=int(params["no_simulations"]),
+                                                  no_days=int(params["no_days"]),
+                                                  estimator=params.get("estimator", "exact"),
+                                                  # the job is already its own process, a shard
+                                                  # pool here would outlive it in the worker
+                                                  n_workers=1,
+                                                  seed=params.get("seed"),
+                                                  horizons=params.get("horizons"),
+                                                  sampler=params.get("sampler", "pseudo"),
+                                                  replicates=int(params.get("replicates", DEFAULT_REPLICATES)),
+                                                  engine=params.get("engine", "gaussian"),
+                                                  block_length=int(params.get("block_length", 1)),
+                                                  progress_callback=lambda fraction: report(
+                                                      fraction, f"{fraction:.0%} of paths simulated"))
+    return _to_json(monte_carlo_model.get_summary(alphas))
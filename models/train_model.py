@@ -1,45 +1,26 @@
+"""
+LSTM trainer page, run from the repository root as
+
+    python -m streamlit run models/train_model.py
+
+python -m puts the root on sys.path so the models package imports resolve
+"""
 import os
-import numpy as np
+import joblib
 import pandas as pd
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, LSTM, Dropout
 from sklearn.preprocessing import MinMaxScaler
-import yfinance as yf
 import streamlit as st
+from models.windowing import make_windows, make_multi_windows, DEFAULT_BATCH_SIZE
+from models.JobQueue import get_default_queue, DONE, FAILED
 
-def train_lstm_model(stock_ticker: str):
-    # Create models directory if it doesn't exist
-    os.makedirs('models', exist_ok=True)
-    
-    # Fetch historical data with error handling
-    try:
-        data = yf.download(stock_ticker, start="2015-01-01", end="2024-01-01")
-        
-        if len(data) == 0:
-            st.error(f"No data found for stock ticker: {stock_ticker}")
-            return None
-        
-        df = data[['Close']].copy()
-    except Exception as e:
-        st.error(f"Error fetching data for {stock_ticker}: {e}")
-        return None
-
-    # Preprocess data
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(df)
-
-    # Prepare training data
-    X_train, y_train = [], []
-    for i in range(60, len(scaled_data)):
-        X_train.append(scaled_data[i-60:i, 0])
-        y_train.append(scaled_data[i, 0])
-    X_train, y_train = np.array(X_train), np.array(y_train)
-    X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))
 
+def build_lstm_model(time_step: int) -> Sequential:
     # Build LSTM model with improved architecture
     model = Sequential([
-        LSTM(units=100, return_sequences=True, input_shape=(X_train.shape[1], 1)),
+        LSTM(units=100, return_sequences=True, input_shape=(time_step, 1)),
         Dropout(0.3),
         LSTM(units=75, return_sequences=True),
         Dropout(0.3),
@@ -59,39 +40,87 @@ def train_lstm_model(stock_ticker: str):
     optimizer = tf.keras.optimizers.Adam(learning_rate=lr_schedule)
     
     model.compile(optimizer=optimizer, loss='mean_squared_error')
+    return model
 
+
+def _fit_and_save(model: Sequential, X_train, y_train, model_path: str,
+                  epochs: int, verbose: int, callbacks: list) -> dict:
     # Early stopping and model checkpoint
     early_stopping = tf.keras.callbacks.EarlyStopping(
         monitor='loss', 
         patience=5, 
         restore_best_weights=True
     )
+    # there is no validation split, checkpoint on the training loss
     model_checkpoint = tf.keras.callbacks.ModelCheckpoint(
-        f"models/lstm_model_{stock_ticker}.h5", 
+        model_path, 
+        monitor='loss',
         save_best_only=True
     )
 
     # Train the model
     history = model.fit(
         X_train, y_train, 
-        epochs=50, 
-        batch_size=32, 
-        verbose=1,
-        callbacks=[early_stopping, model_checkpoint]
+        epochs=epochs, 
+        batch_size=DEFAULT_BATCH_SIZE, 
+        verbose=verbose,
+        callbacks=[early_stopping, model_checkpoint] + list(callbacks)
     )
 
     # Save model performance metrics
-    performance = {
+    return {
         'final_loss': history.history['loss'][-1],
         'total_epochs': len(history.history['loss'])
     }
 
+
+def fit_lstm_model(df: pd.DataFrame, stock_ticker: str, model_dir: str = 'models',
+                   epochs: int = 50, verbose: int = 1, callbacks: list = ()):
+    """
+    Fits and saves the per-ticker model and scaler on a Close price frame
+    """
+    # Preprocess data
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled_data = scaler.fit_transform(df[['Close']])
+
+    # Prepare training data, X_train is a (samples, 60, 1) view of scaled_data
+    X_train, y_train = make_windows(scaled_data, time_step=60)
+
+    model = build_lstm_model(time_step=60)
+    performance = _fit_and_save(model, X_train, y_train,
+                                os.path.join(model_dir, f"lstm_model_{stock_ticker}.h5"),
+                                epochs, verbose, callbacks)
+
     # Save scaler for future use
-    import joblib
-    joblib.dump(scaler, f"models/scaler_{stock_ticker}.joblib")
+    joblib.dump(scaler, os.path.join(model_dir, f"scaler_{stock_ticker}.joblib"))
 
     return scaler, performance
 
+
+def fit_shared_lstm_model(dfs: dict, model_dir: str = 'models', name: str = 'shared',
+                          epochs: int = 50, verbose: int = 1, callbacks: list = ()):
+    """
+    Fits one model on every ticker's windows, each ticker scaled on its own.
+    Saves lstm_model_{name}.h5 and scaler_{name}_{ticker}.joblib
+    """
+    scalers = {}
+    scaled_series = []
+    for stock_ticker, df in dfs.items():
+        scalers[stock_ticker] = MinMaxScaler(feature_range=(0, 1))
+        scaled_series.append(scalers[stock_ticker].fit_transform(df[['Close']]))
+
+    X_train, y_train = make_multi_windows(scaled_series, time_step=60)
+
+    model = build_lstm_model(time_step=60)
+    performance = _fit_and_save(model, X_train, y_train,
+                                os.path.join(model_dir, f"lstm_model_{name}.h5"),
+                                epochs, verbose, callbacks)
+
+    for stock_ticker, scaler in scalers.items():
+        joblib.dump(scaler, os.path.join(model_dir, f"scaler_{name}_{stock_ticker}.joblib"))
+
+    return scalers, performance
+
 def main():
     st.title("Advanced Stock Price Prediction Model Trainer")
     
@@ -102,32 +131,37 @@ def main():
     popular_stocks = ["AAPL", "GOOGL", "MSFT", "AMZN", "NVDA", "META"]
     st.write("Quick pick popular stocks:", " | ".join(popular_stocks))
 
-    # Train button
+    # Train button, training runs as a job so this session and others stay responsive
     if st.button('Train Model'):
         if stock_ticker:
-            st.info(f"Training LSTM model for {stock_ticker}...")
-            
-            # Progress bar
-            progress_bar = st.progress(0)
-            for i in range(100):
-                progress_bar.progress(i + 1)
-            
-            # Train model
-            result = train_lstm_model(stock_ticker)
-            
-            if result:
-                scaler, performance = result
-                st.success(f"Model for {stock_ticker} trained successfully!")
-                
-                # Display model performance
-                st.write("### Model Training Performance")
-                st.write(f"Final Loss: {performance['final_loss']:.4f}")
-                st.write(f"Total Epochs Trained: {performance['total_epochs']}")
-                
-                # Suggestion for model use
-                st.info("Model saved and ready for predictions in the main application.")
-            else:
-                st.error("Model training failed. Check the stock ticker and data availability.")
+            st.session_state["train_job_id"] = get_default_queue().submit(
+                "train_lstm", ticker=stock_ticker, start="2015-01-01", end="2024-01-01")
+
+    job_id = st.session_state.get("train_job_id")
+    if job_id is None:
+        return
+
+    status = get_default_queue().get_status(job_id)
+    job_ticker = status["params"]["ticker"]
+    if status["status"] == DONE:
+        performance = status["result"]
+        st.success(f"Model for {job_ticker} trained successfully!")
+
+        # Display model performance
+        st.write("### Model Training Performance")
+        st.write(f"Final Loss: {performance['final_loss']:.4f}")
+        st.write(f"Total Epochs Trained: {performance['total_epochs']}")
+
+        # Suggestion for model use
+        st.info("Model saved and ready for predictions in the main application.")
+    elif status["status"] == FAILED:
+        st.error(f"Model training failed for {job_ticker}: {status['message']}")
+    else:
+        st.info(f"Training LSTM model for {job_ticker}...")
+
+        # Progress bar, updated by the job after every epoch
+        st.progress(status["progress"], text=status["message"])
+        st.button("Refresh status")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
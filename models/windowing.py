@@ -0,0 +1,36 @@
+import numpy as np
+from numpy import ndarray
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# mini-batch size used by the LSTM trainers
+DEFAULT_BATCH_SIZE = 32
+
+
+def make_windows(series: ndarray, time_step: int, target_column: int = 0) -> tuple:
+    """
+    Builds LSTM training pairs from a (T,) or (T, features) series without
+    copying: X[i] = series[i:i + time_step] and y[i] = series[i + time_step].
+
+    Returns X with shape (T - time_step, time_step, features), a strided view
+    of series, and y with shape (T - time_step,)
+    """
+    series = np.asarray(series)
+    if series.ndim == 1:
+        series = series[:, np.newaxis]
+    if len(series) <= time_step:
+        raise Exception(f"At least {time_step + 1} observations are needed to build windows")
+
+    # (T - time_step + 1, features, time_step) -> (windows, time_step, features)
+    windows = sliding_window_view(series, time_step, axis=0).transpose(0, 2, 1)
+    return windows[:-1], series[time_step:, target_column]
+
+
+def make_multi_windows(series_list: list, time_step: int, target_column: int = 0) -> tuple:
+    """
+    Windows of several tickers stacked into one training set. Windows never
+    cross from one ticker into the next; stacking is the only copy made
+    """
+    pairs = [make_windows(series, time_step, target_column) for series in series_list]
+    return (np.concatenate([x for x, _ in pairs], axis=0),
+            np.concatenate([y for _, y in pairs], axis=0))
@@ -1,5 +1,6 @@
 import streamlit as st
 import stTools as tools
+import numpy as np
 import pandas as pd
 
 
@@ -23,9 +24,8 @@ def load_portfolio_performance_cards(
 
 def load_portfolio_summary_pie() -> None:
     st.subheader("Portfolio Distribution")
-    book_cost_list = {}
-    for stock in st.session_state.my_portfolio.stocks.values():
-        book_cost_list[stock.stock_name] = stock.get_book_cost()
+    holdings = st.session_state.my_portfolio.holdings
+    book_cost_list = dict(zip(holdings.tickers, holdings.book_costs()))
 
     # create pie chart
     tools.create_pie_chart(book_cost_list)
@@ -34,24 +34,16 @@ def load_portfolio_summary_pie() -> None:
 def load_portfolio_summary_table() -> None:
     st.subheader("Portfolio Summary")
 
-    # for each stock, we get book cost, market value, gain/loss, and pct change
-    stock_info = {}
-    for stock in st.session_state.my_portfolio.stocks.values():
-        # round to 2 decimal places
-        book_cost = round(stock.get_book_cost(), 2)
-        market_value = round(stock.get_market_value(), 2)
-        gain_loss = round(market_value - book_cost, 2)
-        pct_change = round((gain_loss) / book_cost * 100, 2)
-
-        stock_info[stock.stock_name] = [book_cost, market_value, gain_loss, pct_change]
-    # print key and values in stock_info
-    for key, value in stock_info.items():
-        print(key, value)
+    # for each stock, we get book cost, market value, gain/loss, and pct change,
+    # as columns of the holdings valued by update_market_value
+    holdings = st.session_state.my_portfolio.holdings
+    stock_info = np.column_stack([holdings.book_costs(), holdings.market_values(),
+                                  holdings.gains_losses(), holdings.pct_changes()]).round(2)
 
     column_names = ['Book Cost', 'Market Value', 'Gain/Loss', '% Change']
-    stock_df = pd.DataFrame.from_dict(stock_info,
-                                      orient='index',
-                                      columns=column_names)
+    stock_df = pd.DataFrame(stock_info,
+                            index=holdings.tickers,
+                            columns=column_names)
     # name index column as 'Stock'
     stock_df.index.name = 'Stock'
 
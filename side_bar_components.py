@@ -1,14 +1,16 @@
 import streamlit as st
 import stTools as tools
 import datetime as dt
+import math
 import random
+from models.MonteCarloSimulator import SAMPLERS, ENGINES
 
 
 def load_sidebar_dropdown_stocks(port_tab: st.sidebar.tabs) -> None:
     # Add dropdown menu for portfolio with up to 20 investments
     st.session_state["no_investment"] = port_tab.selectbox("Select No. of Investments",
                                                            list(range(1, 31)),  # Extend range to 30
-                                                           index=2,
+                                                           index=st.session_state.get("no_investment", 3) - 1,
                                                            key="side_bar_portfolio_name")
 
 
@@ -74,4 +76,66 @@ def load_sidebar_risk_model(risk_tab: st.sidebar.tabs) -> None:
         tools.create_stock_text_input(state_variable="cVaR_alpha",
                                       default_value=str(0.05),
                                       present_text="cVaR Alpha",
-                                      key="side_bar_cVaR_alpha")
\ No newline at end of file
+                                      key="side_bar_cVaR_alpha")
+
+    # bootstrap resamples the historical daily returns instead of drawing normal ones
+    col_engine1, col_engine2 = risk_tab.columns(2)
+    with col_engine1:
+        st.session_state["engine"] = st.selectbox("Engine", ENGINES, key="side_bar_engine")
+    with col_engine2:
+        tools.create_stock_text_input(state_variable="block_length",
+                                      default_value=str(1),
+                                      present_text="Block Length (days)",
+                                      key="side_bar_block_length")
+        # the page reads an int, anything else falls back to the i.i.d. bootstrap
+        block_length = str(st.session_state["block_length"]).strip()
+        if not block_length.isdigit() or int(block_length) < 1:
+            st.warning("Block length must be a whole number of days, using 1")
+            st.session_state["block_length"] = "1"
+
+    # variance reduction, see models/MonteCarloSimulator.iter_path_blocks, gaussian engine only
+    bootstrap = st.session_state["engine"] == "bootstrap"
+    sampler = risk_tab.selectbox("Sampling", SAMPLERS, key="side_bar_sampler", disabled=bootstrap)
+    st.session_state["sampler"] = "pseudo" if bootstrap else sampler
+
+    # a tolerance above 0 replaces No. of Simulations with an adaptive run
+    col_adaptive1, col_adaptive2 = risk_tab.columns(2)
+    with col_adaptive1:
+        tools.create_stock_text_input(state_variable="ci_tolerance",
+                                      default_value=str(0),
+                                      present_text="CI Tolerance ($)",
+                                      key="side_bar_ci_tolerance")
+    with col_adaptive2:
+        tools.create_stock_text_input(state_variable="time_budget",
+                                      default_value=str(10),
+                                      present_text="Time Budget (s)",
+                                      key="side_bar_time_budget")
+    # the page reads floats, anything else falls back to the defaults
+    validate_non_negative_number(risk_tab, "ci_tolerance", "CI tolerance", default_value=0)
+    validate_non_negative_number(risk_tab, "time_budget", "Time budget", default_value=10)
+
+
+def validate_non_negative_number(container, state_variable: str, present_text: str,
+                                 default_value: float) -> None:
+    try:
+        value = float(st.session_state[state_variable])
+    except ValueError:
+        value = float("nan")
+    if not math.isfinite(value) or value < 0:
+        container.warning(f"{present_text} must be a number of at least 0, using {default_value}")
+        st.session_state[state_variable] = str(default_value)
+
+def load_sidebar_saved_portfolios(port_tab: st.sidebar.tabs) -> None:
+    port_tab.subheader("Saved Portfolios")
+    port_tab.text_input("Portfolio Name", key="saved_portfolio_name")
+    port_tab.button("Save Portfolio", key="side_bar_save_portfolio",
+                    on_click=tools.click_button_save_portfolio)
+
+    saved_portfolios = tools.get_default_repository().list_portfolios(tools.DEFAULT_USERNAME)
+    if saved_portfolios:
+        port_tab.selectbox("Saved Portfolio", saved_portfolios, key="side_bar_saved_portfolio")
+        port_tab.button("Open Portfolio", key="side_bar_open_portfolio",
+                        on_click=tools.click_button_open_portfolio)
+
+    if "saved_portfolio_message" in st.session_state:
+        port_tab.caption(st.session_state.pop("saved_portfolio_message"))
@@ -1,13 +1,13 @@
 import datetime
 import streamlit as st
-import yfinance
 import datetime as dt
 from assets.Collector import InfoCollector
 import plotly.graph_objects as go
 from streamlit_extras.metric_cards import style_metric_cards
 import pandas as pd
 from assets import Portfolio
-from assets import Stock
+from assets.PortfolioRepository import get_default_repository, DEFAULT_USERNAME
+from assets.PortfolioStateCache import PortfolioStateCache
 import plotly.express as px
 import json
 import os
@@ -71,14 +71,49 @@ def click_button_port() -> None:
     st.session_state["run_simulation_check"] = False
 
 
+def click_button_save_portfolio() -> None:
+    portfolio_name = st.session_state["saved_portfolio_name"].strip()
+    if not portfolio_name:
+        st.session_state["saved_portfolio_message"] = "Enter a portfolio name to save"
+        return
+
+    my_portfolio = build_portfolio(no_stocks=st.session_state.no_investment)
+    get_default_repository().save(DEFAULT_USERNAME, portfolio_name, my_portfolio)
+    st.session_state["saved_portfolio_message"] = f"Saved {portfolio_name}"
+
+
+def click_button_open_portfolio() -> None:
+    portfolio_name = st.session_state["side_bar_saved_portfolio"]
+    my_portfolio = get_default_repository().load(DEFAULT_USERNAME, portfolio_name)
+    if my_portfolio is None:
+        st.session_state["saved_portfolio_message"] = f"{portfolio_name} not found"
+        return
+
+    # fill the sidebar inputs with the saved holdings, the widgets pick them up on this rerun
+    st.session_state["no_investment"] = len(my_portfolio.stocks)
+    st.session_state.pop("side_bar_portfolio_name", None)
+    for i, stock in enumerate(my_portfolio.stocks.values()):
+        st.session_state[f"stock_{i + 1}_name"] = stock.stock_name
+        st.session_state[f"stock_{i + 1}_share"] = str(stock.owned_quantity)
+        if stock.purchase_date is not None:
+            st.session_state[f"stock_{i + 1}_purchase_date"] = stock.purchase_date
+        for field in ["name", "share", "purchase_date"]:
+            st.session_state.pop(f"side_bar_stock_{i + 1}_{field}", None)
+
+    # the saved stocks are reused by build_portfolio instead of being rebuilt
+    get_portfolio_state_cache().seed(my_portfolio)
+    st.session_state["saved_portfolio_message"] = f"Loaded {portfolio_name}"
+    click_button_port()
+
+
 def preview_stock(
         session_state_name: str,
         start_date: datetime.datetime
 ) -> None:
-    stock_data = yfinance.download(st.session_state[session_state_name],
-                                   start=start_date,
-                                   end=dt.datetime.now())
-    stock_data = stock_data[['Close']]
+    # served from the price cache, reruns only fetch what is not cached yet
+    stock_name = st.session_state[session_state_name]
+    stock_data = InfoCollector.download_batch_history([stock_name], start_date, dt.datetime.now())
+    stock_data = stock_data['Close'][[stock_name]].dropna().rename(columns={stock_name: 'Close'})
 
     color = None
 
@@ -210,16 +245,31 @@ def create_candle_stick_plot(stock_ticker_name: str, stock_name: str) -> None:
 
 
 
+def prefetch_market_data(stock_ticker_list: list) -> None:
+    # warm the price cache for every ticker on the page in one concurrent pass
+    InfoCollector.get_batch_history(stock_ticker_list, period="1d", interval="5m")
+    InfoCollector.get_batch_history(stock_ticker_list, period="1d", interval="1d")
+    InfoCollector.get_demo_daily_history(interval="5m")
+
+
 def create_stocks_dataframe(stock_ticker_list: list, stock_name: list) -> pd.DataFrame:
     close_price = []
     daily_change = []
     pct_change = []
     all_price = []
+    stocks_data, failures = InfoCollector.get_batch_history(stock_ticker_list,
+                                                            period="1d", interval='5m')
     for stock_ticker in stock_ticker_list:
-        stock = InfoCollector.get_ticker(stock_ticker)
-        stock_data = InfoCollector.get_history(stock, period="1d", interval='5m')
-        # round value to 2 digits
+        stock_data = stocks_data.get(stock_ticker)
+        if stock_data is None or stock_data.empty:
+            failures.setdefault(stock_ticker, "no data returned")
+            close_price.append(float("nan"))
+            daily_change.append(float("nan"))
+            pct_change.append(float("nan"))
+            all_price.append([])
+            continue
 
+        # round value to 2 digits
         close_price_value = round(stock_data.iloc[-1]['Close'], 2)
         close_price.append(close_price_value)
 
@@ -234,6 +284,10 @@ def create_stocks_dataframe(stock_ticker_list: list, stock_name: list) -> pd.Dat
 
         all_price.append(stock_data['Close'].tolist())
 
+    if failures:
+        st.warning("Could not load: " + ", ".join(f"{ticker} ({error})"
+                                                  for ticker, error in failures.items()))
+
     df_stocks = pd.DataFrame(
         {
             "stock_tickers": stock_ticker_list,
@@ -281,15 +335,18 @@ def create_dateframe_view(df: pd.DataFrame) -> None:
     )
 
 
+def get_portfolio_state_cache() -> PortfolioStateCache:
+    create_state_variable("portfolio_state_cache", PortfolioStateCache())
+    return st.session_state["portfolio_state_cache"]
+
+
 def build_portfolio(no_stocks: int) -> Portfolio.Portfolio:
-    # build portfolio using portfolio class
-    my_portfolio = Portfolio.Portfolio()
-    for i in range(no_stocks):
-        stock = Stock.Stock(stock_name=st.session_state[f"stock_{i + 1}_name"])
-        stock.add_buy_action(quantity=int(st.session_state[f"stock_{i + 1}_share"]),
-                             purchase_date=st.session_state[f"stock_{i + 1}_purchase_date"])
-        my_portfolio.add_stock(stock=stock)
-    return my_portfolio
+    # unchanged sidebar inputs return the previous portfolio, changed holdings are rebuilt
+    holdings = [(st.session_state[f"stock_{i + 1}_name"],
+                 int(st.session_state[f"stock_{i + 1}_share"]),
+                 st.session_state[f"stock_{i + 1}_purchase_date"])
+                for i in range(no_stocks)]
+    return get_portfolio_state_cache().get_portfolio(holdings)
 
 
 def get_metric_bg_color() -> str:
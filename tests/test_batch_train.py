@@ -0,0 +1,65 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from assets.Collector import InfoCollector
+from assets.PriceCache import PriceCache, SyntheticSource
+from models import batch_train
+
+
+class InlineExecutor(ThreadPoolExecutor):
+    """
+    Stands in for the spawn pool so the patched trainer runs in this process
+    """
+
+    def __init__(self, max_workers: int = None, mp_context=None):
+        super().__init__(max_workers=max_workers)
+
+
+@pytest.fixture
+def trained(monkeypatch) -> list:
+    trained = []
+
+    def train_ticker(stock_ticker, closes, model_dir, epochs):
+        trained.append(stock_ticker)
+        if stock_ticker == "BAD":
+            raise Exception("training diverged")
+        artifacts = [os.path.join(model_dir, f"lstm_model_{stock_ticker}.h5"),
+                     os.path.join(model_dir, f"scaler_{stock_ticker}.joblib")]
+        for path in artifacts:
+            open(path, "w").close()
+        return {"seconds": 0.0, "final_loss": 0.01, "total_epochs": epochs, "artifacts": artifacts}
+
+    monkeypatch.setattr(InfoCollector, "_price_cache", PriceCache(":memory:", source=SyntheticSource(seed=3)))
+    monkeypatch.setattr(batch_train, "ProcessPoolExecutor", InlineExecutor)
+    monkeypatch.setattr(batch_train, "_train_ticker", train_ticker)
+    return trained
+
+
+def run(tmp_path, tickers: list, **kwargs) -> dict:
+    return batch_train.run_batch(tickers, "2022-01-03", "2023-01-03", model_dir=str(tmp_path),
+                                 epochs=1, **kwargs)
+
+
+def test_unchanged_tickers_with_artifacts_are_skipped(tmp_path, trained):
+    run(tmp_path, ["AAA", "BBB"])
+    os.remove(tmp_path / "scaler_BBB.joblib")
+    manifest = run(tmp_path, ["AAA", "BBB"])
+
+    assert manifest["tickers"]["AAA"]["status"] == "skipped"
+    # a missing artifact is retrained even though the data did not change
+    assert manifest["tickers"]["BBB"]["status"] == "trained"
+    assert trained == ["AAA", "BBB", "BBB"]
+
+    run(tmp_path, ["AAA"], force=True)
+    assert trained[-1] == "AAA"
+
+
+def test_failing_ticker_does_not_stop_the_batch(tmp_path, trained):
+    manifest = run(tmp_path, ["AAA", "BAD", "BBB"])
+
+    assert [manifest["tickers"][ticker]["status"] for ticker in ("AAA", "BAD", "BBB")] \
+        == ["trained", "failed", "trained"]
+    assert manifest["tickers"]["BAD"]["error"] == "training diverged"
+    # the failure is not skipped on the next run
+    run(tmp_path, ["AAA", "BAD", "BBB"])
+    assert trained[3:] == ["BAD"]
@@ -0,0 +1,65 @@
+import gc
+import weakref
+import numpy as np
+import pandas as pd
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+from assets.Collector import InfoCollector
+from assets.PriceCache import PriceCache, SyntheticSource
+from models import forecasting
+from models.ModelRegistry import ModelRegistry
+from tests.test_model_registry import FakeQueue, save_artifacts
+
+
+def closes(seed: int) -> pd.DataFrame:
+    index = pd.bdate_range("2023-01-02", periods=30)
+    return pd.DataFrame({"Close": 100 + np.random.default_rng(seed).normal(0, 1, 30).cumsum()}, index=index)
+
+
+def test_watchlist_sharing_a_model_is_one_rollout(tmp_path, monkeypatch):
+    save_artifacts(tmp_path / "lstm_model_shared.h5",
+                   [tmp_path / "scaler_shared_AAA.joblib", tmp_path / "scaler_shared_BBB.joblib"])
+    job_queue = FakeQueue()
+    monkeypatch.setattr(forecasting, "_registry", ModelRegistry(model_dir=str(tmp_path), job_queue=job_queue))
+    monkeypatch.setattr(forecasting, "fetch_many_closes",
+                        lambda tickers: {ticker: closes(i) for i, ticker in enumerate(tickers)})
+    rollouts = []
+    forecast_many = forecasting.forecast_many
+    monkeypatch.setattr(forecasting, "forecast_many",
+                        lambda model, data, scalers, days: rollouts.append(list(data))
+                        or forecast_many(model, data, scalers, days))
+
+    forecasts, training = forecasting.forecast_watchlist(["AAA", "BBB", "CCC"], days=3)
+
+    assert rollouts == [["AAA", "BBB"]]
+    assert sorted(forecasts) == ["AAA", "BBB"] and training == ["CCC"]
+    assert forecasts["AAA"].shape == (3, 1)
+    assert job_queue.submitted == [("train_forecast", {"ticker": "CCC"})]
+
+
+def test_watchlist_closes_come_from_the_price_cache(monkeypatch):
+    source = SyntheticSource(seed=1)
+    monkeypatch.setattr(InfoCollector, "_price_cache", PriceCache(":memory:", source=source))
+
+    first = forecasting.fetch_many_closes(["AAA", "BBB"])
+    second = forecasting.fetch_many_closes(["AAA", "BBB"])
+
+    assert len(source.calls) == 2
+    assert list(first["AAA"].columns) == ["Close"] and len(first["AAA"]) == 252
+    pd.testing.assert_frame_equal(first["BBB"], second["BBB"])
+    assert forecasting.fetch_closes("AAA")["Close"].iloc[-1] == first["AAA"]["Close"].iloc[-1]
+
+
+def test_compiled_rollout_is_dropped_with_its_model():
+    gc.collect()
+    no_rollouts = len(forecasting._compiled_rollouts)
+    model = tf.keras.Sequential([tf.keras.layers.LSTM(4, input_shape=(10, 1)), tf.keras.layers.Dense(1)])
+    assert forecasting.forecast_scaled(model, np.zeros((2, 10, 1)), days=3).shape == (2, 3)
+    model_ref = weakref.ref(model)
+
+    del model
+    gc.collect()
+
+    assert model_ref() is None
+    assert len(forecasting._compiled_rollouts) == no_rollouts
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from assets.HoldingsTable import HoldingsTable
+
+
+def test_append_past_the_capacity_keeps_every_position():
+    table = HoldingsTable(capacity=2)
+    for i in range(5):
+        table.append(f"T{i}", i + 1, 10.0 * (i + 1), last_price=float(i))
+
+    assert table.tickers == ["T0", "T1", "T2", "T3", "T4"]
+    np.testing.assert_array_equal(table.quantities, [1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(table.last_prices, [0, 1, 2, 3, 4])
+    assert table.book_amount() == pytest.approx(sum(10.0 * (i + 1) ** 2 for i in range(5)))
+
+
+def test_remove_keeps_the_order_and_the_index():
+    table = HoldingsTable.from_arrays(["A", "B", "C", "D"], [1, 2, 3, 4], [10, 20, 30, 40])
+    table.remove("B")
+
+    assert table.tickers == ["A", "C", "D"]
+    np.testing.assert_array_equal(table.book_costs(), [10, 90, 160])
+    # later rows moved down one slot, updates must still find them
+    table.update("D", 5, 50)
+    table.set_last_prices({"C": 31.0})
+    np.testing.assert_array_equal(table.book_costs(), [10, 90, 250])
+    assert table.last_prices[1] == 31.0
+    assert "B" not in table
+
+
+def test_unknown_and_duplicate_tickers_raise():
+    table = HoldingsTable.from_arrays(["A"], [1], [10])
+
+    with pytest.raises(Exception):
+        table.append("A", 1, 10)
+    with pytest.raises(Exception):
+        table.remove("B")
+    with pytest.raises(Exception):
+        table.update("B", 1, 10)
@@ -0,0 +1,62 @@
+import os
+import time
+import pytest
+from models import JobQueue as job_queue_module
+from models.JobQueue import JobQueue, DONE, FAILED, QUEUED
+
+
+# handlers for the spawned workers, resolved by JOB_HANDLERS like the real ones
+def add(params: dict, report) -> dict:
+    report(0.5, "halfway")
+    return {"sum": params["a"] + params["b"]}
+
+
+def crash(params: dict, report) -> dict:
+    os._exit(1)
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setitem(job_queue_module.JOB_HANDLERS, "add", "tests.test_job_queue:add")
+    monkeypatch.setitem(job_queue_module.JOB_HANDLERS, "crash", "tests.test_job_queue:crash")
+    job_queue = JobQueue(str(tmp_path / "jobs.db"), max_workers=1)
+    yield job_queue
+    job_queue._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def wait_for(job_queue: JobQueue, job_id: int, timeout: float = 60) -> dict:
+    deadline = time.time() + timeout
+    while not job_queue.is_finished(job_id):
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.1)
+    return job_queue.get_status(job_id)
+
+
+def test_job_result_is_recorded(queue):
+    status = wait_for(queue, queue.submit("add", a=1, b=2))
+
+    assert status["status"] == DONE
+    assert status["result"] == {"sum": 3}
+
+
+def test_dead_worker_fails_its_job_and_the_queue_recovers(queue):
+    status = wait_for(queue, queue.submit("crash"))
+    assert status["status"] == FAILED
+    assert "worker process died" in status["message"]
+
+    assert wait_for(queue, queue.submit("add", a=2, b=2))["result"] == {"sum": 4}
+
+
+def test_jobs_of_a_previous_process_are_failed_on_startup(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    conn = job_queue_module._connect(path)
+    with conn:
+        conn.execute("INSERT INTO jobs (kind, params, status, progress, message, created_at, updated_at) "
+                     "VALUES ('add', '{}', ?, 0, 'queued', ?, ?)", (QUEUED, 0.0, 0.0))
+    conn.close()
+
+    job_queue = JobQueue(path, max_workers=1)
+    status = job_queue.get_status(1)
+    job_queue._executor.shutdown(wait=True)
+
+    assert status["status"] == FAILED
@@ -0,0 +1,48 @@
+import json
+import numpy as np
+import pytest
+from assets.Collector import InfoCollector
+from assets.PriceCache import PriceCache, SyntheticSource
+from models import MonteCarloSimulator as simulator_module
+from models import jobs
+
+
+@pytest.fixture
+def offline_prices(monkeypatch):
+    monkeypatch.setattr(InfoCollector, "_price_cache", PriceCache(":memory:", source=SyntheticSource(seed=2)))
+
+
+def test_monte_carlo_job_returns_json_and_stays_in_its_process(offline_prices, monkeypatch):
+    def no_pool():
+        raise AssertionError("a monte_carlo job must not start a process pool")
+
+    monkeypatch.setattr(simulator_module, "get_process_pool", no_pool)
+    progress = []
+
+    result = jobs.monte_carlo({"book_costs": {"AAA": 6_000.0, "BBB": 4_000.0},
+                               "start": "2022-01-03", "end": "2023-01-03",
+                               "no_simulations": 2_000, "no_days": 10, "alphas": [0.05, 0.01],
+                               "horizons": [5], "seed": 0, "n_workers": 8},
+                              lambda fraction, message: progress.append(fraction))
+
+    assert json.loads(json.dumps(result)) == result
+    assert result["no_simulations"] == 2_000 and result["term_structure_days"] == [5, 10]
+    assert np.asarray(result["portfolio_returns"]).shape[0] == 10
+    assert progress[-1] == pytest.approx(1.0)
+
+
+def test_importance_sampled_job_matches_the_in_process_run(offline_prices):
+    params = {"book_costs": {"AAA": 6_000.0, "BBB": 4_000.0},
+              "start": "2022-01-03", "end": "2023-01-03",
+              "no_simulations": 2_000, "no_days": 10, "alphas": [0.05, 0.01],
+              "seed": 0, "sampler": "importance"}
+    result = jobs.monte_carlo(params, lambda fraction, message: None)
+
+    # the tail shift follows the smaller of the two alphas, as on the page
+    monte_carlo_model = simulator_module.Monte_Carlo_Simulator(cVaR_alpha=0.01, VaR_alpha=0.05)
+    monte_carlo_model.get_book_costs(params["book_costs"], params["start"], params["end"])
+    monte_carlo_model.apply_monte_carlo_streaming(no_simulations=2_000, no_days=10, seed=0,
+                                                  sampler="importance")
+    expected = monte_carlo_model.get_summary([0.05, 0.01])
+
+    np.testing.assert_allclose(result["risk_metrics"], expected["risk_metrics"])
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+joblib = pytest.importorskip("joblib")
+from sklearn.preprocessing import MinMaxScaler
+from models.JobQueue import QUEUED
+from models.ModelRegistry import ModelRegistry
+
+
+class FakeQueue:
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, kind: str, **params) -> int:
+        self.submitted.append((kind, params))
+        return len(self.submitted)
+
+    def get_status(self, job_id: int) -> dict:
+        return {"status": QUEUED, "progress": 0.0, "message": "queued"}
+
+
+def save_artifacts(model_path, scaler_paths):
+    model = tf.keras.Sequential([tf.keras.layers.LSTM(2, input_shape=(5, 1)), tf.keras.layers.Dense(1)])
+    model.save(str(model_path))
+    for scaler_path in scaler_paths:
+        joblib.dump(MinMaxScaler().fit(np.arange(10.0).reshape(-1, 1)), str(scaler_path))
+
+
+def test_shared_model_serves_tickers_without_their_own(tmp_path):
+    save_artifacts(tmp_path / "lstm_model_shared.h5",
+                   [tmp_path / "scaler_shared_AAA.joblib", tmp_path / "scaler_shared_BBB.joblib"])
+    registry = ModelRegistry(model_dir=str(tmp_path), job_queue=FakeQueue())
+
+    model_a, scaler_a = registry.get("AAA")
+    model_b, scaler_b = registry.get("BBB")
+    assert model_a is model_b
+    assert scaler_a is not scaler_b
+
+
+def test_own_model_is_preferred_over_the_shared_one(tmp_path):
+    save_artifacts(tmp_path / "lstm_model_shared.h5", [tmp_path / "scaler_shared_AAA.joblib"])
+    save_artifacts(tmp_path / "lstm_model_AAA.h5", [tmp_path / "scaler_AAA.joblib"])
+    registry = ModelRegistry(model_dir=str(tmp_path), job_queue=FakeQueue())
+
+    model, _ = registry.get("AAA")
+    assert model is registry._loaded[registry.model_path("AAA")][1]
+
+
+def test_ticker_without_any_model_is_trained_once(tmp_path):
+    save_artifacts(tmp_path / "lstm_model_shared.h5", [tmp_path / "scaler_shared_AAA.joblib"])
+    job_queue = FakeQueue()
+    registry = ModelRegistry(model_dir=str(tmp_path), job_queue=job_queue)
+
+    assert registry.load_or_train("CCC") is None
+    assert registry.load_or_train("CCC") is None
+    assert job_queue.submitted == [("train_forecast", {"ticker": "CCC"})]
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+import pytest
+from models.FittedReturnModel import FittedReturnModel
+from models.MonteCarloSimulator import (Monte_Carlo_Simulator, _draw_normals, iter_bootstrap_blocks,
+                                        iter_path_blocks, simulate_paths, sobol_supported)
+from models.RiskMetrics import var_cvar
+
+
+def make_simulator(no_assets: int = 5, no_history: int = 1000, seed: int = 0) -> Monte_Carlo_Simulator:
+    # fitted on synthetic returns, no download
+    rng = np.random.default_rng(seed)
+    tickers = [f"T{i}" for i in range(no_assets)]
+    pct_return = pd.DataFrame(rng.normal(0.0005, 0.01, (no_history, no_assets)), columns=tickers)
+    monte_carlo_model = Monte_Carlo_Simulator(cVaR_alpha=0.05, VaR_alpha=0.05)
+    monte_carlo_model.return_model = FittedReturnModel(tickers, pct_return)
+    monte_carlo_model.pct_mean_return = monte_carlo_model.return_model.mean_return
+    monte_carlo_model.pct_cov_matrix = monte_carlo_model.return_model.cov_matrix
+    monte_carlo_model.init_cash = 100_000.0
+    monte_carlo_model.stocks = {ticker: 1 / no_assets for ticker in tickers}
+    return monte_carlo_model
+
+
+def test_sharded_run_is_reproducible_on_the_process_pool():
+    monte_carlo_model = make_simulator()
+    monte_carlo_model.apply_monte_carlo(4_000, 20, n_workers=2, seed=7)
+    pooled = monte_carlo_model.terminal_values.copy()
+    monte_carlo_model.apply_monte_carlo(4_000, 20, n_workers=2, seed=7)
+
+    np.testing.assert_array_equal(pooled, monte_carlo_model.terminal_values)
+
+
+def test_streaming_matches_matrix_mode():
+    monte_carlo_model = make_simulator()
+    monte_carlo_model.apply_monte_carlo(4_000, 20, seed=3)
+    matrix_metrics = monte_carlo_model.get_risk_metrics([0.05])
+    monte_carlo_model.apply_monte_carlo_streaming(4_000, 20, block_size=1_000, seed=3)
+
+    assert monte_carlo_model.get_risk_metrics([0.05])[0.05] == pytest.approx(matrix_metrics[0.05])
+
+
+def test_importance_sampling_is_unbiased():
+    monte_carlo_model = make_simulator()
+    mean_return, chol_factor, weights = monte_carlo_model._get_model_inputs()
+    blocks = list(iter_path_blocks(mean_return, chol_factor, weights, 100_000.0, 200_000, 10,
+                                   rng=np.random.default_rng(0), sampler="importance",
+                                   tail_shift=monte_carlo_model._get_tail_shift(10)))
+    terminal_values = np.concatenate([paths[-1] for paths, _ in blocks])
+    likelihood_ratios = np.concatenate([ratios for _, ratios in blocks])
+    pseudo = simulate_paths(mean_return, chol_factor, weights, 100_000.0, 200_000, 10,
+                            rng=np.random.default_rng(1))[-1]
+
+    assert likelihood_ratios.mean() == pytest.approx(1.0, abs=0.02)
+    np.testing.assert_allclose(var_cvar(terminal_values, [0.01], likelihood_ratios)[0.01],
+                               var_cvar(pseudo, [0.01])[0.01], rtol=2e-3)
+
+
+def test_block_bootstrap_gathers_consecutive_history_days():
+    history_returns = np.arange(50) / 1_000
+    paths, _ = next(iter_bootstrap_blocks(history_returns, 1.0, 100, 10,
+                                          rng=np.random.default_rng(0), block_length=5))
+    growth = paths / np.vstack([np.ones(100), paths[:-1]])
+    rows = np.rint((growth - 1) * 1_000).astype(int)
+
+    # within each block of 5 days the history rows follow each other (circularly)
+    steps = np.diff(rows.reshape(2, 5, 100), axis=1) % 50
+    assert (steps == 1).all()
+
+
+def test_bootstrap_agrees_with_the_gaussian_engine_on_normal_history():
+    monte_carlo_model = make_simulator()
+    monte_carlo_model.apply_monte_carlo(20_000, 10, seed=0)
+    gaussian = monte_carlo_model.get_risk_metrics([0.05])[0.05]
+    monte_carlo_model.apply_monte_carlo(20_000, 10, seed=0, engine="bootstrap")
+
+    np.testing.assert_allclose(monte_carlo_model.get_risk_metrics([0.05])[0.05], gaussian, rtol=2e-3)
+
+
+def test_bootstrap_refuses_a_history_of_another_portfolio():
+    monte_carlo_model = make_simulator()
+    monte_carlo_model.stocks = {"T0": 0.5, "OTHER": 0.5}
+
+    with pytest.raises(Exception, match="call get_portfolio first"):
+        monte_carlo_model.apply_monte_carlo(1_000, 10, engine="bootstrap")
+
+
+def test_adaptive_run_stops_once_the_interval_is_narrow_enough():
+    monte_carlo_model = make_simulator()
+    monte_carlo_model.apply_monte_carlo_adaptive(10, [0.05], tolerance=1e6, batch_size=1_000, seed=0)
+    summary = monte_carlo_model.adaptive_summary
+
+    assert summary["stop_reason"] == "converged"
+    # the interval is never trusted before min_batches batches
+    assert summary["no_batches"] == 4
+    assert summary["ci_width"] <= 1e6
+
+
+def test_adaptive_run_stops_on_the_time_budget():
+    monte_carlo_model = make_simulator()
+    monte_carlo_model.apply_monte_carlo_adaptive(10, [0.05], tolerance=0.0, time_budget=0.0,
+                                                 batch_size=1_000, seed=0)
+
+    assert monte_carlo_model.adaptive_summary["stop_reason"] == "time_budget"
+    assert monte_carlo_model.adaptive_summary["no_simulations"] == 1_000
+
+
+def test_adaptive_run_stops_at_max_simulations():
+    monte_carlo_model = make_simulator()
+    monte_carlo_model.apply_monte_carlo_adaptive(10, [0.05], tolerance=0.0, batch_size=1_000,
+                                                 max_simulations=2_500, seed=0)
+
+    assert monte_carlo_model.adaptive_summary["stop_reason"] == "max_simulations"
+    assert monte_carlo_model.no_simulations == 2_500
+
+
+def test_antithetic_pairs_mirror_their_shocks():
+    normals = _draw_normals(np.random.default_rng(0), "antithetic", None, 7, 3, 2)
+
+    assert normals.shape == (7, 3, 2)
+    np.testing.assert_array_equal(normals[0:6:2], -normals[1:6:2])
+
+
+def test_antithetic_paths_mirror_around_the_drift():
+    monte_carlo_model = make_simulator()
+    mean_return, chol_factor, weights = monte_carlo_model._get_model_inputs()
+    paths = simulate_paths(mean_return, chol_factor, weights, 1.0, 1_000, 1,
+                           rng=np.random.default_rng(0), sampler="antithetic")
+
+    drift = 1 + weights @ mean_return
+    np.testing.assert_allclose(paths[0, 0::2] + paths[0, 1::2], 2 * drift)
+
+
+def test_sobol_draws_are_reproducible_and_shaped():
+    monte_carlo_model = make_simulator()
+    mean_return, chol_factor, weights = monte_carlo_model._get_model_inputs()
+
+    def draw(seed: int) -> np.ndarray:
+        return simulate_paths(mean_return, chol_factor, weights, 100_000.0, 512, 20,
+                              rng=np.random.default_rng(seed), sampler="sobol")
+
+    paths = draw(0)
+    assert paths.shape == (20, 512) and np.isfinite(paths).all()
+    np.testing.assert_array_equal(paths, draw(0))
+    assert not np.array_equal(paths, draw(1))
+
+
+def test_sobol_beyond_its_dimensions_is_refused_before_simulating():
+    monte_carlo_model = make_simulator(no_assets=30)
+
+    assert sobol_supported(100, 30) and not sobol_supported(1_000, 30)
+    with pytest.raises(Exception, match="Sobol sampling supports"):
+        monte_carlo_model.apply_monte_carlo(1_000, 1_000, sampler="sobol")
+
+
+def test_in_process_summary_keeps_the_arrays():
+    monte_carlo_model = make_simulator()
+    monte_carlo_model.apply_monte_carlo(1_000, 10, seed=0)
+    summary = monte_carlo_model.get_summary([0.05])
+
+    assert summary["portfolio_returns"] is monte_carlo_model.portfolio_returns
+    assert isinstance(summary["fan_bands"], np.ndarray)
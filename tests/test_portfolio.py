@@ -0,0 +1,76 @@
+import datetime
+import numpy as np
+import pytest
+from assets import Stock as stock_module
+from assets.Portfolio import Portfolio
+from assets.QuoteSnapshot import Quote
+from assets.Stock import Stock
+
+
+class FixedQuotes:
+    """
+    Price source with fixed closes, no network
+    """
+
+    def __init__(self, closes: dict):
+        self.closes = closes
+
+    def refresh(self, stock_names: list) -> None:
+        pass
+
+    def get_quote(self, stock_name: str) -> Quote:
+        close = self.closes[stock_name]
+        return Quote(datetime.date(2024, 1, 2), close, close, 1_000.0)
+
+
+class FixedResolver:
+
+    def resolve(self, stock_name, purchase_date) -> float:
+        return 80.0
+
+
+@pytest.fixture
+def portfolio(monkeypatch):
+    monkeypatch.setattr(stock_module, "get_default_resolver", lambda: FixedResolver())
+    price_source = FixedQuotes({"AAA": 110.0, "BBB": 40.0})
+    portfolio = Portfolio()
+    portfolio.add_stock(Stock.from_holding("AAA", 10, 100.0, price_source=price_source))
+    portfolio.add_stock(Stock.from_holding("BBB", 30, 50.0, price_source=price_source))
+    return portfolio
+
+
+def test_portfolio_figures_match_the_stocks(portfolio):
+    portfolio.update_market_value()
+
+    assert portfolio.book_amount == pytest.approx(sum(stock.get_book_cost() for stock in portfolio.stocks.values()))
+    assert portfolio.market_value == pytest.approx(10 * 110.0 + 30 * 40.0)
+    np.testing.assert_allclose(portfolio.holdings.weights(), [1000 / 2500, 1500 / 2500])
+
+
+def test_buy_through_the_portfolio_averages_the_purchase_price(portfolio):
+    # 10 held at 100, 10 more bought at 80
+    portfolio.add_buy_action("AAA", 10, datetime.date(2023, 6, 1))
+    stock = portfolio.stocks["AAA"]
+
+    assert stock.owned_quantity == 20
+    assert stock.average_price == pytest.approx(90.0)
+    assert stock.get_book_cost() == pytest.approx(1800.0)
+    assert portfolio.holdings.quantities[0] == 20
+    assert portfolio.holdings.average_costs[0] == pytest.approx(90.0)
+    assert portfolio.book_amount == pytest.approx(1800.0 + 1500.0)
+
+
+def test_first_buy_sets_the_purchase_price(monkeypatch):
+    monkeypatch.setattr(stock_module, "get_default_resolver", lambda: FixedResolver())
+    stock = Stock("AAA", price_source=FixedQuotes({"AAA": 110.0}))
+    stock.add_buy_action(quantity=5, purchase_date=datetime.date(2023, 6, 1))
+
+    assert stock.average_price == pytest.approx(80.0)
+    assert stock.get_book_cost() == pytest.approx(400.0)
+
+
+def test_refresh_holding_copies_an_outside_change(portfolio):
+    portfolio.stocks["AAA"].owned_quantity = 20
+    portfolio.refresh_holding("AAA")
+
+    assert portfolio.book_amount == pytest.approx(20 * 100.0 + 30 * 50.0)
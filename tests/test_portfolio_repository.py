@@ -0,0 +1,69 @@
+import datetime
+import pytest
+from assets.Portfolio import Portfolio
+from assets.PortfolioRepository import PortfolioRepository
+from assets.Stock import Stock
+
+
+def make_portfolio(holdings: list) -> Portfolio:
+    portfolio = Portfolio()
+    for stock_name, quantity, average_price, purchase_date in holdings:
+        portfolio.add_stock(Stock.from_holding(stock_name, quantity, average_price, purchase_date))
+    return portfolio
+
+
+HOLDINGS = [("MSFT", 10, 250.5, datetime.date(2023, 3, 1)),
+            ("AAPL", 5, 150.0, None),
+            ("NVDA", 2, 400.25, datetime.date(2023, 6, 15))]
+
+
+@pytest.fixture
+def repository(tmp_path) -> PortfolioRepository:
+    return PortfolioRepository(str(tmp_path / "portfolios.db"))
+
+
+def test_saved_portfolio_loads_back_in_order(repository):
+    repository.save("alice", "growth", make_portfolio(HOLDINGS))
+
+    assert repository.load_holdings("alice", "growth") == HOLDINGS
+    portfolio = repository.load("alice", "growth")
+    assert list(portfolio.stocks) == ["MSFT", "AAPL", "NVDA"]
+    assert portfolio.book_amount == pytest.approx(10 * 250.5 + 5 * 150.0 + 2 * 400.25)
+    assert portfolio.stocks["NVDA"].purchase_date == datetime.date(2023, 6, 15)
+
+
+def test_saving_again_overwrites_the_holdings(repository):
+    repository.save("alice", "growth", make_portfolio(HOLDINGS))
+    repository.save("alice", "growth", make_portfolio(HOLDINGS[1:2]))
+
+    assert repository.load_holdings("alice", "growth") == HOLDINGS[1:2]
+    assert repository.list_portfolios("alice") == ["growth"]
+
+
+def test_portfolios_are_listed_per_user(repository):
+    repository.save("alice", "growth", make_portfolio(HOLDINGS))
+    repository.save("alice", "value", make_portfolio(HOLDINGS[:1]))
+    repository.save("bob", "income", make_portfolio(HOLDINGS[2:]))
+
+    assert repository.list_portfolios("alice") == ["growth", "value"]
+    assert repository.list_portfolios("bob") == ["income"]
+    assert repository.list_portfolios("carol") == []
+    assert repository.load("bob", "growth") is None
+
+
+def test_delete_removes_the_portfolio_and_its_holdings(repository):
+    repository.save("alice", "growth", make_portfolio(HOLDINGS))
+    repository.save("alice", "value", make_portfolio(HOLDINGS[:1]))
+    repository.delete("alice", "growth")
+
+    assert repository.list_portfolios("alice") == ["value"]
+    assert repository.load_holdings("alice", "growth") == []
+    assert repository.load("alice", "growth") is None
+    # deleting an unknown name is a no-op
+    repository.delete("alice", "missing")
+    assert repository.list_portfolios("alice") == ["value"]
+
+
+def test_unknown_portfolio_loads_as_none(repository):
+    assert repository.load("alice", "missing") is None
+    assert repository.load_holdings("alice", "missing") == []
@@ -0,0 +1,86 @@
+import datetime
+import pytest
+from assets import PortfolioStateCache as state_cache_module
+from assets import Stock as stock_module
+from assets.PortfolioStateCache import PortfolioStateCache
+from tests.test_portfolio import FixedQuotes
+
+
+class CountingResolver:
+
+    def __init__(self):
+        self.primed = []
+
+    def prime(self, purchases: list) -> None:
+        self.primed.append([stock_name for stock_name, _ in purchases])
+
+    def resolve(self, stock_name, purchase_date) -> float:
+        return 100.0
+
+
+class CountingQuotes(FixedQuotes):
+
+    def __init__(self, closes: dict):
+        super().__init__(closes)
+        self.refreshed = []
+
+    def refresh(self, stock_names: list) -> None:
+        self.refreshed.append(list(stock_names))
+
+
+@pytest.fixture
+def resolver(monkeypatch) -> CountingResolver:
+    resolver = CountingResolver()
+    monkeypatch.setattr(state_cache_module, "get_default_resolver", lambda: resolver)
+    monkeypatch.setattr(stock_module, "get_default_resolver", lambda: resolver)
+    return resolver
+
+
+@pytest.fixture
+def cache() -> PortfolioStateCache:
+    return PortfolioStateCache(price_source=CountingQuotes({"AAA": 110.0, "BBB": 40.0, "CCC": 10.0}))
+
+
+HOLDINGS = [("AAA", 10, datetime.date(2023, 1, 3)), ("BBB", 5, datetime.date(2023, 2, 1))]
+
+
+def test_unchanged_inputs_return_the_same_portfolio(cache, resolver):
+    first = cache.get_portfolio(HOLDINGS)
+    # dates are compared by day and shares as ints, as the sidebar strings come in
+    second = cache.get_portfolio([("AAA", 10, datetime.datetime(2023, 1, 3, 12)), ("BBB", "5", "2023-02-01")])
+
+    assert second is first
+    assert resolver.primed == [["AAA", "BBB"]]
+    assert cache.price_source.refreshed == [["AAA", "BBB"]]
+
+
+def test_only_changed_holdings_are_rebuilt(cache, resolver):
+    first = cache.get_portfolio(HOLDINGS)
+    second = cache.get_portfolio([HOLDINGS[0], ("BBB", 8, datetime.date(2023, 2, 1)),
+                                  ("CCC", 1, datetime.date(2023, 3, 1))])
+
+    assert second is not first
+    assert second.stocks["AAA"] is first.stocks["AAA"]
+    assert second.stocks["BBB"].owned_quantity == 8
+    assert resolver.primed == [["AAA", "BBB"], ["BBB", "CCC"]]
+    assert second.book_amount == pytest.approx((10 + 8 + 1) * 100.0)
+
+
+def test_removed_holdings_are_dropped(cache, resolver):
+    cache.get_portfolio(HOLDINGS)
+    cache.get_portfolio(HOLDINGS[:1])
+    cache.get_portfolio(HOLDINGS)
+
+    # BBB left the inputs, adding it back builds it again
+    assert resolver.primed == [["AAA", "BBB"], ["BBB"]]
+
+
+def test_seeded_stocks_are_not_rebuilt(cache, resolver):
+    seeded = PortfolioStateCache(price_source=cache.price_source).get_portfolio(HOLDINGS)
+    cache.seed(seeded)
+    resolver.primed.clear()
+
+    portfolio = cache.get_portfolio(HOLDINGS)
+
+    assert resolver.primed == []
+    assert portfolio.stocks["AAA"] is seeded.stocks["AAA"]
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+from assets.Collector import InfoCollector
+from assets.PriceCache import PriceCache, SyntheticSource
+
+
+class SplittingSource(SyntheticSource):
+    """
+    Halves every adjusted bar once split() is called, like a 2:1 split
+    """
+
+    def __init__(self):
+        super().__init__(seed=1)
+        self.factor = 1.0
+
+    def split(self) -> None:
+        self.factor = 0.5
+
+    def history(self, ticker, period=None, interval="1d", start=None, end=None):
+        data = super().history(ticker, period=period, interval=interval, start=start, end=end)
+        data[["Open", "High", "Low", "Close"]] *= self.factor
+        return data
+
+
+class FlakySource(SyntheticSource):
+    """
+    Answers the first failures requests with empty frames, like yfinance on a network error
+    """
+
+    def __init__(self, failures: int = 1):
+        super().__init__(seed=1)
+        self.failures = failures
+
+    def history(self, ticker, period=None, interval="1d", start=None, end=None):
+        data = super().history(ticker, period=period, interval=interval, start=start, end=end)
+        if self.failures > 0:
+            self.failures -= 1
+            return data.iloc[:0]
+        return data
+
+    def download(self, tickers, start=None, end=None, interval="1d"):
+        if self.failures > 0:
+            self.failures -= 1
+            return {}
+        return super().download(tickers, start=start, end=end, interval=interval)
+
+
+def test_settled_range_is_fetched_once():
+    source = SyntheticSource(seed=1)
+    cache = PriceCache(":memory:", source=source)
+    first = cache.history("AAA", start="2020-01-01", end="2020-03-01")
+    second = cache.history("AAA", start="2020-01-15", end="2020-02-15")
+
+    assert len(source.calls) == 1
+    expected = source.history("AAA", start="2020-01-15", end="2020-02-15")
+    pd.testing.assert_series_equal(second["Close"], expected["Close"], check_freq=False)
+    assert len(first) > len(second)
+
+
+def test_only_missing_gap_is_fetched():
+    source = SyntheticSource(seed=1)
+    cache = PriceCache(":memory:", source=source)
+    cache.history("AAA", start="2020-01-01", end="2020-02-01")
+    cache.history("AAA", start="2020-01-01", end="2020-03-01")
+
+    # the gap reaches back to the last cached bar, Friday 2020-01-31, to check the adjustment
+    assert [(call[3], call[4]) for call in source.calls] == [("2020-01-01", "2020-02-01"),
+                                                             ("2020-01-31", "2020-03-01")]
+
+
+def test_empty_answer_is_not_recorded_as_coverage():
+    source = FlakySource(failures=1)
+    cache = PriceCache(":memory:", source=source)
+
+    assert len(cache.history("AAA", start="2020-01-01", end="2020-02-01")) == 0
+    assert len(cache.history("AAA", start="2020-01-01", end="2020-02-01")) > 0
+    assert len(source.calls) == 2
+
+
+def test_weekend_gap_is_recorded_as_coverage():
+    source = SyntheticSource(seed=1)
+    cache = PriceCache(":memory:", source=source)
+    # 2020-01-04 and 2020-01-05 are a Saturday and a Sunday
+    cache.history("AAA", start="2020-01-04", end="2020-01-06")
+    cache.history("AAA", start="2020-01-04", end="2020-01-06")
+
+    assert len(source.calls) == 1
+
+
+def test_ticker_missing_from_download_is_fetched_again():
+    source = FlakySource(failures=1)
+    cache = PriceCache(":memory:", source=source)
+    cache.download(["AAA", "BBB"], start="2020-01-01", end="2020-02-01")
+    data = cache.download(["AAA", "BBB"], start="2020-01-01", end="2020-02-01")
+
+    assert data["Close"]["AAA"].notna().all() and data["Close"]["BBB"].notna().all()
+    assert len(data) > 0
+
+
+def test_rebased_history_drops_the_cached_bars():
+    source = SplittingSource()
+    cache = PriceCache(":memory:", source=source)
+    cache.history("AAA", start="2020-01-01", end="2020-02-01")
+    source.split()
+    data = cache.history("AAA", start="2020-01-01", end="2020-03-01")
+
+    expected = source.history("AAA", start="2020-01-01", end="2020-03-01")
+    pd.testing.assert_series_equal(data["Close"], expected["Close"], check_freq=False)
+
+
+def test_rebased_download_drops_the_cached_bars():
+    source = SplittingSource()
+    cache = PriceCache(":memory:", source=source)
+    cache.download(["AAA", "BBB"], start="2020-01-01", end="2020-02-01")
+    source.split()
+    data = cache.download(["AAA", "BBB"], start="2020-01-01", end="2020-03-01")
+
+    for ticker in ("AAA", "BBB"):
+        expected = source.history(ticker, start="2020-01-01", end="2020-03-01")
+        np.testing.assert_allclose(data["Close"][ticker].to_numpy(), expected["Close"].to_numpy())
+
+
+class FailingSource(SyntheticSource):
+    """
+    Raises for the tickers in failing, like yfinance on a delisted symbol
+    """
+
+    def __init__(self, failing: set):
+        super().__init__(seed=1)
+        self.failing = failing
+
+    def history(self, ticker, period=None, interval="1d", start=None, end=None):
+        if ticker in self.failing:
+            raise Exception(f"{ticker}: No data found, symbol may be delisted")
+        return super().history(ticker, period=period, interval=interval, start=start, end=end)
+
+
+def test_failing_ticker_is_reported_without_aborting_the_others():
+    cache = PriceCache(":memory:", source=FailingSource({"BAD"}))
+    frames, failures = cache.history_many(["AAA", "BAD", "BBB", "AAA"], period="1mo")
+
+    assert sorted(frames) == ["AAA", "BBB"]
+    assert all(len(frame) > 0 for frame in frames.values())
+    assert list(failures) == ["BAD"] and "delisted" in failures["BAD"]
+
+
+def test_batch_history_goes_through_the_cache(monkeypatch):
+    source = FailingSource({"BAD"})
+    monkeypatch.setattr(InfoCollector, "_price_cache", PriceCache(":memory:", source=source))
+    InfoCollector.get_batch_history(["AAA", "BAD"])
+    frames, failures = InfoCollector.get_batch_history(["AAA", "BAD"])
+
+    assert list(frames) == ["AAA"] and list(failures) == ["BAD"]
+    # the good ticker is fetched once, the second call is served from its snapshot
+    assert [call[0] for call in source.calls] == ["AAA"]
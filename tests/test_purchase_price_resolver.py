@@ -0,0 +1,39 @@
+import pytest
+from assets.Collector import InfoCollector
+from assets.PriceCache import PriceCache, SyntheticSource
+from assets.PurchasePriceResolver import PurchasePriceResolver
+
+
+class DroppingSource(SyntheticSource):
+    """
+    Leaves every ticker out of the first download, like a failed batch request
+    """
+
+    def __init__(self):
+        super().__init__(seed=3)
+        self.dropped = False
+
+    def download(self, tickers, start=None, end=None, interval="1d"):
+        if not self.dropped:
+            self.dropped = True
+            return {}
+        return super().download(tickers, start=start, end=end, interval=interval)
+
+
+def test_close_on_or_before_purchase_date(monkeypatch):
+    source = SyntheticSource(seed=3)
+    monkeypatch.setattr(InfoCollector, "_price_cache", PriceCache(":memory:", source=source))
+    closes = source.history("AAA", start="2021-01-01", end="2021-02-01")["Close"]
+
+    # 2021-01-09 is a Saturday, the Friday close is used
+    assert PurchasePriceResolver().resolve("AAA", "2021-01-09") == pytest.approx(closes["2021-01-08"])
+
+
+def test_failed_download_is_retried(monkeypatch):
+    source = DroppingSource()
+    monkeypatch.setattr(InfoCollector, "_price_cache", PriceCache(":memory:", source=source))
+    resolver = PurchasePriceResolver()
+
+    with pytest.raises(Exception):
+        resolver.resolve("AAA", "2021-01-08")
+    assert resolver.resolve("AAA", "2021-01-08") > 0
@@ -0,0 +1,69 @@
+import datetime
+from assets.Collector import InfoCollector
+from assets.PriceCache import PriceCache, SyntheticSource
+from assets.QuoteSnapshot import QuoteSnapshot
+
+
+class ClockedCache(PriceCache):
+    """
+    PriceCache whose clock is moved by hand
+    """
+
+    def __init__(self, source):
+        super().__init__(":memory:", source=source)
+        self.now = datetime.datetime(2024, 1, 2, 12)
+
+    def _now(self):
+        return self.now
+
+
+class FailingSource(SyntheticSource):
+
+    def __init__(self):
+        super().__init__(seed=2)
+        self.failing = False
+
+    def history(self, ticker, period=None, interval="1d", start=None, end=None):
+        data = super().history(ticker, period=period, interval=interval, start=start, end=end)
+        return data.iloc[:0] if self.failing else data
+
+
+def test_period_snapshot_honours_max_age():
+    source = SyntheticSource(seed=2)
+    cache = ClockedCache(source)
+    cache.history("AAA", period="1d", max_age=60)
+    cache.now += datetime.timedelta(seconds=30)
+    cache.history("AAA", period="1d", max_age=60)
+    assert len(source.calls) == 1
+
+    # still inside the one hour daily TTL, but older than the quote's max_age
+    cache.now += datetime.timedelta(seconds=60)
+    cache.history("AAA", period="1d", max_age=60)
+    assert len(source.calls) == 2
+
+
+def test_failed_quote_is_retried_and_keeps_last_good_quote(monkeypatch):
+    source = FailingSource()
+    monkeypatch.setattr(InfoCollector, "_price_cache", PriceCache(":memory:", source=source))
+    snapshot = QuoteSnapshot(max_age=0, retry_after=0)
+
+    good = snapshot.get_quote("AAA")
+    assert good is not None
+
+    source.failing = True
+    assert snapshot.get_quote("AAA") is good
+
+    source.failing = False
+    fresh = snapshot.get_quote("AAA")
+    assert fresh is not good and fresh.close == good.close
+
+
+def test_failed_quote_without_history_is_not_cached(monkeypatch):
+    source = FailingSource()
+    source.failing = True
+    monkeypatch.setattr(InfoCollector, "_price_cache", PriceCache(":memory:", source=source))
+    snapshot = QuoteSnapshot(retry_after=0)
+
+    assert snapshot.get_quote("AAA") is None
+    source.failing = False
+    assert snapshot.get_quote("AAA") is not None
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from models.RiskMetrics import delta_normal_var_cvar, var_cvar, var_cvar_by_day
+from models.TerminalEstimators import ExactTerminalEstimator, TDigestEstimator
+
+
+@pytest.mark.parametrize("no_values", [1, 2, 7, 1_000])
+def test_var_matches_np_quantile_and_cvar_the_mean_below_it(no_values):
+    values = np.random.default_rng(no_values).normal(size=no_values)
+    alphas = [0.01, 0.05, 0.5, 0.99]
+
+    metrics = var_cvar(values, alphas)
+
+    for alpha in alphas:
+        VaR, cVaR = metrics[alpha]
+        assert VaR == pytest.approx(np.quantile(values, alpha))
+        tail = values[values < VaR]
+        if len(tail) > 0:
+            assert cVaR == pytest.approx(tail.mean())
+        else:
+            assert np.isnan(cVaR)
+
+
+def test_by_day_matches_one_call_per_day():
+    paths = np.random.default_rng(0).normal(size=(4, 500))
+
+    VaR, cVaR = var_cvar_by_day(paths, [0.05])[0.05]
+
+    for day in range(4):
+        assert (VaR[day], cVaR[day]) == pytest.approx(var_cvar(paths[day], [0.05])[0.05])
+
+
+def test_no_values_raises():
+    with pytest.raises(Exception):
+        var_cvar(np.empty(0), [0.05])
+
+
+@pytest.mark.parametrize("no_values", [1, 2, 7, 1_000])
+def test_unit_weights_match_the_unweighted_estimator(no_values):
+    values = np.random.default_rng(no_values).normal(size=no_values)
+    alphas = [0.01, 0.05, 0.5, 0.99]
+
+    unweighted = var_cvar(values, alphas)
+    weighted = var_cvar(values, alphas, np.ones(no_values))
+
+    for alpha in alphas:
+        np.testing.assert_allclose(weighted[alpha], unweighted[alpha])
+
+
+def test_unit_weights_match_by_day():
+    paths = np.random.default_rng(0).normal(size=(4, 500))
+
+    unweighted = var_cvar_by_day(paths, [0.05])[0.05]
+    weighted = var_cvar_by_day(paths, [0.05], np.ones(500))[0.05]
+
+    np.testing.assert_allclose(weighted, unweighted)
+
+
+def test_tdigest_tail_mean_is_self_normalized_like_the_exact_estimator():
+    # likelihood ratios summing well below the number of values
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=20_000)
+    weights = rng.uniform(0.0, 0.1, size=20_000)
+    exact, digest = ExactTerminalEstimator(), TDigestEstimator()
+    exact.update(values, weights)
+    digest.update(values, weights)
+
+    assert digest.tail_mean(0.5) == pytest.approx(exact.tail_mean(0.5), abs=0.02)
+    assert digest.tail_mean(0.5) == pytest.approx(np.average(values, weights=weights), abs=0.02)
+
+
+def test_delta_normal_scans_portfolios_like_single_calls():
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.0005, 0.01, (500, 3))
+    mean_return, cov_matrix = returns.mean(axis=0), np.cov(returns, rowvar=False)
+    weights = rng.dirichlet(np.ones(3), size=4)
+
+    scanned = delta_normal_var_cvar(mean_return, cov_matrix, weights, 1_000.0, 20, [0.05])[0.05]
+    for i, portfolio_weights in enumerate(weights):
+        single = delta_normal_var_cvar(mean_return, cov_matrix, portfolio_weights, 1_000.0, 20, [0.05])[0.05]
+        assert (scanned[0][i], scanned[1][i]) == pytest.approx(single)
+
+
+def test_delta_normal_compounds_like_the_simulation():
+    # long horizon where summing arithmetic returns drifts away from the compounded paths
+    rng = np.random.default_rng(0)
+    mean_return, volatility, no_days = 0.001, 0.02, 250
+    daily_returns = rng.normal(mean_return, volatility, (100_000, no_days)) + 1
+    simulated = var_cvar(1_000.0 * np.prod(daily_returns, axis=1), [0.05])[0.05]
+
+    closed_form = delta_normal_var_cvar(np.array([mean_return]), np.array([[volatility ** 2]]),
+                                        np.array([1.0]), 1_000.0, no_days, [0.05])[0.05]
+
+    assert closed_form == pytest.approx(simulated, rel=5e-3)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from models.FittedReturnModel import FittedReturnModel, _incremental_moments
+from models.RollingMoments import RollingMoments
+
+
+def make_returns(no_history: int = 300, no_assets: int = 4) -> np.ndarray:
+    return np.random.default_rng(0).normal(0.0005, 0.01, (no_history, no_assets))
+
+
+def test_sliding_the_window_matches_a_refit():
+    returns = make_returns()
+    moments = RollingMoments.from_returns(returns[:200])
+    for start in range(100):
+        moments.remove_observation(returns[start])
+        moments.add_observation(returns[200 + start])
+
+    np.testing.assert_allclose(moments.mean, returns[100:].mean(axis=0))
+    np.testing.assert_allclose(moments.covariance(), np.cov(returns[100:], rowvar=False))
+
+
+def test_adding_and_removing_assets_matches_a_refit():
+    returns = make_returns()
+    moments = RollingMoments.from_returns(returns[:, :3])
+    moments.add_asset(returns[:, 3], window=returns[:, :3])
+    moments.remove_asset(0)
+    moments.reorder([2, 0, 1])
+
+    np.testing.assert_allclose(moments.covariance(), np.cov(returns[:, [3, 1, 2]], rowvar=False))
+
+
+def test_removing_every_observation_resets_the_moments():
+    returns = make_returns(no_history=2)
+    moments = RollingMoments.from_returns(returns)
+    moments.remove_observation(returns[0])
+    moments.remove_observation(returns[1])
+
+    assert moments.count == 0
+    with pytest.raises(Exception):
+        moments.remove_observation(returns[0])
+
+
+def test_incremental_model_update_matches_a_refit():
+    dates = pd.bdate_range("2023-01-02", periods=300)
+    pct_return = pd.DataFrame(make_returns(), index=dates, columns=["A", "B", "C", "D"])
+    base = FittedReturnModel(["A", "B", "C"], pct_return.iloc[:250])
+
+    moments = _incremental_moments(base, ["D", "A", "C"], pct_return.iloc[50:])
+    refit = FittedReturnModel(["D", "A", "C"], pct_return.iloc[50:])
+
+    np.testing.assert_allclose(moments.mean, refit.mean_return.to_numpy())
+    np.testing.assert_allclose(moments.covariance(), refit.cov_matrix.to_numpy())
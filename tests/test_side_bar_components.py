@@ -0,0 +1,37 @@
+from streamlit.testing.v1 import AppTest
+
+SCRIPT = """
+import streamlit as st
+import side_bar_components
+risk_tab, = st.sidebar.tabs(["Risk"])
+side_bar_components.load_sidebar_risk_model(risk_tab)
+st.write(float(st.session_state.ci_tolerance), float(st.session_state.time_budget),
+         int(st.session_state.block_length))
+"""
+
+
+def test_invalid_risk_model_inputs_fall_back_to_defaults(tmp_path):
+    script = tmp_path / "side_bar_app.py"
+    script.write_text(SCRIPT)
+    app = AppTest.from_file(str(script), default_timeout=30).run()
+    app.text_input(key="side_bar_ci_tolerance").set_value("abc")
+    app.text_input(key="side_bar_time_budget").set_value("-3")
+    app.text_input(key="side_bar_block_length").set_value("")
+    app.run()
+
+    assert not app.exception
+    assert len(app.warning) == 3
+    assert (app.session_state.ci_tolerance, app.session_state.time_budget,
+            app.session_state.block_length) == ("0", "10", "1")
+
+
+def test_valid_risk_model_inputs_are_kept(tmp_path):
+    script = tmp_path / "side_bar_app.py"
+    script.write_text(SCRIPT)
+    app = AppTest.from_file(str(script), default_timeout=30).run()
+    app.text_input(key="side_bar_ci_tolerance").set_value("250.5")
+    app.text_input(key="side_bar_time_budget").set_value("0")
+    app.run()
+
+    assert not app.exception and len(app.warning) == 0
+    assert app.session_state.ci_tolerance == "250.5"
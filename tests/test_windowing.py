@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from models.windowing import make_multi_windows, make_windows
+
+
+def test_windows_and_targets_line_up():
+    series = np.arange(10, dtype=np.float64)
+    x, y = make_windows(series, time_step=3)
+
+    assert x.shape == (7, 3, 1) and y.shape == (7,)
+    np.testing.assert_array_equal(x[0, :, 0], [0, 1, 2])
+    np.testing.assert_array_equal(x[-1, :, 0], [6, 7, 8])
+    # every target is the observation right after its window
+    np.testing.assert_array_equal(y, x[:, -1, 0] + 1)
+    assert y[-1] == 9
+
+
+def test_windows_are_a_view_of_the_series():
+    series = np.arange(20, dtype=np.float64).reshape(10, 2)
+    x, y = make_windows(series, time_step=4, target_column=1)
+
+    assert x.shape == (6, 4, 2) and np.shares_memory(x, series)
+    np.testing.assert_array_equal(x[2], series[2:6])
+    np.testing.assert_array_equal(y, series[4:, 1])
+
+
+def test_too_short_series_raises():
+    make_windows(np.arange(4), time_step=3)
+    with pytest.raises(Exception):
+        make_windows(np.arange(3), time_step=3)
+
+
+def test_windows_never_cross_tickers():
+    first, second = np.arange(5, dtype=np.float64), 100 + np.arange(6, dtype=np.float64)
+    x, y = make_multi_windows([first, second], time_step=3)
+
+    assert x.shape == (2 + 3, 3, 1)
+    np.testing.assert_array_equal(y, [3, 4, 103, 104, 105])
+    np.testing.assert_array_equal(x[2, :, 0], [100, 101, 102])